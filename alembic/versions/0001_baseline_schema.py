@@ -0,0 +1,233 @@
+"""baseline schema
+
+Tables exactly as Base.metadata.create_all created them before migrations
+existed (no factor_aliases, project_factor_dependencies or
+projects.results_catalog_version; those come in 0001a). Databases created
+that way are adopted with `alembic stamp 0001` + `alembic upgrade head`.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 23:02:58.797094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('biomass_mut_allocations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('biomass_name', sa.String(), nullable=False),
+    sa.Column('lifecycle_stage', sa.String(), nullable=True),
+    sa.Column('product_name', sa.String(), nullable=True),
+    sa.Column('allocation_product', sa.Float(), nullable=True),
+    sa.Column('coproduct_name', sa.String(), nullable=True),
+    sa.Column('allocation_coproduct', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_biomass_mut_allocations_biomass_name'), 'biomass_mut_allocations', ['biomass_name'], unique=False)
+    op.create_index(op.f('ix_biomass_mut_allocations_id'), 'biomass_mut_allocations', ['id'], unique=False)
+    op.create_table('biomass_production_emissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('biomass_name', sa.String(), nullable=False),
+    sa.Column('emission_factor', sa.Float(), nullable=False),
+    sa.Column('allocation_product', sa.Float(), nullable=True),
+    sa.Column('allocation_coproduct', sa.Float(), nullable=True),
+    sa.Column('biomass_type', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_biomass_production_emissions_biomass_name'), 'biomass_production_emissions', ['biomass_name'], unique=False)
+    op.create_index(op.f('ix_biomass_production_emissions_id'), 'biomass_production_emissions', ['id'], unique=False)
+    op.create_table('biomass_properties',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('biomass_name', sa.String(), nullable=False),
+    sa.Column('pci_mj_kg', sa.Float(), nullable=False),
+    sa.Column('combustion_emission', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_biomass_properties_biomass_name'), 'biomass_properties', ['biomass_name'], unique=True)
+    op.create_index(op.f('ix_biomass_properties_id'), 'biomass_properties', ['id'], unique=False)
+    op.create_table('gwp_factors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('gas_name', sa.String(), nullable=False),
+    sa.Column('gwp_value', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_gwp_factors_gas_name'), 'gwp_factors', ['gas_name'], unique=True)
+    op.create_index(op.f('ix_gwp_factors_id'), 'gwp_factors', ['id'], unique=False)
+    op.create_table('industrial_input_emissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('input_name', sa.String(), nullable=False),
+    sa.Column('input_type', sa.String(), nullable=True),
+    sa.Column('emission_factor', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_industrial_input_emissions_id'), 'industrial_input_emissions', ['id'], unique=False)
+    op.create_index(op.f('ix_industrial_input_emissions_input_name'), 'industrial_input_emissions', ['input_name'], unique=False)
+    op.create_table('mut_factors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('state', sa.String(), nullable=False),
+    sa.Column('culture', sa.String(), nullable=False),
+    sa.Column('emission_factor', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mut_factors_id'), 'mut_factors', ['id'], unique=False)
+    op.create_index(op.f('ix_mut_factors_state'), 'mut_factors', ['state'], unique=False)
+    op.create_table('stationary_combustion_emissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fuel_name', sa.String(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.Column('co2_fossil', sa.Float(), nullable=True),
+    sa.Column('co2_biogenic', sa.Float(), nullable=True),
+    sa.Column('ch4_fossil', sa.Float(), nullable=True),
+    sa.Column('ch4_biogenic', sa.Float(), nullable=True),
+    sa.Column('n2o_emission', sa.Float(), nullable=True),
+    sa.Column('co2_eq_emission', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stationary_combustion_emissions_fuel_name'), 'stationary_combustion_emissions', ['fuel_name'], unique=False)
+    op.create_index(op.f('ix_stationary_combustion_emissions_id'), 'stationary_combustion_emissions', ['id'], unique=False)
+    op.create_table('transport_modal_factors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('modal_type', sa.String(), nullable=False),
+    sa.Column('emission_factor', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transport_modal_factors_id'), 'transport_modal_factors', ['id'], unique=False)
+    op.create_index(op.f('ix_transport_modal_factors_modal_type'), 'transport_modal_factors', ['modal_type'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('company_name', sa.String(), nullable=True),
+    sa.Column('cnpj', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('vehicle_emission_factors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_type', sa.String(), nullable=False),
+    sa.Column('emission_factor', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_vehicle_emission_factors_id'), 'vehicle_emission_factors', ['id'], unique=False)
+    op.create_index(op.f('ix_vehicle_emission_factors_vehicle_type'), 'vehicle_emission_factors', ['vehicle_type'], unique=True)
+    op.create_table('projects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'COMPLETED', name='projectstatus'), nullable=True),
+    sa.Column('current_step', sa.Integer(), nullable=True),
+    sa.Column('company_name', sa.String(), nullable=True),
+    sa.Column('cnpj', sa.String(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('city', sa.String(), nullable=True),
+    sa.Column('tech_responsible', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('biomass_type', sa.String(), nullable=True),
+    sa.Column('pci', sa.Float(), nullable=True),
+    sa.Column('production_volume', sa.Float(), nullable=True),
+    sa.Column('biomass_consumption_known', sa.String(), nullable=True),
+    sa.Column('biomass_consumption_value', sa.Float(), nullable=True),
+    sa.Column('production_state', sa.String(), nullable=True),
+    sa.Column('wood_residue_stage', sa.String(), nullable=True),
+    sa.Column('starch_input', sa.Float(), nullable=True),
+    sa.Column('agr_transport_distance', sa.Float(), nullable=True),
+    sa.Column('agr_transport_vehicle', sa.String(), nullable=True),
+    sa.Column('biomass_processed', sa.Float(), nullable=True),
+    sa.Column('water_consumption', sa.Float(), nullable=True),
+    sa.Column('elec_grid', sa.Float(), nullable=True),
+    sa.Column('elec_solar', sa.Float(), nullable=True),
+    sa.Column('elec_wind', sa.Float(), nullable=True),
+    sa.Column('elec_hydro', sa.Float(), nullable=True),
+    sa.Column('elec_biomass', sa.Float(), nullable=True),
+    sa.Column('elec_other', sa.Float(), nullable=True),
+    sa.Column('fuel_diesel', sa.Float(), nullable=True),
+    sa.Column('fuel_gasoline', sa.Float(), nullable=True),
+    sa.Column('fuel_ethanol', sa.Float(), nullable=True),
+    sa.Column('fuel_biodiesel', sa.Float(), nullable=True),
+    sa.Column('fuel_gnv', sa.Float(), nullable=True),
+    sa.Column('fuel_lpg', sa.Float(), nullable=True),
+    sa.Column('fuel_biomass', sa.Float(), nullable=True),
+    sa.Column('fuel_other', sa.Float(), nullable=True),
+    sa.Column('input_lubricant', sa.Float(), nullable=True),
+    sa.Column('input_chemical', sa.Float(), nullable=True),
+    sa.Column('input_other', sa.Float(), nullable=True),
+    sa.Column('dom_mass', sa.Float(), nullable=True),
+    sa.Column('dom_distance', sa.Float(), nullable=True),
+    sa.Column('dom_modal_road_pct', sa.Float(), nullable=True),
+    sa.Column('dom_modal_rail_pct', sa.Float(), nullable=True),
+    sa.Column('dom_vehicle_type', sa.String(), nullable=True),
+    sa.Column('exp_mass', sa.Float(), nullable=True),
+    sa.Column('exp_factory_port_dist', sa.Float(), nullable=True),
+    sa.Column('exp_modal_road_pct', sa.Float(), nullable=True),
+    sa.Column('exp_modal_rail_pct', sa.Float(), nullable=True),
+    sa.Column('exp_modal_water_pct', sa.Float(), nullable=True),
+    sa.Column('exp_vehicle_port', sa.String(), nullable=True),
+    sa.Column('exp_port_consumer_dist', sa.Float(), nullable=True),
+    sa.Column('carbon_intensity', sa.Float(), nullable=True),
+    sa.Column('agricultural_emissions', sa.Float(), nullable=True),
+    sa.Column('industrial_emissions', sa.Float(), nullable=True),
+    sa.Column('transport_emissions', sa.Float(), nullable=True),
+    sa.Column('use_emissions', sa.Float(), nullable=True),
+    sa.Column('efficiency_note', sa.Float(), nullable=True),
+    sa.Column('emission_reduction', sa.Float(), nullable=True),
+    sa.Column('cbios', sa.Integer(), nullable=True),
+    sa.Column('cbios_revenue', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_projects_id'), 'projects', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_projects_id'), table_name='projects')
+    op.drop_table('projects')
+    op.drop_index(op.f('ix_vehicle_emission_factors_vehicle_type'), table_name='vehicle_emission_factors')
+    op.drop_index(op.f('ix_vehicle_emission_factors_id'), table_name='vehicle_emission_factors')
+    op.drop_table('vehicle_emission_factors')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_transport_modal_factors_modal_type'), table_name='transport_modal_factors')
+    op.drop_index(op.f('ix_transport_modal_factors_id'), table_name='transport_modal_factors')
+    op.drop_table('transport_modal_factors')
+    op.drop_index(op.f('ix_stationary_combustion_emissions_id'), table_name='stationary_combustion_emissions')
+    op.drop_index(op.f('ix_stationary_combustion_emissions_fuel_name'), table_name='stationary_combustion_emissions')
+    op.drop_table('stationary_combustion_emissions')
+    op.drop_index(op.f('ix_mut_factors_state'), table_name='mut_factors')
+    op.drop_index(op.f('ix_mut_factors_id'), table_name='mut_factors')
+    op.drop_table('mut_factors')
+    op.drop_index(op.f('ix_industrial_input_emissions_input_name'), table_name='industrial_input_emissions')
+    op.drop_index(op.f('ix_industrial_input_emissions_id'), table_name='industrial_input_emissions')
+    op.drop_table('industrial_input_emissions')
+    op.drop_index(op.f('ix_gwp_factors_id'), table_name='gwp_factors')
+    op.drop_index(op.f('ix_gwp_factors_gas_name'), table_name='gwp_factors')
+    op.drop_table('gwp_factors')
+    op.drop_index(op.f('ix_biomass_properties_id'), table_name='biomass_properties')
+    op.drop_index(op.f('ix_biomass_properties_biomass_name'), table_name='biomass_properties')
+    op.drop_table('biomass_properties')
+    op.drop_index(op.f('ix_biomass_production_emissions_id'), table_name='biomass_production_emissions')
+    op.drop_index(op.f('ix_biomass_production_emissions_biomass_name'), table_name='biomass_production_emissions')
+    op.drop_table('biomass_production_emissions')
+    op.drop_index(op.f('ix_biomass_mut_allocations_id'), table_name='biomass_mut_allocations')
+    op.drop_index(op.f('ix_biomass_mut_allocations_biomass_name'), table_name='biomass_mut_allocations')
+    op.drop_table('biomass_mut_allocations')
+    sa.Enum(name='projectstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,67 @@
+"""factor aliases, dependency index and results catalog version
+
+Schema added after the create_all era, so databases adopted with
+`alembic stamp 0001` get it on `alembic upgrade head`:
+project_factor_dependencies (reverse index for targeted recalculation),
+projects.results_catalog_version (factor snapshot used by the stored
+results) and factor_aliases (search term -> factor row, filled by
+scripts/seed_database.py).
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('project_factor_dependencies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('factor_table', sa.String(), nullable=False),
+    sa.Column('factor_key', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_project_factor_dependencies_factor', 'project_factor_dependencies', ['factor_table', 'factor_key'], unique=False)
+    op.create_index(op.f('ix_project_factor_dependencies_id'), 'project_factor_dependencies', ['id'], unique=False)
+    op.create_index(op.f('ix_project_factor_dependencies_project_id'), 'project_factor_dependencies', ['project_id'], unique=False)
+
+    op.add_column('projects', sa.Column('results_catalog_version', sa.String(), nullable=True))
+
+    op.create_table('factor_aliases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('factor_table', sa.String(), nullable=False),
+    sa.Column('term', sa.String(), nullable=False),
+    sa.Column('input_type', sa.String(), nullable=False),
+    sa.Column('factor_id', sa.Integer(), nullable=False),
+    sa.Column('factor_name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_factor_aliases_id'), 'factor_aliases', ['id'], unique=False)
+    op.create_index('ux_factor_aliases_lookup', 'factor_aliases', ['factor_table', 'term', 'input_type'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_factor_aliases_lookup', table_name='factor_aliases')
+    op.drop_index(op.f('ix_factor_aliases_id'), table_name='factor_aliases')
+    op.drop_table('factor_aliases')
+
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('results_catalog_version')
+
+    op.drop_index(op.f('ix_project_factor_dependencies_project_id'), table_name='project_factor_dependencies')
+    op.drop_index(op.f('ix_project_factor_dependencies_id'), table_name='project_factor_dependencies')
+    op.drop_index('ix_project_factor_dependencies_factor', table_name='project_factor_dependencies')
+    op.drop_table('project_factor_dependencies')
@@ -0,0 +1,50 @@
+"""production indexes
+
+Indexes for the hot queries. On PostgreSQL they are built with
+CREATE INDEX CONCURRENTLY (outside the migration transaction), so
+writes to the tables are not blocked while they build.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-16 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, unique)
+INDEXES = (
+    ('ix_projects_user_id_created_at', 'projects', ['user_id', sa.text('created_at DESC')], False),
+    ('ux_mut_factors_state_culture', 'mut_factors', ['state', 'culture'], True),
+    ('ix_industrial_input_emissions_type_name', 'industrial_input_emissions', ['input_type', 'input_name'], False),
+    ('ix_biomass_mut_allocations_name_stage', 'biomass_mut_allocations', ['biomass_name', 'lifecycle_stage'], False),
+)
+
+
+def upgrade() -> None:
+    # Duplicated (state, culture) rows would break the unique index; the
+    # catalog always used the first one (lowest id), so the others go
+    op.execute(
+        "DELETE FROM mut_factors WHERE id NOT IN "
+        "(SELECT MIN(id) FROM mut_factors GROUP BY state, culture)"
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""project list keyset index
+
+GET /projects/ pages on (created_at, id) within a user, so the listing
+index gets id as tie-breaker and replaces ix_projects_user_id_created_at.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_projects_user_created_id', 'projects',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_projects_user_id_created_at', table_name='projects', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_projects_user_id_created_at', 'projects',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_projects_user_created_id', table_name='projects', postgresql_concurrently=True)
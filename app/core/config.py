@@ -10,6 +10,28 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Usuários autenticados em cache por processo (get_current_user); 0 desliga
+    AUTH_USER_CACHE_TTL: float = 30.0  # segundos; limite de atraso entre processos
+    AUTH_USER_CACHE_SIZE: int = 10000
+    JWT_CLAIMS_CACHE_SIZE: int = 10000  # tokens já verificados (até o exp); 0 desliga
+
+    # bcrypt em processos dedicados (ver app/services/password_hasher.py)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # custo; hashes com outro custo são refeitos no login
+    PASSWORD_HASH_WORKERS: int = 2  # 0 = bcrypt no próprio processo
+    PASSWORD_HASH_MAX_PENDING: int = 64  # na fila ou rodando; acima disso, 503
+
+    # Limite por IP e por conta nas rotas caras sem autenticação (429 + Retry-After)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100000  # buckets por limitador; o menos usado sai quando enche
+    LOGIN_RATE_PERIOD: int = 60  # segundos
+    LOGIN_RATE_PER_IP: int = 20  # tentativas por período (também o pico)
+    LOGIN_RATE_PER_ACCOUNT: int = 5
+    FORGOT_PASSWORD_RATE_PERIOD: int = 3600
+    FORGOT_PASSWORD_RATE_PER_IP: int = 10
+    FORGOT_PASSWORD_RATE_PER_ACCOUNT: int = 3
+    REGISTER_RATE_PERIOD: int = 3600
+    REGISTER_RATE_PER_IP: int = 10
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
@@ -32,9 +54,72 @@ class Settings(BaseSettings):
     EMAILS_FROM_EMAIL: str = "noreply@biocalc.com"
     EMAILS_FROM_NAME: str = "BioCalc"
 
+    SMTP_USE_TLS: bool = True  # STARTTLS
+    SMTP_TIMEOUT: float = 10.0
+    SMTP_IDLE_TIMEOUT: float = 60.0  # fecha a conexão reaproveitada após esse tempo ociosa
+
+    # Outbox de e-mails (enviados em segundo plano, ver app/services/email_outbox.py)
+    EMAIL_OUTBOX_SENDER_ENABLED: bool = True  # thread de envio em cada processo da API
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_POLL_INTERVAL: float = 5.0
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_DELAY: float = 30.0  # segundos; dobra a cada falha temporária
+    EMAIL_RETRY_MAX_DELAY: float = 3600.0
+    EMAIL_LOCK_TIMEOUT: int = 600  # SENDING há mais que isso = sender perdido
+
     FRONTEND_URL: str = "http://localhost:3000"
 
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Admin (e-mails com acesso às rotas /admin)
+    ADMIN_EMAILS: List[str] = []
+
+    # Factor catalog: a cada N segundos o snapshot do processo é comparado
+    # com a versão publicada no banco (reseed feito por outro processo)
+    FACTOR_CATALOG_CHECK_INTERVAL: float = 5.0
+
+    # Bulk recalculation
+    RECALC_CHUNK_SIZE: int = 2000
+    RECALC_WORKERS: int = 0  # 0 = os.cpu_count()
+    RECALC_CHECKPOINT_PATH: str = "recalculation_checkpoint.json"
+
+    # GET /projects/ (keyset pagination)
+    PROJECT_LIST_PAGE_SIZE: int = 100
+    PROJECT_LIST_MAX_PAGE_SIZE: int = 500
+
+    # POST /projects/full/batch (projetos por requisição)
+    PROJECT_BATCH_MAX_SIZE: int = 1000
+
+    # Importação CSV/XLSX (POST /projects/import, scripts/import_projects.py)
+    IMPORT_BATCH_SIZE: int = 500  # linhas validadas/calculadas/gravadas por commit
+    IMPORT_MAX_ERRORS: int = 1000  # erros detalhados no relatório (o total é sempre contado)
+
+    # GET /projects/export (linhas por fetch do cursor do servidor)
+    EXPORT_YIELD_PER: int = 1000
+
+    # Jobs em segundo plano (tabela jobs, scripts/run_worker.py)
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_DELAY: float = 30.0  # segundos; dobra a cada falha
+    JOB_RETRY_MAX_DELAY: float = 3600.0
+    JOB_POLL_INTERVAL: float = 2.0  # espera do worker com a fila vazia
+    JOB_LOCK_TIMEOUT: int = 6 * 3600  # RUNNING há mais que isso = worker perdido
+    JOB_FILES_DIR: str = "job_files"  # uploads aguardando o worker
+
+    # GET /auxiliary/catalog (Cache-Control max-age; com ?version= atual vira immutable)
+    CATALOG_CACHE_MAX_AGE: int = 86400
+
+    # What-if preview (POST /projects/preview)
+    PREVIEW_CACHE_SIZE: int = 4096
+
+    # Linear coefficient vectors per (biomass, state, vehicle, catalog version)
+    COEFFICIENT_CACHE_SIZE: int = 1024
+
+    # Per-request DB instrumentation (Server-Timing header, GET /admin/metrics/db)
+    DB_METRICS_ENABLED: bool = True
+    DB_METRICS_N_PLUS_ONE_THRESHOLD: int = 3  # same statement N times in one request
+
+    # Extracted BioCalc_EngS.xlsx sheets (formula evaluator)
+    SPREADSHEET_DATA_DIR: str = "extracted_data"
     
     class Config:
         env_file = ".env"
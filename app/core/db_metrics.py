@@ -0,0 +1,152 @@
+"""
+Per-request database instrumentation.
+
+SQLAlchemy cursor events on the engine count the statements and the time
+spent in the database for the request being served (tracked in a
+ContextVar, which FastAPI propagates to the threadpool running sync
+routes/dependencies). The same SQL text executed several times in one
+request is flagged as an N+1 candidate. Totals are aggregated per route
+for GET /admin/metrics/db.
+"""
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+@dataclass
+class RequestQueryStats:
+    statements: int = 0
+    db_time: float = 0.0  # seconds
+    by_statement: Counter = field(default_factory=Counter)
+
+    def n_plus_one(self, threshold: int) -> List[str]:
+        """Statements repeated at least `threshold` times"""
+        return [sql for sql, count in self.by_statement.most_common() if count >= threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("db_request_stats", default=None)
+
+
+def start_request() -> RequestQueryStats:
+    stats = RequestQueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _record(conn, statement: str) -> None:
+    started = conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_time += time.perf_counter() - started
+    stats.by_statement[statement] += 1
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(conn, statement)
+
+
+def _handle_error(exception_context) -> None:
+    # Statement que falhou: after_cursor_execute não dispara, então o início
+    # empilhado sairia daqui (e a pilha da conexão pooled cresceria para sempre)
+    conn = exception_context.connection
+    if conn is None or not conn.info.get("query_start"):
+        return  # erro ao conectar/antes do before_cursor_execute: nada foi empilhado
+    _record(conn, exception_context.statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registers the cursor and error listeners (idempotent)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def server_timing(stats: RequestQueryStats, total: float, n_plus_one: int = 0) -> str:
+    """Server-Timing header value (durations in ms)"""
+    parts = [
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries"',
+        f"app;dur={max(total - stats.db_time, 0.0) * 1000:.1f}",
+        f"total;dur={total * 1000:.1f}",
+    ]
+    if n_plus_one:
+        parts.append(f'n_plus_one;desc="{n_plus_one} repeated statements"')
+    return ", ".join(parts)
+
+
+class DBMetrics:
+    """Aggregated per-route statement counts and DB time"""
+
+    def __init__(self, max_statements: int = 50):
+        self.max_statements = max_statements
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._n_plus_one: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: RequestQueryStats, total: float, n_plus_one: List[str]) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0, "statements": 0, "max_statements": 0,
+                    "db_time_ms": 0.0, "total_time_ms": 0.0, "n_plus_one_requests": 0,
+                }
+            entry["requests"] += 1
+            entry["statements"] += stats.statements
+            entry["max_statements"] = max(entry["max_statements"], stats.statements)
+            entry["db_time_ms"] += stats.db_time * 1000
+            entry["total_time_ms"] += total * 1000
+            if n_plus_one:
+                entry["n_plus_one_requests"] += 1
+                for sql in n_plus_one:
+                    # Keep the table bounded: new statements only while there is room
+                    if sql in self._n_plus_one or len(self._n_plus_one) < self.max_statements:
+                        self._n_plus_one[sql] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {}
+            for route, entry in sorted(self._routes.items()):
+                requests = entry["requests"]
+                routes[route] = {
+                    **entry,
+                    "db_time_ms": round(entry["db_time_ms"], 3),
+                    "total_time_ms": round(entry["total_time_ms"], 3),
+                    "avg_statements": round(entry["statements"] / requests, 2),
+                    "avg_db_time_ms": round(entry["db_time_ms"] / requests, 3),
+                }
+            n_plus_one = [
+                {"statement": sql, "requests": count}
+                for sql, count in self._n_plus_one.most_common()
+            ]
+        return {
+            "n_plus_one_threshold": settings.DB_METRICS_N_PLUS_ONE_THRESHOLD,
+            "routes": routes,
+            "n_plus_one": n_plus_one,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._n_plus_one.clear()
+
+
+db_metrics = DBMetrics()
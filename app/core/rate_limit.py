@@ -0,0 +1,77 @@
+"""
+In-process token-bucket throttling for the expensive unauthenticated
+endpoints (see app/routers/auth.py).
+
+Each key (client IP, account e-mail) owns a bucket of `capacity` tokens
+refilled continuously at capacity/period per second; a request takes one
+token or is refused with the time until the next one. Buckets live in a
+size-bounded LRU: when it is full the least recently used bucket is
+dropped (it comes back full), so memory stays flat no matter how many
+distinct keys are seen. Limits are per API process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets per key, at most `maxsize` keys (`clock`: time.monotonic)"""
+
+    def __init__(
+        self,
+        capacity: int,
+        period: float,
+        maxsize: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period  # tokens por segundo
+        self.maxsize = maxsize or settings.RATE_LIMIT_MAX_KEYS
+        self.clock = clock
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable) -> Optional[float]:
+        """Takes a token for `key`; None when allowed, else seconds until one is available"""
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(self.capacity), now))
+            tokens = min(float(self.capacity), tokens + (now - updated) * self.rate)
+
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = None
+                self.allowed += 1
+            else:
+                wait = (1.0 - tokens) / self.rate
+                self.limited += 1
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+                self.evicted += 1
+            return wait
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evicted": self.evicted,
+        }
@@ -1,11 +1,16 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.routers import auth, projects, auxiliary, user
+from app.core import db_metrics
+from app.routers import auth, projects, auxiliary, user, admin, jobs
+from app.services.catalog_bundle import get_catalog_bundle
+from app.services.email_outbox import email_sender
+from app.services.factor_catalog import get_factor_catalog
+from app.services.password_hasher import password_hasher
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Schema is managed by Alembic (alembic upgrade head); startup does no DDL
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,11 +30,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.DB_METRICS_ENABLED:
+    @app.middleware("http")
+    async def database_timing(request: Request, call_next):
+        """Statements and DB time of each request (Server-Timing + /admin/metrics/db)"""
+        stats = db_metrics.start_request()
+        started = time.perf_counter()
+        response = await call_next(request)
+        total = time.perf_counter() - started
+
+        n_plus_one = stats.n_plus_one(settings.DB_METRICS_N_PLUS_ONE_THRESHOLD)
+        response.headers["Server-Timing"] = db_metrics.server_timing(stats, total, len(n_plus_one))
+
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "<unmatched>"
+        db_metrics.db_metrics.record(f"{request.method} {path}", stats, total, n_plus_one)
+        return response
+
+
+@app.on_event("startup")
+def load_factor_catalog():
+    """Load emission factor snapshot (and the /auxiliary/catalog bundle) once per worker"""
+    get_factor_catalog()
+    get_catalog_bundle()
+
+
+@app.on_event("startup")
+def start_email_sender():
+    """Outbox de e-mails enviado em segundo plano (conexão SMTP reaproveitada)"""
+    if settings.EMAIL_OUTBOX_SENDER_ENABLED:
+        email_sender.start()
+
+
+@app.on_event("shutdown")
+def stop_email_sender():
+    email_sender.stop()
+
+
+@app.on_event("startup")
+def start_password_hasher():
+    """Processos do bcrypt sobem junto com a API (o primeiro login não paga o spawn)"""
+    password_hasher.start()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(auxiliary.router)
 app.include_router(user.router)
+app.include_router(admin.router)
+app.include_router(jobs.router)
 
 
 @app.get("/")
@@ -1,6 +1,6 @@
 # Models module initialization
 from app.models.user import User
-from app.models.project import Project, ProjectStatus
+from app.models.project import Project, ProjectStatus, round_cbios
 from app.models.biomass_property import BiomassProperty
 from app.models.vehicle_emission_factor import VehicleEmissionFactor
 from app.models.auxiliary import (
@@ -12,11 +12,17 @@ from app.models.auxiliary import (
 from app.models.mut_factor import MUTFactor
 from app.models.biomass_mut_allocation import BiomassMUTAllocation
 from app.models.stationary_combustion import StationaryCombustionEmission
+from app.models.project_dependency import ProjectFactorDependency
+from app.models.factor_alias import FactorAlias
+from app.models.factor_catalog_state import FactorCatalogState
+from app.models.job import Job, JobStatus
+from app.models.email_outbox import EmailMessage, EmailStatus
 
 __all__ = [
     "User",
     "Project",
     "ProjectStatus",
+    "round_cbios",
     "BiomassProperty",
     "VehicleEmissionFactor",
     "GWPFactor",
@@ -25,5 +31,12 @@ __all__ = [
     "IndustrialInputEmission",
     "MUTFactor",
     "BiomassMUTAllocation",
-    "StationaryCombustionEmission"
+    "StationaryCombustionEmission",
+    "ProjectFactorDependency",
+    "FactorAlias",
+    "FactorCatalogState",
+    "Job",
+    "JobStatus",
+    "EmailMessage",
+    "EmailStatus"
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
 from app.core.database import Base
 
 
@@ -41,3 +41,7 @@ class IndustrialInputEmission(Base):
     input_type = Column(String)  # electricity, fuel, water, chemical, etc
     emission_factor = Column(Float, nullable=False)  # kg CO2 eq/unit
     unit = Column(String)  # kWh, L, m³, kg, etc
+    
+    __table_args__ = (
+        Index("ix_industrial_input_emissions_type_name", "input_type", "input_name"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
 from app.core.database import Base
 
 class BiomassMUTAllocation(Base):
@@ -16,3 +16,7 @@ class BiomassMUTAllocation(Base):
     allocation_product = Column(Float, default=0.0) # % (0-100 or 0-1)
     coproduct_name = Column(String) # e.g. "Resíduos de galhos e folhas"
     allocation_coproduct = Column(Float, default=0.0) # %
+    
+    __table_args__ = (
+        Index("ix_biomass_mut_allocations_name_stage", "biomass_name", "lifecycle_stage"),
+    )
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+
+class EmailStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailMessage(Base):
+    """
+    Outbox of e-mails to send (app/services/email_outbox.py). Requests only
+    insert rows; the background sender delivers them over a pooled SMTP
+    connection and re-schedules transient failures via next_attempt_at.
+    """
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_content = Column(Text, nullable=False)
+    
+    status = Column(SQLEnum(EmailStatus), nullable=False, default=EmailStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String)  # sender que está enviando
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Fila: próximos PENDING por next_attempt_at
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
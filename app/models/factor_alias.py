@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Index
+from app.core.database import Base
+
+
+class FactorAlias(Base):
+    """
+    Canonical lookup key -> factor row, resolved once at seed time.
+    term/input_type are the search terms used by the calculation
+    (FUEL_SEARCH_TERMS / INPUT_SEARCH_TERMS); input_type is "" when the
+    lookup does not filter by type.
+    """
+    __tablename__ = "factor_aliases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    factor_table = Column(String, nullable=False)  # industrial_input_emissions | stationary_combustion_emissions
+    term = Column(String, nullable=False)  # e.g. "Diesel"
+    input_type = Column(String, nullable=False, default="")  # e.g. "fuel"
+    factor_id = Column(Integer, nullable=False)  # id of the resolved row
+    factor_name = Column(String, nullable=False)  # input_name / fuel_name of the resolved row
+    
+    __table_args__ = (
+        Index("ux_factor_aliases_lookup", "factor_table", "term", "input_type", unique=True),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+
+class FactorCatalogState(Base):
+    """
+    Factor catalog version currently published (single row, id = 1).
+    Written by reload_factor_catalog after a reseed or factor change; every
+    process compares it with its in-memory snapshot (see
+    app/services/factor_catalog.py) and rebuilds the snapshot when it differs.
+    """
+    __tablename__ = "factor_catalog_state"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(String, nullable=False)  # FactorCatalog.version
+    revision = Column(Integer, nullable=False, default=1)  # +1 a cada versão publicada
+    published_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, DateTime, Index, Enum as SQLEnum
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """
+    Background job (see app/services/job_queue.py). Workers claim QUEUED
+    rows whose run_at has passed; failed attempts are re-queued with a
+    later run_at until max_attempts.
+    """
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # nome do handler (ex.: "recalculate_projects")
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # quem pediu (None = sistema)
+    
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=1)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # não antes de (backoff)
+    locked_by = Column(String)  # worker que está executando
+    locked_at = Column(DateTime)
+    
+    result = Column(JSON)
+    error = Column(Text)  # último erro
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Fila: próximos QUEUED por run_at
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
 from app.core.database import Base
 
 class MUTFactor(Base):
@@ -9,3 +9,7 @@ class MUTFactor(Base):
     state = Column(String, index=True, nullable=False)
     culture = Column(String, nullable=False)  # Pinus, Eucalipto, Amendoim
     emission_factor = Column(Float, nullable=False)  # tCO2eq/ha/yr or similar normalized factor
+    
+    __table_args__ = (
+        Index("ux_mut_factors_state_culture", "state", "culture", unique=True),
+    )
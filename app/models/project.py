@@ -1,10 +1,23 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
+from typing import Optional
 import enum
+import math
 from app.core.database import Base
 
 
+def round_cbios(value: Optional[float]) -> Optional[int]:
+    """
+    CBIOs as stored in the integer column. Halves round away from zero,
+    like PostgreSQL's float -> integer cast (Python's round() would send
+    them to the even neighbour), so every write path agrees with the DB.
+    """
+    if value is None:
+        return None
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
 class ProjectStatus(str, enum.Enum):
     DRAFT = "Em Rascunho"
     COMPLETED = "Concluído"
@@ -97,10 +110,30 @@ class Project(Base):
     emission_reduction = Column(Float)  # Redução de emissões (%)
     cbios = Column(Integer)  # CBIOs gerados
     cbios_revenue = Column(Float)  # Remuneração estimada (R$)
+    # Versão dos fatores usada nos resultados (parciais ou finais). Coluna nova em
+    # tabela existente: criada pela migração 0001a (ALTER TABLE ... ADD COLUMN)
+    results_catalog_version = Column(String)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Listagem por usuário, mais recentes primeiro (keyset em created_at, id)
+        Index("ix_projects_user_created_id", "user_id", created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="projects")
+    factor_dependencies = relationship(
+        "ProjectFactorDependency",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    
+    @validates("cbios")
+    def _round_cbios(self, key, value):
+        # Coluna inteira: arredonda já na atribuição, como o banco faria,
+        # para a resposta (montada do objeto em memória) bater com o gravado
+        return round_cbios(value)
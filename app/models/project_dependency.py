@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class ProjectFactorDependency(Base):
+    """
+    Reverse index: which factor rows a project's results were computed from.
+    factor_key is the lookup key used by the calculation (e.g. biomass name,
+    "state|culture", fuel search term).
+    """
+    __tablename__ = "project_factor_dependencies"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    factor_table = Column(String, nullable=False)  # e.g. "mut_factors"
+    factor_key = Column(String, nullable=False)  # e.g. "Paraná|Pinus"
+    
+    __table_args__ = (
+        Index("ix_project_factor_dependencies_factor", "factor_table", "factor_key"),
+    )
+    
+    # Relationships
+    project = relationship("Project", back_populates="factor_dependencies")
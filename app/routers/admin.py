@@ -0,0 +1,150 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.database import get_db
+from app.core.db_metrics import db_metrics
+from app.models import User
+from app.routers.auth import get_current_admin_user
+from app.schemas.admin import FactorChangeRequest
+from app.schemas.job import JobResponse
+from app.services.dependency_index import DependencyIndexService
+from app.services.auth_service import claims_cache, principal_cache
+from app.services.factor_catalog import reload_factor_catalog
+from app.services.password_hasher import password_hasher
+from app.services.job_handlers import RECALCULATE_PROJECTS
+from app.services.job_queue import enqueue
+from app.services.recalculation_service import (
+    get_recalculation_status,
+    try_start_recalculation,
+    run_recalculation_in_background,
+    release_recalculation
+)
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post("/recalculate", status_code=status.HTTP_202_ACCEPTED)
+def start_recalculation(
+    background_tasks: BackgroundTasks,
+    change: Optional[FactorChangeRequest] = None,
+    resume: bool = True,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Recarrega os fatores de emissão e recalcula os projetos concluídos
+    
+    Sem corpo recalcula todos; com `factor_table`/`factor_key` recalcula só os
+    projetos que dependem daquele fator. Executa em segundo plano; acompanhe
+    o progresso em GET /admin/recalculate
+    """
+    dependency_keys = None
+    affected_projects = None
+    
+    if change is not None:
+        index = DependencyIndexService(db)
+        try:
+            dependency_keys = index.keys_for_factor(change.factor_table, change.factor_key)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        affected_projects = index.count_affected(dependency_keys)
+    
+    if not try_start_recalculation():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A recalculation is already running"
+        )
+    
+    try:
+        catalog = reload_factor_catalog(db)
+    except Exception:
+        # Sem isso a flag ficaria presa e todo POST seguinte daria 409
+        release_recalculation()
+        raise
+    background_tasks.add_task(run_recalculation_in_background, resume, dependency_keys)
+    
+    return {
+        "message": "Recalculation started",
+        "catalog_version": catalog.version,
+        "affected_projects": affected_projects
+    }
+
+
+@router.post("/recalculate/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_recalculation(
+    change: Optional[FactorChangeRequest] = None,
+    resume: bool = True,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mesma recalculação de POST /admin/recalculate, executada por um worker
+    (scripts/run_worker.py) com novas tentativas em caso de falha;
+    acompanhe em GET /jobs/{id}
+    """
+    dependency_keys = None
+    
+    if change is not None:
+        try:
+            dependency_keys = DependencyIndexService(db).keys_for_factor(change.factor_table, change.factor_key)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    reload_factor_catalog(db)
+    job = enqueue(
+        db, RECALCULATE_PROJECTS,
+        {"resume": resume, "dependency_keys": dependency_keys},
+        user_id=current_user.id
+    )
+    db.commit()
+    
+    return job
+
+
+@router.get("/recalculate")
+def recalculation_status(current_user: User = Depends(get_current_admin_user)):
+    """Progresso da última recalculação iniciada neste worker"""
+    progress = get_recalculation_status()
+    
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No recalculation has been started"
+        )
+    
+    return progress
+
+
+@router.get("/metrics/db")
+def database_metrics(current_user: User = Depends(get_current_admin_user)):
+    """
+    Queries e tempo de banco agregados por rota (desde o início deste worker)
+
+    `n_plus_one` lista os SQLs repetidos na mesma requisição (candidatos a N+1)
+    """
+    return db_metrics.snapshot()
+
+
+@router.delete("/metrics/db", status_code=status.HTTP_204_NO_CONTENT)
+def reset_database_metrics(current_user: User = Depends(get_current_admin_user)):
+    """Zera as métricas agregadas deste worker"""
+    db_metrics.reset()
+
+
+@router.get("/metrics/password-hashing")
+def password_hashing_metrics(current_user: User = Depends(get_current_admin_user)):
+    """
+    Pool do bcrypt deste worker: fila (pending/queued), rejeitadas com 503 e
+    tempos médios de espera e de cálculo
+    """
+    return password_hasher.snapshot()
+
+
+@router.get("/metrics/auth")
+def auth_cache_metrics(current_user: User = Depends(get_current_admin_user)):
+    """Acertos/faltas dos caches de autenticação deste worker (claims JWT e usuários)"""
+    return {
+        "jwt_claims": {"size": len(claims_cache), "hits": claims_cache.hits, "misses": claims_cache.misses},
+        "principals": principal_cache.stats,
+    }
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.config import settings
+from app.core.rate_limit import TokenBucketLimiter
 from app.models import User
 from app.schemas.user import (
     UserCreate, 
@@ -15,37 +20,93 @@ from app.schemas.user import (
     PasswordReset
 )
 from app.services.auth_service import (
-    get_password_hash,
-    authenticate_user,
-    create_access_token,
-    get_current_user_email,
+    create_user_access_token,
+    decode_access_token,
     create_password_reset_token,
-    verify_password_reset_token
+    verify_password_reset_token,
+    principal_cache
 )
 
 
+from app.services.email_outbox import email_sender
 from app.services.email_service import EmailService
+from app.services.password_hasher import password_hasher
+from app.services.user_service import AsyncUserService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 bearer_scheme = HTTPBearer()
 
+# Token buckets por IP e por conta (ver app/core/rate_limit.py)
+login_ip_limiter = TokenBucketLimiter(settings.LOGIN_RATE_PER_IP, settings.LOGIN_RATE_PERIOD)
+login_account_limiter = TokenBucketLimiter(settings.LOGIN_RATE_PER_ACCOUNT, settings.LOGIN_RATE_PERIOD)
+forgot_password_ip_limiter = TokenBucketLimiter(
+    settings.FORGOT_PASSWORD_RATE_PER_IP, settings.FORGOT_PASSWORD_RATE_PERIOD
+)
+forgot_password_account_limiter = TokenBucketLimiter(
+    settings.FORGOT_PASSWORD_RATE_PER_ACCOUNT, settings.FORGOT_PASSWORD_RATE_PERIOD
+)
+register_ip_limiter = TokenBucketLimiter(settings.REGISTER_RATE_PER_IP, settings.REGISTER_RATE_PERIOD)
+
+
+def throttle(
+    request: Request,
+    ip_limiter: TokenBucketLimiter,
+    account_limiter: Optional[TokenBucketLimiter] = None,
+    account: Optional[str] = None
+) -> None:
+    """
+    429 with Retry-After when the client IP or the account is over its limit.
+
+    Called first thing in the handler, before any bcrypt or e-mail work.
+    The IP is the connection peer (run uvicorn with --proxy-headers behind
+    a proxy so it is the real client).
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    
+    checks = [(ip_limiter, request.client.host if request.client else "unknown")]
+    if account_limiter is not None and account:
+        checks.append((account_limiter, account.strip().lower()))
+    
+    for limiter, key in checks:
+        wait = limiter.hit(key)
+        if wait is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    """Dependency to get current authenticated user"""
-    email = get_current_user_email(credentials.credentials)
+    """
+    Dependency to get current authenticated user
+
+    Usuários recentes vêm do principal_cache (sem consulta ao banco)
+    """
+    claims = decode_access_token(credentials.credentials)
     
-    if email is None:
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    key = principal_cache.key(claims)
+    user = principal_cache.get(key)
+    if user is not None:
+        return user
+    
+    generation = principal_cache.generation
+    if claims.get("uid") is not None:
+        user = await AsyncUserService.get_user_by_id(db, int(claims["uid"]))
+    else:
+        user = await AsyncUserService.get_user_by_email(db, claims["sub"])
     
     if user is None:
         raise HTTPException(
@@ -53,46 +114,42 @@ async def get_current_user(
             detail="User not found"
         )
     
+    principal_cache.put(key, user, generation)
     return user
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    
-    if existing_user:
+def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency that only lets through users listed in ADMIN_EMAILS"""
+    if current_user.email not in settings.ADMIN_EMAILS:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    
-    new_user = User(
-        name=user_data.name,
-        email=user_data.email,
-        hashed_password=hashed_password,
-        company_name=user_data.company_name,
-        cnpj=user_data.cnpj    
-    )
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
+    return current_user
+
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register(
+    user_data: UserCreate,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Register a new user (bcrypt no pool do password_hasher)"""
+    throttle(http_request, register_ip_limiter)
+    return await AsyncUserService.create_user(db, user_data)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login and get access token"""
-    user = authenticate_user(db, login_data.email, login_data.password)
+    throttle(http_request, login_ip_limiter, login_account_limiter, login_data.email)
+    
+    user = await AsyncUserService.authenticate(db, login_data.email, login_data.password)
     
     if not user:
         raise HTTPException(
@@ -102,10 +159,7 @@ def login(
         )
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email},
-        expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -120,9 +174,17 @@ def logout(current_user: User = Depends(get_current_user)):
 @router.post("/forgot-password")
 def forgot_password(
     request: PasswordResetRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
-    """Request password reset"""
+    """
+    Request password reset
+    
+    O e-mail vai para o outbox e é enviado em segundo plano; a resposta não
+    espera o SMTP
+    """
+    throttle(http_request, forgot_password_ip_limiter, forgot_password_account_limiter, request.email)
+    
     user = db.query(User).filter(User.email == request.email).first()
     
     # Sempre retorna sucesso por segurança (não revela se email existe)
@@ -132,22 +194,18 @@ def forgot_password(
     # Create reset token
     reset_token = create_password_reset_token(user.email)
     
-    # Send email
-    email_sent = EmailService.send_password_reset_email(user.email, reset_token)
-    
-    if not email_sent:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error sending email. Please try again later."
-        )
+    # Queue email
+    EmailService.enqueue_password_reset_email(db, user.email, reset_token)
+    db.commit()
+    email_sender.wake()
     
     return {"message": "If the email exists, a password reset link has been sent"}
 
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     request: PasswordReset,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reset password with token"""
     email = verify_password_reset_token(request.token)
@@ -158,7 +216,7 @@ def reset_password(
             detail="Invalid or expired token"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    user = await AsyncUserService.get_user_by_email(db, email)
     
     if not user:
         raise HTTPException(
@@ -167,7 +225,8 @@ def reset_password(
         )
     
     # Update password
-    user.hashed_password = get_password_hash(request.new_password)
-    db.commit()
+    user.hashed_password = await password_hasher.hash(request.new_password)
+    await db.commit()
+    principal_cache.invalidate(user.id, user.email)
     
     return {"message": "Password successfully reset"}
\ No newline at end of file
@@ -1,18 +1,67 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models import BiomassProperty, VehicleEmissionFactor, GWPFactor
 from app.schemas.auxiliary import (
     BiomassPropertyResponse,
     VehicleEmissionFactorResponse,
-    GWPFactorResponse
+    GWPFactorResponse,
+    LinearCoefficientsResponse
+)
+from app.services.catalog_bundle import get_catalog_bundle, if_none_match, preferred_coding
+from app.services.factor_catalog import get_factor_catalog
+from app.services.linear_coefficients import (
+    FEATURES,
+    PER_PROCESSED_FEATURES,
+    LinearCalculationService,
+    cbio_constants
 )
 
 router = APIRouter(prefix="/auxiliary", tags=["Auxiliary Data"])
 
 
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+@router.get("/catalog")
+def get_catalog(
+    request: Request,
+    version: Optional[str] = Query(None, description="Versão já conhecida (URL versionada, cache immutable)")
+):
+    """
+    Todas as tabelas de referência num único payload versionado
+
+    Biomassas, veículos, GWP, fatores e estados de MUT, alocações, insumos
+    industriais, combustíveis e modais, mais as listas dos dropdowns. Servido
+    de memória já comprimido (br/gzip), com ETag/If-None-Match (304) e
+    Cache-Control longo; não consulta o banco enquanto o catálogo de fatores
+    não for recarregado. Com `?version=` igual à atual a resposta é immutable.
+    """
+    bundle = get_catalog_bundle()
+    coding = preferred_coding(request.headers.get("accept-encoding"), bundle.bodies)
+
+    if version == bundle.version:
+        cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}"
+    headers = {
+        "ETag": bundle.etag(coding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+        "X-Catalog-Version": bundle.version,
+    }
+
+    if if_none_match(request.headers.get("if-none-match"), bundle.etags):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=bundle.bodies[coding], media_type="application/json", headers=headers)
+
+
 @router.get("/biomass-properties", response_model=List[BiomassPropertyResponse])
 def get_biomass_properties(db: Session = Depends(get_db)):
     """Get all biomass properties"""
@@ -32,3 +81,39 @@ def get_gwp_factors(db: Session = Depends(get_db)):
     """Get all GWP factors"""
     gwp_factors = db.query(GWPFactor).all()
     return gwp_factors
+
+
+@router.get("/coefficients", response_model=LinearCoefficientsResponse)
+def get_linear_coefficients(
+    biomass_type: str,
+    state: Optional[str] = None,
+    vehicle: Optional[str] = Query(None, description="agr_transport_vehicle"),
+    db: Session = Depends(get_db)
+):
+    """
+    Coeficientes lineares do cálculo para uma configuração
+
+    Para biomassa, estado e veículo fixos (e a versão atual dos fatores),
+    cada fase é um produto escalar entre estes coeficientes e as entradas
+    do projeto.
+    """
+    service = LinearCalculationService(catalog=get_factor_catalog(db))
+    try:
+        coefficients = service.coefficients(biomass_type, state, vehicle)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    return {
+        "biomass_type": coefficients.biomass_type,
+        "state": coefficients.state,
+        "vehicle": coefficients.vehicle,
+        "catalog_version": coefficients.catalog_version,
+        "pci": coefficients.pci,
+        "features": list(FEATURES),
+        "per_processed_features": list(PER_PROCESSED_FEATURES),
+        "coefficients": coefficients.as_dict(),
+        **cbio_constants()
+    }
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models import Job, User
+from app.routers.auth import get_current_user
+from app.schemas.job import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Status de um job em segundo plano (queued, running, succeeded, failed)
+    
+    Visível para quem o criou e para administradores
+    """
+    job = await db.get(Job, job_id)
+    
+    if not job or (job.user_id != current_user.id and current_user.email not in settings.ADMIN_EMAILS):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return job
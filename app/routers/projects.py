@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Union
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Union
 
-from app.core.database import get_db
-from app.models import User
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.models import User, ProjectStatus
 from app.schemas.project_steps import (
     ProjectStep0, ProjectStep1, ProjectStep2, ProjectStep3,
     ProjectStep4, ProjectStep5, ProjectStep6, ProjectStep7,
     ProjectStep8, ProjectStep9, ProjectStep10,
-    ProjectStepResponse, ProjectProgressResponse
+    ProjectStepResponse, ProjectProgressResponse, ProjectStepsBatch
 )
-from app.schemas.project import ProjectResponse, ProjectListItem
-from app.services.project_step_service import ProjectStepService
-from app.services.project_service import ProjectService
+from app.schemas.project import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListItem, ProjectPreview, ProjectPreviewResponse,
+    ProjectImportReport
+)
+from app.services.project_export_service import MEDIA_TYPES, ExportFormat, ProjectExportService
+from app.schemas.job import JobResponse
+from app.services.job_handlers import IMPORT_PROJECTS
+from app.services.job_queue import enqueue
+from app.services.project_import_service import ProjectImportService, file_extension
+from app.services.preview_service import PreviewService
+from app.services.project_step_service import AsyncProjectStepService
+from app.services.project_service import AsyncProjectService
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/projects", tags=["Projects - Step by Step"])
@@ -23,18 +38,18 @@ router = APIRouter(prefix="/projects", tags=["Projects - Step by Step"])
 # ============================================================================
 
 @router.post("/", response_model=ProjectStepResponse, status_code=status.HTTP_201_CREATED)
-def create_project_step0(
+async def create_project_step0(
     step_data: ProjectStep0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Step 0: Criar projeto inicial com dados de identificação
     
     Retorna projeto em modo DRAFT com current_step = 0
     """
-    service = ProjectStepService(db)
-    project = service.create_project_step0(step_data, current_user.id)
+    service = AsyncProjectStepService(db)
+    project = await service.create_project_step0(step_data, current_user.id)
     
     return {
         "id": project.id,
@@ -50,12 +65,12 @@ def create_project_step0(
 # ============================================================================
 
 @router.put("/{project_id}/step/{step}", response_model=ProjectStepResponse)
-def update_project_step(
+async def update_project_step(
     project_id: int,
     step: int,
     step_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Rota dinâmica para atualizar qualquer step (1-10)
@@ -96,21 +111,7 @@ def update_project_step(
             detail=str(e)
         )
 
-    service = ProjectStepService(db)
-    
-    # Mapear step para método correto
-    step_methods = {
-        1: service.update_step1,
-        2: service.update_step2,
-        3: service.update_step3,
-        4: service.update_step4,
-        5: service.update_step5,
-        6: service.update_step6,
-        7: service.update_step7,
-        8: service.update_step8,
-        9: service.update_step9,
-        10: service.update_step10
-    }
+    service = AsyncProjectStepService(db)
     
     # Mensagens por step
     step_messages = {
@@ -127,80 +128,291 @@ def update_project_step(
     }
     
     # Executar método do step
-    update_method = step_methods[step]
-    project = update_method(project_id, current_user.id, validated_data)
+    project = await service.update_step_number(project_id, current_user.id, step, validated_data)
     
     return {
         "id": project.id,
         "name": project.name,
         "status": project.status.value,
         "current_step": project.current_step,
+        "carbon_intensity": project.carbon_intensity,
         "message": step_messages[step]
     }
 
 
+@router.put("/{project_id}/steps", response_model=ProjectResponse)
+async def update_project_steps(
+    project_id: int,
+    batch: ProjectStepsBatch,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Salva vários steps de uma vez, numa única transação
+    
+    **Exemplo:** `{"step1": {...}, "step5": {...}, "step10": {...}, "calculate": true}`
+    
+    Todos os payloads são validados juntos; com `calculate` o projeto é
+    finalizado e calculado no mesmo commit (se algo falhar, nada é gravado).
+    """
+    service = AsyncProjectStepService(db)
+    project = await service.update_steps(project_id, current_user.id, batch.steps(), batch.calculate)
+    
+    return project
+
+
 # ============================================================================
 # FINALIZAÇÃO E CÁLCULO
 # ============================================================================
 
 @router.post("/{project_id}/calculate", response_model=ProjectResponse)
-def calculate_project(
+async def calculate_project(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Finaliza projeto e executa cálculos de emissões
     
     Só pode ser chamado após completar todos os steps (current_step >= 10)
     """
-    service = ProjectStepService(db)
-    project = service.finalize_and_calculate(project_id, current_user.id)
+    service = AsyncProjectStepService(db)
+    project = await service.finalize_and_calculate(project_id, current_user.id)
+    
+    return project
+
+
+# ============================================================================
+# PROJETO COMPLETO EM UMA CHAMADA (INTEGRAÇÕES)
+# ============================================================================
+
+@router.post("/full", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+async def create_full_project(
+    project_data: ProjectCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cria um projeto com todos os dados e já calcula os resultados
+    
+    Alternativa ao wizard para integrações (ERP): criação e cálculo na
+    mesma transação; se o cálculo falhar (422) nada é gravado.
+    """
+    service = AsyncProjectService(db)
+    project = await service.create_project(project_data, current_user.id)
+    
+    return project
+
+
+@router.post("/full/batch", response_model=List[ProjectResponse], status_code=status.HTTP_201_CREATED)
+async def create_full_projects(
+    projects_data: List[ProjectCreate],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cria e calcula vários projetos completos numa única transação
+    
+    Cálculo em lote e um único INSERT em batch; se algum projeto não puder
+    ser calculado, responde 422 com o índice de cada falha e nada é gravado.
+    """
+    if len(projects_data) > settings.PROJECT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Máximo de {settings.PROJECT_BATCH_MAX_SIZE} projetos por requisição"
+        )
+    
+    service = AsyncProjectService(db)
+    projects = await service.create_projects(projects_data, current_user.id)
+    
+    return projects
+
+
+@router.post("/import", response_model=ProjectImportReport)
+def import_projects(
+    file: UploadFile = File(..., description="CSV ou XLSX, um projeto por linha, colunas de ProjectCreate"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Importa projetos completos de uma planilha (CSV ou XLSX)
+    
+    O arquivo é lido em streaming e processado em lotes de IMPORT_BATCH_SIZE
+    linhas (validação, cálculo e INSERT em lote, um commit por lote). Linhas
+    inválidas ou sem cálculo possível são listadas em `errors` com o número
+    da linha e não interrompem a importação.
+    """
+    service = ProjectImportService(db)
+    try:
+        report = service.import_file(file.file, file.filename, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return report
+
+
+@router.post("/import/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_projects_import(
+    file: UploadFile = File(..., description="CSV ou XLSX, um projeto por linha, colunas de ProjectCreate"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mesma importação de /projects/import, executada por um worker
+    
+    O arquivo fica em JOB_FILES_DIR até o worker processá-lo; acompanhe
+    em GET /jobs/{id} (o relatório da importação vem em `result`).
+    """
+    try:
+        extension = file_extension(file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    os.makedirs(settings.JOB_FILES_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=settings.JOB_FILES_DIR, suffix=extension, delete=False) as f:
+        shutil.copyfileobj(file.file, f)
+    
+    job = enqueue(
+        db, IMPORT_PROJECTS,
+        {"path": os.path.abspath(f.name), "filename": file.filename, "user_id": current_user.id},
+        user_id=current_user.id,
+        max_attempts=1
+    )
+    db.commit()
+    
+    return job
+
+
+@router.put("/{project_id}", response_model=ProjectResponse)
+async def update_full_project(
+    project_id: int,
+    project_data: ProjectUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Atualiza campos de um projeto (só os enviados) e recalcula na mesma transação
+    """
+    service = AsyncProjectService(db)
+    project = await service.update_project(project_id, current_user.id, project_data)
     
     return project
 
 
+# ============================================================================
+# PRÉ-VISUALIZAÇÃO (WHAT-IF)
+# ============================================================================
+
+@router.post("/preview", response_model=ProjectPreviewResponse)
+def preview_project(
+    project_data: ProjectPreview,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Calcula os resultados de um conjunto de entradas sem criar projeto
+
+    Nada é gravado no banco; resultados iguais são servidos de cache
+    enquanto os fatores de emissão não mudarem.
+    """
+    try:
+        results, _ = PreviewService().preview(project_data.model_dump())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+    return results
+
+
 # ============================================================================
 # CONSULTAS E PROGRESSO
 # ============================================================================
 
 @router.get("/{project_id}/progress", response_model=ProjectProgressResponse)
-def get_project_progress(
+async def get_project_progress(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retorna progresso do projeto
     
     Útil para mostrar barra de progresso no frontend
     """
-    service = ProjectStepService(db)
-    progress = service.get_project_progress(project_id, current_user.id)
+    service = AsyncProjectStepService(db)
+    progress = await service.get_project_progress(project_id, current_user.id)
     
     return progress
 
 
 @router.get("/", response_model=List[ProjectListItem])
-def list_projects(
+async def list_projects(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PROJECT_LIST_PAGE_SIZE, ge=1, le=settings.PROJECT_LIST_MAX_PAGE_SIZE),
+    status_filter: Optional[ProjectStatus] = Query(None, alias="status"),
+    biomass_type: Optional[str] = None,
+    state: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Lista todos os projetos do usuário (incluindo drafts)"""
-    service = ProjectService(db)
-    projects = service.list_user_projects(current_user.id)
+    """
+    Lista os projetos do usuário (incluindo drafts), mais recentes primeiro
+    
+    Paginado por cursor: se houver mais projetos, o header `X-Next-Cursor`
+    traz o valor a passar em `?cursor=` para a próxima página.
+    Filtros opcionais: status, biomass_type, state
+    """
+    service = AsyncProjectService(db)
+    projects, next_cursor = await service.list_user_projects(
+        current_user.id, limit, cursor,
+        status=status_filter, biomass_type=biomass_type, state=state
+    )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return projects
 
 
+@router.get("/export", response_class=StreamingResponse)
+def export_projects(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    status_filter: Optional[ProjectStatus] = Query(None, alias="status"),
+    biomass_type: Optional[str] = None,
+    state: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exporta os projetos do usuário com entradas e resultados (csv, ndjson ou xlsx)
+    
+    A resposta é gerada em streaming a partir de um cursor no servidor, sem
+    carregar todos os projetos em memória. As colunas usam os nomes de
+    ProjectCreate (o CSV/XLSX pode ser reimportado em /projects/import).
+    Filtros opcionais: status, biomass_type, state
+    """
+    service = ProjectExportService()
+    content = service.stream(
+        export_format, current_user.id,
+        status=status_filter, biomass_type=biomass_type, state=state
+    )
+    
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="projetos.{export_format.value}"'}
+    )
+
+
 @router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(
+async def get_project(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retorna detalhes completos do projeto"""
-    service = ProjectService(db)
-    project = service.get_project(project_id, current_user.id)
+    service = AsyncProjectService(db)
+    project = await service.get_project(project_id, current_user.id)
     
     if not project:
         raise HTTPException(
@@ -212,14 +424,14 @@ def get_project(
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
+async def delete_project(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deleta um projeto"""
-    service = ProjectService(db)
-    success = service.delete_project(project_id, current_user.id)
+    service = AsyncProjectService(db)
+    success = await service.delete_project(project_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -1,17 +1,17 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserResponse
-from app.services.user_service import UserService
+from app.services.user_service import AsyncUserService
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
+async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current authenticated user information"""
@@ -19,10 +19,10 @@ def get_current_user_info(
 
 
 @router.put("/me", response_model=UserResponse)
-def update_current_user(
+async def update_current_user(
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current user information"""
-    return UserService.update_user(db, current_user.id, user_data)
\ No newline at end of file
+    return await AsyncUserService.update_user(db, current_user.id, user_data)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class FactorChangeRequest(BaseModel):
+    """Factor row that was edited (recalculates only the projects that depend on it)"""
+    factor_table: str = Field(..., description="Tabela do fator, ex.: mut_factors")
+    factor_key: str = Field(
+        ...,
+        description="Chave natural da linha, ex.: 'Paraná|Pinus' (mut_factors) ou 'Diesel A (B0)' (stationary_combustion_emissions)"
+    )
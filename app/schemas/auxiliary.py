@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class BiomassPropertyResponse(BaseModel):
@@ -28,3 +28,21 @@ class GWPFactorResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class LinearCoefficientsResponse(BaseModel):
+    """
+    Emissões por fase = Σ coefficients[fase][feature] * feature
+    (features em per_processed_features são divididas por biomass_processed)
+    """
+    biomass_type: str
+    state: Optional[str] = None
+    vehicle: Optional[str] = None
+    catalog_version: str
+    pci: float
+    features: List[str]
+    per_processed_features: List[str]
+    coefficients: Dict[str, Dict[str, float]]
+    fossil_reference: float
+    product_pci_mj_kg: float
+    cbio_price: float
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class ProjectBase(BaseModel):
@@ -76,10 +76,9 @@ class ProjectCreate(ProjectBase):
     pass
 
 
-class ProjectUpdate(BaseModel):
+class ProjectUpdate(ProjectBase):
+    """Partial update: only the fields sent are applied (exclude_unset)"""
     name: Optional[str] = None
-    # All other fields optional for updates
-    # (simplified for brevity - in production, include all fields as Optional)
 
 
 class ProjectResults(BaseModel):
@@ -95,6 +94,39 @@ class ProjectResults(BaseModel):
     cbios_revenue: float = Field(..., description="Remuneração estimada (R$)")
 
 
+class ProjectImportError(BaseModel):
+    row: int = Field(..., description="Linha do arquivo (o cabeçalho é a linha 1)")
+    errors: List[str]
+
+
+class ProjectImportReport(BaseModel):
+    """Result of a CSV/XLSX import"""
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ProjectImportError] = Field(..., description="Linhas ignoradas (até IMPORT_MAX_ERRORS)")
+
+
+class ProjectPreview(ProjectBase):
+    """Inputs for a what-if estimate (nothing is persisted)"""
+    name: Optional[str] = None
+
+
+class ProjectPreviewResponse(BaseModel):
+    """Estimated results for a ProjectPreview"""
+    pci: float
+    carbon_intensity: float = Field(..., description="Intensidade de carbono (kg CO₂eq/MJ)")
+    agricultural_emissions: float
+    industrial_emissions: float
+    transport_emissions: float
+    use_emissions: float
+    efficiency_note: float = Field(..., description="Nota de eficiência")
+    emission_reduction: float = Field(..., description="Redução de emissões (%)")
+    cbios: float = Field(..., description="CBIOs gerados")
+    cbios_revenue: float = Field(..., description="Remuneração estimada (R$)")
+    catalog_version: str = Field(..., description="Versão dos fatores de emissão usados")
+
+
 class ProjectResponse(ProjectBase):
     id: int
     user_id: int
@@ -124,7 +156,7 @@ class ProjectListItem(BaseModel):
     """Simplified project for listing"""
     id: int
     name: str
-    biomass_type: str
+    biomass_type: Optional[str] = None  # Drafts antes do Step 1
     status: str
     current_step: int  # Progresso (0-10)
     carbon_intensity: Optional[float] = None
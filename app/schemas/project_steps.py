@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Dict, Optional
 
 
 # ============================================================================
@@ -112,6 +112,29 @@ class ProjectStep10(BaseModel):
     production_volume: float = Field(..., gt=0, description="Volume de produção elegível (t/ano)")
 
 
+class ProjectStepsBatch(BaseModel):
+    """PUT /projects/{id}/steps: qualquer subconjunto dos steps 1-10 numa única transação"""
+    step1: Optional[ProjectStep1] = None
+    step2: Optional[ProjectStep2] = None
+    step3: Optional[ProjectStep3] = None
+    step4: Optional[ProjectStep4] = None
+    step5: Optional[ProjectStep5] = None
+    step6: Optional[ProjectStep6] = None
+    step7: Optional[ProjectStep7] = None
+    step8: Optional[ProjectStep8] = None
+    step9: Optional[ProjectStep9] = None
+    step10: Optional[ProjectStep10] = None
+    calculate: bool = Field(False, description="Finaliza e calcula após salvar (exige current_step = 10)")
+    
+    def steps(self) -> Dict[int, BaseModel]:
+        """Step number -> payload, só os enviados"""
+        return {
+            number: getattr(self, f"step{number}")
+            for number in range(1, 11)
+            if getattr(self, f"step{number}") is not None
+        }
+
+
 # ============================================================================
 # RESPONSE SCHEMAS
 # ============================================================================
@@ -122,6 +145,7 @@ class ProjectStepResponse(BaseModel):
     name: str
     status: str
     current_step: int
+    carbon_intensity: Optional[float] = Field(None, description="Intensidade de carbono parcial (kg CO₂eq/MJ)")
     message: str = "Step salvo com sucesso"
     
     class Config:
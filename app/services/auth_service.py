@@ -1,22 +1,11 @@
-from passlib.context import CryptContext
+import hashlib
+import time
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
 from app.models import User
+from app.core.cache import TTLCache
 from app.core.config import settings
-from typing import Optional
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+from typing import Any, Callable, Dict, Hashable, Optional
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -34,27 +23,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user"""
-    user = db.query(User).filter(User.email == email).first()
+def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+    """Access token for `user`: e-mail in "sub" plus the stable id in "uid" (cache key)"""
+    return create_access_token(data={"sub": user.email, "uid": user.id}, expires_delta=expires_delta)
+
+
+# Claims de tokens já verificados: sha256(token) -> claims, até o "exp" do token
+claims_cache = TTLCache(settings.JWT_CLAIMS_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verified claims of an access token; None when invalid or expired
+
+    A token seen before is served from claims_cache, skipping the signature
+    check and JSON parsing; the entry expires at the token's own "exp"
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = claims_cache.get(key)
+    if payload is not None:
+        return payload
     
-    if not user:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
         return None
-    
-    if not verify_password(password, user.hashed_password):
+    if payload.get("sub") is None:
         return None
     
-    return user
+    if payload.get("exp") is not None:
+        claims_cache.put(key, payload, ttl=payload["exp"] - time.time())
+    return payload
 
 
 def get_current_user_email(token: str) -> Optional[str]:
     """Get current user email from JWT token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        return email
-    except JWTError:
-        return None
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
 
 def create_password_reset_token(email: str) -> str:
     """Create password reset token"""
@@ -77,3 +82,59 @@ def verify_password_reset_token(token: str) -> str | None:
         return email
     except JWTError:
         return None
+
+
+class PrincipalCache:
+    """
+    Users resolved by get_current_user, kept for AUTH_USER_CACHE_TTL seconds
+    so an authenticated request does not need a query before its real work.
+
+    Keyed by the token's "uid" claim (tokens issued before it existed fall
+    back to the "sub" e-mail). Values are column snapshots; hits return a
+    fresh, session-less User, so relationships are not available on it.
+    Changes to a user must call invalidate(); other API processes see the
+    change once their entry expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self._cache = TTLCache(maxsize, ttl, clock)
+        self._generation = 0
+
+    @staticmethod
+    def key(claims: Dict[str, Any]) -> Hashable:
+        uid = claims.get("uid")
+        if uid is not None:
+            return ("uid", int(uid))
+        return ("sub", claims["sub"])
+
+    @property
+    def generation(self) -> int:
+        """Read before loading a user; put() ignores the load if an invalidation happened meanwhile"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[User]:
+        values = self._cache.get(key)
+        return User(**values) if values is not None else None
+
+    def put(self, key: Hashable, user: User, generation: int) -> None:
+        if generation != self._generation:
+            return
+        self._cache.put(key, {column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+    def invalidate(self, user_id: int, *emails: Optional[str]) -> None:
+        self._generation += 1
+        self._cache.pop(("uid", user_id))
+        for email in emails:
+            if email:
+                self._cache.pop(("sub", email))
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._cache), "hits": self._cache.hits, "misses": self._cache.misses}
+
+
+principal_cache = PrincipalCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
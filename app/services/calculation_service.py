@@ -1,36 +1,100 @@
 from sqlalchemy.orm import Session
-from app.models import (
-    Project, 
-    BiomassProperty, 
-    VehicleEmissionFactor,
-    MUTFactor,
-    BiomassMUTAllocation,
-    BiomassProductionEmission,
-    IndustrialInputEmission,
-    StationaryCombustionEmission,
-    TransportModalFactor
+from app.models import Project
+from app.services.factor_catalog import (
+    FactorCatalog,
+    BiomassEntry,
+    FUEL_SEARCH_TERMS,
+    current_factor_catalog,
+    get_factor_catalog
 )
 from app.core.config import settings
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+# Fallback factors used when a row is missing from the catalog
+DEFAULT_PRODUCTION_FACTOR = 0.0251  # kg CO2eq/kg biomassa
+DEFAULT_STARCH_FACTOR = 0.5
+DEFAULT_VEHICLE_FACTOR = 0.062  # kg CO2eq/t.km
+DEFAULT_WATER_FACTOR = 0.196
+DEFAULT_LUBRICANT_FACTOR = 3.5
+DEFAULT_CHEMICAL_FACTOR = 2.0
+DEFAULT_ROAD_FACTOR = 0.062  # kg CO2eq/t.km
+
+# Ethanol Anhydrous approx 28.26 MJ/kg (Source: ANP 894/2022)
+PRODUCT_PCI_MJ_KG = 28.26
+CBIO_PRICE = 78.07  # Reference value (R$)
+
+# Phase result column -> Project inputs it reads (steps 1-3 agricultural,
+# 4-7 industrial, 8-9 transport). Every phase scales with the PCI of the
+# biomass chosen in step 1; CBIOs (step 10) are derived from the sum.
+PHASE_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "agricultural_emissions": (
+        "biomass_type", "starch_input", "state",
+        "agr_transport_distance", "agr_transport_vehicle",
+    ),
+    "industrial_emissions": (
+        "biomass_type", "biomass_processed", "elec_grid", "elec_solar", "elec_other",
+    ) + tuple(column for column, _ in FUEL_SEARCH_TERMS) + (
+        "water_consumption", "input_lubricant", "input_chemical",
+    ),
+    "transport_emissions": ("biomass_type", "biomass_processed", "dom_mass", "dom_distance"),
+    "use_emissions": ("biomass_type",),
+}
+PHASE_COLUMNS: Tuple[str, ...] = tuple(PHASE_INPUTS)
+
+# Project inputs read by combine_phase_results on top of the phases: a
+# change only re-derives the final results (CBIOs), no phase is recalculated
+RESULT_INPUTS: Tuple[str, ...] = ("production_volume",)
+
+
+def culture_for_biomass(biomass_name: str) -> str:
+    """Maps a biomass to the MUT culture (Pinus, Eucalipto, Amendoim)"""
+    culture = "Pinus" # Default fallback
+    b_lower = biomass_name.lower()
+    if "eucali" in b_lower: culture = "Eucalipto"
+    elif "amendo" in b_lower: culture = "Amendoim"
+    return culture
+
 
 class CalculationService:
     """Service for calculating emissions and results"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, catalog: Optional[FactorCatalog] = None):
         self.db = db
+        self._catalog = catalog
+    
+    @property
+    def catalog(self) -> FactorCatalog:
+        """Factor snapshot used for every lookup (no queries during calculation)"""
+        if self._catalog is None:
+            self._catalog = get_factor_catalog(self.db)
+        return self._catalog
+    
+    def catalog_for(self, project: Project) -> FactorCatalog:
+        """
+        Catalog to recalculate a stored project with. When its results were
+        stamped with another version, the published version is checked right
+        away: this process may be the one holding the older snapshot, and
+        results from a newer catalog must not be overwritten with older factors.
+        """
+        stamp = project.results_catalog_version
+        if stamp is not None and stamp != self.catalog.version:
+            self._catalog = current_factor_catalog(self.db)
+        return self.catalog
     
     def calculate_project_results(self, project: Project) -> Dict[str, Any]:
         """
         Orchestrates all project calculations
         Returns dictionary with all calculated results
         """
-        # Get biomass PCI
-        biomass = self.db.query(BiomassProperty).filter(
-            BiomassProperty.biomass_name == project.biomass_type
-        ).first()
-        
-        if not biomass:
-            raise ValueError(f"Biomass '{project.biomass_type}' not found in database")
+        return self.combine_phase_results(project, self.calculate_phase_results(project))
+
+    def calculate_phase_results(self, project: Project, phases: Iterable[str] = PHASE_COLUMNS) -> Dict[str, float]:
+        """
+        Emissions (kg CO2eq/MJ) of the requested phases only, plus the biomass PCI
+        Keys are PHASE_COLUMNS entries, so results can be stored as partials
+        """
+        biomass = self._get_biomass(project)
+        phases = set(phases)
         
         # Spreadsheet C37: PCI (kg/MJ/biomass ? No, usually MJ/kg of biomass)
         # We need to know how much BIOMASS is needed per MJ of energy produced/analyzed.
@@ -39,14 +103,33 @@ class CalculationService:
         # Let's calculate the conversion factor: kg of biomass per MJ.
         biomass_kg_per_mj = 1.0 / biomass.pci_mj_kg if biomass.pci_mj_kg and biomass.pci_mj_kg > 0 else 0.0
         
+        results = {"pci": biomass.pci_mj_kg}
+        
         # Calculate emissions by phase
-        agr_emissions = self._calculate_agricultural_emissions(project, biomass_kg_per_mj, biomass)
-        ind_emissions = self._calculate_industrial_emissions(project, biomass_kg_per_mj)
-        trans_emissions = self._calculate_transport_emissions(project, biomass_kg_per_mj)
+        if "agricultural_emissions" in phases:
+            results["agricultural_emissions"] = self._calculate_agricultural_emissions(project, biomass_kg_per_mj, biomass)
+        if "industrial_emissions" in phases:
+            results["industrial_emissions"] = self._calculate_industrial_emissions(project, biomass_kg_per_mj)
+        if "transport_emissions" in phases:
+            results["transport_emissions"] = self._calculate_transport_emissions(project, biomass_kg_per_mj)
         
         # Use Phase Emissions (Step 10)
         # C26 in spreadsheet. Usually biogenic CO2 is neutral, but CH4/N2O might exist.
-        use_emissions = biomass.combustion_emission if biomass.combustion_emission else 0.0
+        if "use_emissions" in phases:
+            results["use_emissions"] = biomass.combustion_emission if biomass.combustion_emission else 0.0
+        
+        return results
+
+    def combine_phase_results(self, project: Project, phase_results: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Final results from the per-phase emissions (constant time)
+        `phase_results` must hold "pci" and every PHASE_COLUMNS entry
+        """
+        biomass = self._get_biomass(project)
+        agr_emissions = phase_results["agricultural_emissions"]
+        ind_emissions = phase_results["industrial_emissions"]
+        trans_emissions = phase_results["transport_emissions"]
+        use_emissions = phase_results["use_emissions"]
         
         # Carbon intensity (C21 = SUM(C23:C26))
         carbon_intensity = agr_emissions + ind_emissions + trans_emissions + use_emissions
@@ -62,11 +145,10 @@ class CalculationService:
         cbios = self._calculate_cbios(project, biomass, efficiency_note)
         
         # Revenue
-        cbio_price = 78.07  # Reference value
-        cbios_revenue = cbios * cbio_price
+        cbios_revenue = cbios * CBIO_PRICE
         
         return {
-            "pci": biomass.pci_mj_kg,
+            "pci": phase_results["pci"],
             "carbon_intensity": carbon_intensity,
             "agricultural_emissions": agr_emissions,
             "industrial_emissions": ind_emissions,
@@ -77,8 +159,25 @@ class CalculationService:
             "cbios": cbios,
             "cbios_revenue": cbios_revenue
         }
-    
-    def _calculate_agricultural_emissions(self, project: Project, kg_per_mj: float, biomass: BiomassProperty) -> float:
+
+    def calculate_projects_results(self, projects: Sequence[Project]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Batch version of calculate_project_results (NumPy kernel)
+        Returns one result dict per project, or None when its biomass is unknown
+        """
+        from app.services.batch_calculation import calculate_batch, columns_from_projects, results_to_records
+
+        results = calculate_batch(columns_from_projects(projects), self.catalog)
+        return results_to_records(results)
+
+    def _get_biomass(self, project: Project) -> BiomassEntry:
+        biomass = self.catalog.get_biomass(project.biomass_type)
+        
+        if not biomass:
+            raise ValueError(f"Biomass '{project.biomass_type}' not found in database")
+        return biomass
+
+    def _calculate_agricultural_emissions(self, project: Project, kg_per_mj: float, biomass: BiomassEntry) -> float:
         """
         Calculates Agricultural Emissions (C23)
         Sum of: Production Impact + MUT Impact + Transport Impact
@@ -89,25 +188,20 @@ class CalculationService:
         
         return production_impact + mut_impact + transport_impact
     
-    def _calc_biomass_production_impact(self, project: Project, kg_per_mj: float, biomass: BiomassProperty) -> float:
+    def _calc_biomass_production_impact(self, project: Project, kg_per_mj: float, biomass: BiomassEntry) -> float:
         """
         E40 Calculation
-        Uses BiomassProductionEmission factors from DB.
+        Uses BiomassProductionEmission factors from the catalog.
         """
         # Lookup emission factor
-        prod_emission = self.db.query(BiomassProductionEmission).filter(
-            BiomassProductionEmission.biomass_name == biomass.biomass_name
-        ).first()
-
-        factor = prod_emission.emission_factor if prod_emission else 0.0251
+        factor = self.catalog.production_emissions.get(biomass.biomass_name, DEFAULT_PRODUCTION_FACTOR)
         
         # Starch impact (Optional)
         starch_impact = 0.0
         if project.starch_input:
-             starch_rec = self.db.query(IndustrialInputEmission).filter(
-                 IndustrialInputEmission.input_name.ilike("%Amido%")
-             ).first()
-             starch_factor = starch_rec.emission_factor if starch_rec else 0.5
+             starch_factor = self.catalog.input_factor("Amido")
+             if starch_factor is None:
+                 starch_factor = DEFAULT_STARCH_FACTOR
              starch_impact = project.starch_input * starch_factor
         
         # Calculation
@@ -117,7 +211,7 @@ class CalculationService:
         
         return impact
 
-    def _calc_mut_impact(self, project: Project, kg_per_mj: float, biomass: BiomassProperty) -> float:
+    def _calc_mut_impact(self, project: Project, kg_per_mj: float, biomass: BiomassEntry) -> float:
         """
         E47 Calculation: Land Use Change
         """
@@ -125,27 +219,15 @@ class CalculationService:
             return 0.0
 
         # Map biomass to culture
-        culture = "Pinus" # Default fallback
-        b_lower = biomass.biomass_name.lower()
-        if "eucali" in b_lower: culture = "Eucalipto"
-        elif "amendo" in b_lower: culture = "Amendoim"
+        culture = culture_for_biomass(biomass.biomass_name)
         
-        mut_rec = self.db.query(MUTFactor).filter(
-            MUTFactor.state == project.state,
-            MUTFactor.culture == culture
-        ).first()
+        emission_val = self.catalog.mut_factors.get((project.state, culture))
         
-        if not mut_rec:
+        if emission_val is None:
             return 0.0
-            
-        emission_val = mut_rec.emission_factor
         
         # Allocation check (BiomassMUTAllocation)
-        alloc_rec = self.db.query(BiomassMUTAllocation).filter(
-            BiomassMUTAllocation.biomass_name == biomass.biomass_name
-        ).first()
-        
-        alloc_percent = alloc_rec.allocation_product if alloc_rec else 1.0
+        alloc_percent = self.catalog.mut_allocations.get(biomass.biomass_name, 1.0)
         if alloc_percent > 1.0: alloc_percent /= 100.0
         
         # Formula: kg/MJ * EmissionFactor * Allocation
@@ -155,11 +237,7 @@ class CalculationService:
         if not project.agr_transport_distance or not project.agr_transport_vehicle:
             return 0.0
             
-        vehicle = self.db.query(VehicleEmissionFactor).filter(
-            VehicleEmissionFactor.vehicle_type == project.agr_transport_vehicle
-        ).first()
-        
-        factor = vehicle.emission_factor if vehicle else 0.062
+        factor = self.catalog.vehicle_factors.get(project.agr_transport_vehicle, DEFAULT_VEHICLE_FACTOR)
         
         # distance (km) * (kg_biomass/MJ / 1000 => ton_biomass/MJ) * factor (kgCO2/t.km)
         return project.agr_transport_distance * (kg_per_mj / 1000.0) * factor
@@ -178,15 +256,7 @@ class CalculationService:
         if not project.biomass_processed or project.biomass_processed == 0:
             return 0.0
             
-        # Helper to get factor
-        def get_factor(name_part):
-            rec = self.db.query(IndustrialInputEmission).filter(
-                IndustrialInputEmission.input_name.ilike(f"%{name_part}%"),
-                IndustrialInputEmission.input_type == "electricity"
-            ).first()
-            return rec.emission_factor if rec else 0.0
-
-        grid_factor = get_factor("Rede")
+        grid_factor = self.catalog.input_factor("Rede", "electricity") or 0.0
         
         total_kwh_emissions = (
             (project.elec_grid or 0) * grid_factor +
@@ -206,33 +276,15 @@ class CalculationService:
         
         total_emission = 0.0
         
-        # List: (qty, search_term, type)
-        fuels = [
-            (project.fuel_diesel, "Diesel", "fuel"),
-            (project.fuel_gasoline, "Gasolina", "fuel"),
-            (project.fuel_ethanol, "Etanol", "fuel"),
-            (project.fuel_biodiesel, "Biodiesel", "fuel"),
-            (project.fuel_gnv, "Gás Natural", "fuel"),
-            (project.fuel_lpg, "GLP", "fuel"),
-            (project.fuel_biomass, "Lenha", "fuel"),
-            (project.fuel_other, "Óleo combustível", "fuel")
-        ]
-        
-        for qty, name_search, ftype in fuels:
+        # List: (Project column, search_term)
+        for column, name_search in FUEL_SEARCH_TERMS:
+            qty = getattr(project, column)
             if qty and qty > 0:
                 # 1. Production Emission (Scope 3)
-                prod_rec = self.db.query(IndustrialInputEmission).filter(
-                    IndustrialInputEmission.input_name.ilike(f"%{name_search}%"),
-                    IndustrialInputEmission.input_type == ftype
-                ).first()
-                prod_factor = prod_rec.emission_factor if prod_rec else 0.0
+                prod_factor = self.catalog.input_factor(name_search, "fuel") or 0.0
                 
                 # 2. Combustion Emission (Scope 1)
-                comb_rec = self.db.query(StationaryCombustionEmission).filter(
-                    StationaryCombustionEmission.fuel_name.ilike(f"%{name_search}%")
-                ).first()
-                
-                comb_factor = comb_rec.co2_eq_emission if comb_rec else 0.0
+                comb_factor = self.catalog.combustion_factor(name_search) or 0.0
                 
                 total_factor = prod_factor + comb_factor
                 total_emission += qty * total_factor
@@ -245,17 +297,18 @@ class CalculationService:
             
         total = 0.0
         if project.water_consumption:
-            w_rec = self.db.query(IndustrialInputEmission).filter(IndustrialInputEmission.input_type=="water").first()
-            w_factor = w_rec.emission_factor if w_rec else 0.196
+            w_factor = self.catalog.water_factor
+            if w_factor is None:
+                w_factor = DEFAULT_WATER_FACTOR
             total += project.water_consumption * w_factor
             
         if project.input_lubricant:
-             l_rec = self.db.query(IndustrialInputEmission).filter(IndustrialInputEmission.input_name.ilike("%lubrificante%")).first()
-             total += project.input_lubricant * (l_rec.emission_factor if l_rec else 3.5)
+             l_factor = self.catalog.input_factor("lubrificante")
+             total += project.input_lubricant * (l_factor if l_factor is not None else DEFAULT_LUBRICANT_FACTOR)
              
         if project.input_chemical:
-             c_rec = self.db.query(IndustrialInputEmission).filter(IndustrialInputEmission.input_name.ilike("%Genérico%")).first()
-             total += project.input_chemical * (c_rec.emission_factor if c_rec else 2.0)
+             c_factor = self.catalog.input_factor("Genérico")
+             total += project.input_chemical * (c_factor if c_factor is not None else DEFAULT_CHEMICAL_FACTOR)
              
         return total * (1.0 / project.biomass_processed) * kg_per_mj
         
@@ -275,8 +328,7 @@ class CalculationService:
         # Assuming truck for now or using TransportModalFactor if we had a field for mode
         # Using simplified factor for now or looking up standard
         
-        modal = self.db.query(TransportModalFactor).filter(TransportModalFactor.modal_type == "road").first()
-        factor = modal.emission_factor if modal else 0.062
+        factor = self.catalog.modal_factors.get("road", DEFAULT_ROAD_FACTOR)
         
         # Emissions = mass(t) * dist(km) * factor
         # Normalized per MJ
@@ -289,7 +341,7 @@ class CalculationService:
              return total_emission * (1.0 / project.biomass_processed) * kg_per_mj
         return 0.0
 
-    def _calculate_cbios(self, project: Project, biomass: BiomassProperty, efficiency_note: float) -> float:
+    def _calculate_cbios(self, project: Project, biomass: BiomassEntry, efficiency_note: float) -> float:
         if not project.production_volume:
             return 0.0
             
@@ -298,11 +350,9 @@ class CalculationService:
         # Use Product PCI in MJ/kg.
         # Example: Ethanol Anhydrous approx 28.26 MJ/kg (Source: ANP 894/2022 from Screenshot)
         # We should ideally lookup this value based on product type, but assuming Ethanol for now.
-        product_pci_mj_kg = 28.26 
-        
         # Tons -> kg
         total_mass_kg = project.production_volume * 1000.0
-        total_energy_mj = total_mass_kg * product_pci_mj_kg
+        total_energy_mj = total_mass_kg * PRODUCT_PCI_MJ_KG
         
         # CBIO = (Energy(MJ) * EfficiencyNote(gCO2/MJ)) / 1,000,000 (g->t) ??
         # EfficiencyNote is in gCO2eq/MJ (or kg? Usually C27 is C20-C21. C21 is gCO2eq/MJ).
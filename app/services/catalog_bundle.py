@@ -0,0 +1,161 @@
+"""
+GET /auxiliary/catalog: every reference table in one versioned payload.
+
+The bundle is serialized once per process and kept in memory as JSON bytes
+plus gzip and (when the brotli package is installed) brotli copies, so a
+request only picks the encoding and compares ETags: no session, no query,
+no serialization. It is rebuilt whenever the factor catalog is reloaded
+(reload_factor_catalog after a reseed or factor change).
+
+`version` is a digest of the JSON body, so every process serving the same
+data hands out the same version and ETags.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import (
+    BiomassProperty,
+    VehicleEmissionFactor,
+    GWPFactor,
+    MUTFactor,
+    BiomassMUTAllocation,
+    BiomassProductionEmission,
+    IndustrialInputEmission,
+    StationaryCombustionEmission,
+    TransportModalFactor
+)
+from app.services.factor_catalog import FactorCatalog, get_factor_catalog
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele só há identity e gzip
+    brotli = None
+
+# Bundle key -> reference table (rows ordered by id)
+CATALOG_TABLES = (
+    ("biomass_properties", BiomassProperty),
+    ("vehicle_emission_factors", VehicleEmissionFactor),
+    ("gwp_factors", GWPFactor),
+    ("mut_factors", MUTFactor),
+    ("biomass_mut_allocations", BiomassMUTAllocation),
+    ("biomass_production_emissions", BiomassProductionEmission),
+    ("industrial_inputs", IndustrialInputEmission),
+    ("stationary_combustion_fuels", StationaryCombustionEmission),
+    ("transport_modals", TransportModalFactor),
+)
+
+
+@dataclass(frozen=True)
+class CatalogBundle:
+    """Serialized catalog and its precompressed copies"""
+    version: str
+    catalog: FactorCatalog  # snapshot it was built with (rebuild when replaced)
+    bodies: Dict[str, bytes]  # content-coding ("identity", "gzip", "br") -> body
+
+    def etag(self, coding: str) -> str:
+        # Um ETag forte por representação
+        return f'"{self.version}"' if coding == "identity" else f'"{self.version}-{coding}"'
+
+    @property
+    def etags(self) -> List[str]:
+        return [self.etag(coding) for coding in self.bodies]
+
+
+def _rows(db: Session, model) -> List[Dict[str, Any]]:
+    columns = model.__table__.columns
+    return [
+        {column.key: getattr(row, column.key) for column in columns}
+        for row in db.query(model).order_by(model.id).all()
+    ]
+
+
+def build_catalog_payload(db: Session) -> Dict[str, Any]:
+    tables = {key: _rows(db, model) for key, model in CATALOG_TABLES}
+    # Listas prontas para os dropdowns do frontend
+    tables["mut_states"] = sorted({row["state"] for row in tables["mut_factors"]})
+    tables["vehicle_types"] = [row["vehicle_type"] for row in tables["vehicle_emission_factors"]]
+    tables["modal_types"] = [row["modal_type"] for row in tables["transport_modals"]]
+    return tables
+
+
+def build_catalog_bundle(db: Session, catalog: FactorCatalog) -> CatalogBundle:
+    tables = {"catalog_version": catalog.version, **build_catalog_payload(db)}
+    content = json.dumps(tables, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    version = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    body = json.dumps(
+        {"version": version, **tables},
+        ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+    bodies = {
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),  # mtime=0: bytes iguais em todo processo
+    }
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body, quality=11)
+
+    return CatalogBundle(version=version, catalog=catalog, bodies=bodies)
+
+
+# Process-wide bundle
+_bundle: Optional[CatalogBundle] = None
+_bundle_lock = threading.Lock()
+
+
+def get_catalog_bundle() -> CatalogBundle:
+    """Current bundle; only touches the database when the factor catalog was (re)loaded"""
+    global _bundle
+
+    catalog = get_factor_catalog()
+    bundle = _bundle
+    if bundle is not None and bundle.catalog is catalog:
+        return bundle
+
+    with _bundle_lock:
+        if _bundle is None or _bundle.catalog is not catalog:
+            from app.core.database import SessionLocal
+
+            session = SessionLocal()
+            try:
+                _bundle = build_catalog_bundle(session, catalog)
+            finally:
+                session.close()
+        return _bundle
+
+
+def preferred_coding(accept_encoding: Optional[str], available) -> str:
+    """Best of br > gzip > identity accepted by the client (q=0 excludes)"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.lower()] = q
+
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+def if_none_match(header: Optional[str], etags: List[str]) -> bool:
+    """True when If-None-Match names any current ETag (weak comparison) or is *"""
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    if "*" in candidates:
+        return True
+    candidates = {tag[2:] if tag.startswith("W/") else tag for tag in candidates}
+    return any(etag in candidates for etag in etags)
@@ -0,0 +1,230 @@
+"""
+Reverse dependency index between projects and factor rows.
+
+For each calculated project we record the lookup keys the calculation used
+(biomass name, "state|culture", vehicle, fuel search terms, ...). A factor
+edit is translated into the same keys, so only the affected projects need
+to be recalculated.
+"""
+from typing import Any, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, false, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    BiomassProperty,
+    BiomassProductionEmission,
+    BiomassMUTAllocation,
+    MUTFactor,
+    VehicleEmissionFactor,
+    TransportModalFactor,
+    IndustrialInputEmission,
+    StationaryCombustionEmission,
+    ProjectFactorDependency,
+    FactorAlias
+)
+from app.services.calculation_service import culture_for_biomass
+from app.services.factor_catalog import FUEL_SEARCH_TERMS, INPUT_SEARCH_TERMS
+
+Dependency = Tuple[str, str]  # (factor_table, factor_key)
+
+BIOMASS_PROPERTIES = BiomassProperty.__tablename__
+PRODUCTION_EMISSIONS = BiomassProductionEmission.__tablename__
+MUT_FACTORS = MUTFactor.__tablename__
+MUT_ALLOCATIONS = BiomassMUTAllocation.__tablename__
+VEHICLE_FACTORS = VehicleEmissionFactor.__tablename__
+MODAL_FACTORS = TransportModalFactor.__tablename__
+INDUSTRIAL_INPUTS = IndustrialInputEmission.__tablename__
+STATIONARY_COMBUSTION = StationaryCombustionEmission.__tablename__
+
+# Factor tables that can be indexed, with the natural key expected in factor_key
+FACTOR_TABLES = {
+    BIOMASS_PROPERTIES: "biomass_name",
+    PRODUCTION_EMISSIONS: "biomass_name",
+    MUT_FACTORS: "state|culture",
+    MUT_ALLOCATIONS: "biomass_name",
+    VEHICLE_FACTORS: "vehicle_type",
+    MODAL_FACTORS: "modal_type",
+    INDUSTRIAL_INPUTS: "input_name",
+    STATIONARY_COMBUSTION: "fuel_name",
+}
+
+# IndustrialInputEmission water factor is looked up by input_type, not by name
+WATER_KEY = "type:water"
+
+
+def input_key(term: str, input_type: Optional[str]) -> str:
+    return f"{term}|{input_type or ''}"
+
+
+def collect_dependencies(project: Any) -> Set[Dependency]:
+    """
+    Lookup keys used by calculate_project_results for this project.
+    Mirrors the conditions of each phase; depends only on the inputs.
+    """
+    deps: Set[Dependency] = set()
+    name = project.biomass_type
+    if not name:
+        return deps
+
+    deps.add((BIOMASS_PROPERTIES, name))
+    deps.add((PRODUCTION_EMISSIONS, name))
+
+    if project.starch_input:
+        deps.add((INDUSTRIAL_INPUTS, input_key("Amido", None)))
+
+    if project.state:
+        deps.add((MUT_FACTORS, f"{project.state}|{culture_for_biomass(name)}"))
+        deps.add((MUT_ALLOCATIONS, name))
+
+    if project.agr_transport_distance and project.agr_transport_vehicle:
+        deps.add((VEHICLE_FACTORS, project.agr_transport_vehicle))
+
+    processed = project.biomass_processed
+    if processed:
+        deps.add((INDUSTRIAL_INPUTS, input_key("Rede", "electricity")))
+
+        for column, term in FUEL_SEARCH_TERMS:
+            qty = getattr(project, column)
+            if qty and qty > 0:
+                deps.add((INDUSTRIAL_INPUTS, input_key(term, "fuel")))
+                deps.add((STATIONARY_COMBUSTION, term))
+
+        if project.water_consumption:
+            deps.add((INDUSTRIAL_INPUTS, WATER_KEY))
+        if project.input_lubricant:
+            deps.add((INDUSTRIAL_INPUTS, input_key("lubrificante", None)))
+        if project.input_chemical:
+            deps.add((INDUSTRIAL_INPUTS, input_key("Genérico", None)))
+
+        if project.dom_mass and project.dom_distance and processed > 0:
+            deps.add((MODAL_FACTORS, "road"))
+
+    return deps
+
+
+class DependencyIndexService:
+    """Maintains and queries the project -> factor dependency table"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_for_project(self, project: Any) -> None:
+        """Replaces the dependency rows of a project (does not commit)"""
+        self.db.execute(
+            delete(ProjectFactorDependency).where(ProjectFactorDependency.project_id == project.id)
+        )
+        self._insert([(project.id, dep) for dep in collect_dependencies(project)])
+
+    def record_for_new_projects(self, projects: Sequence[Any]) -> None:
+        """Dependency rows of just-inserted projects (no delete needed; does not commit)"""
+        self._insert([
+            (project.id, dep)
+            for project in projects
+            for dep in collect_dependencies(project)
+        ])
+
+    def record_missing(self, projects: Sequence[Tuple[int, Any]]) -> int:
+        """
+        Backfills projects that have no dependency rows yet (projects
+        calculated before the index existed). Does not commit.
+        """
+        ids = [project_id for project_id, _ in projects]
+        if not ids:
+            return 0
+
+        indexed = set(self.db.execute(
+            select(ProjectFactorDependency.project_id)
+            .where(ProjectFactorDependency.project_id.in_(ids))
+            .distinct()
+        ).scalars())
+
+        missing = [(project_id, project) for project_id, project in projects if project_id not in indexed]
+        self._insert([
+            (project_id, dep)
+            for project_id, project in missing
+            for dep in collect_dependencies(project)
+        ])
+        return len(missing)
+
+    def _insert(self, rows: Iterable[Tuple[int, Dependency]]) -> None:
+        params = [
+            {"project_id": project_id, "factor_table": table, "factor_key": key}
+            for project_id, (table, key) in rows
+        ]
+        if params:
+            self.db.execute(insert(ProjectFactorDependency), params)
+
+    def keys_for_factor(self, factor_table: str, factor_key: str) -> List[Dependency]:
+        """
+        Translates an edited factor row (table + natural key) into the lookup
+        keys that may resolve to it. Fuel/input rows are translated through
+        factor_aliases; before the aliases are seeded they are matched the
+        same way the catalog does, over-approximating when unsure.
+        """
+        if factor_table not in FACTOR_TABLES:
+            raise ValueError(f"Unknown factor table '{factor_table}'")
+
+        if factor_table in (STATIONARY_COMBUSTION, INDUSTRIAL_INPUTS):
+            keys = self._alias_keys(factor_table, factor_key)
+            if keys is not None:
+                return keys
+
+        if factor_table == STATIONARY_COMBUSTION:
+            name = factor_key.lower()
+            return [(factor_table, term) for _, term in FUEL_SEARCH_TERMS if term.lower() in name]
+
+        if factor_table == INDUSTRIAL_INPUTS:
+            # Types of the edited row(s); unknown if the row was deleted
+            types = set(self.db.execute(
+                select(IndustrialInputEmission.input_type)
+                .where(IndustrialInputEmission.input_name == factor_key)
+            ).scalars()) or None
+
+            name = factor_key.lower()
+            keys = [
+                (factor_table, input_key(term, input_type))
+                for term, input_type in INPUT_SEARCH_TERMS
+                if term.lower() in name and (input_type is None or types is None or input_type in types)
+            ]
+            if types is None or "water" in types:
+                keys.append((factor_table, WATER_KEY))
+            return keys
+
+        return [(factor_table, factor_key)]
+
+    def _alias_keys(self, factor_table: str, factor_key: str) -> Optional[List[Dependency]]:
+        """Exact keys from factor_aliases; None while the table is empty (not seeded)"""
+        if self.db.query(FactorAlias.id).first() is None:
+            return None
+
+        aliases = self.db.execute(
+            select(FactorAlias.term, FactorAlias.input_type)
+            .where(FactorAlias.factor_table == factor_table, FactorAlias.factor_name == factor_key)
+        ).all()
+        if factor_table == STATIONARY_COMBUSTION:
+            return [(factor_table, term) for term, _ in aliases]
+
+        keys = [(factor_table, input_key(term, input_type or None)) for term, input_type in aliases]
+        types = self.db.execute(
+            select(IndustrialInputEmission.input_type)
+            .where(IndustrialInputEmission.input_name == factor_key)
+        ).scalars().all()
+        if not types or "water" in types:
+            keys.append((factor_table, WATER_KEY))
+        return keys
+
+    def affected_projects_subquery(self, keys: Sequence[Dependency]):
+        """SELECT of project ids depending on any of the given keys"""
+        conditions = [
+            (ProjectFactorDependency.factor_table == table) & (ProjectFactorDependency.factor_key == key)
+            for table, key in keys
+        ]
+        stmt = select(ProjectFactorDependency.project_id).distinct()
+        if not conditions:
+            return stmt.where(false())
+        return stmt.where(or_(*conditions))
+
+    def count_affected(self, keys: Sequence[Dependency]) -> int:
+        subquery = self.affected_projects_subquery(keys).subquery()
+        return self.db.execute(select(func.count()).select_from(subquery)).scalar_one()
@@ -0,0 +1,284 @@
+"""
+Background delivery of the email outbox.
+
+Requests only insert EmailMessage rows (EmailService.enqueue_email). A
+sender thread in each API process claims due PENDING rows in batches
+(SELECT ... FOR UPDATE SKIP LOCKED plus a conditional UPDATE, like the job
+queue) and sends them over one SMTP connection that stays open and
+authenticated across messages and batches; it is closed after
+SMTP_IDLE_TIMEOUT without traffic and reopened on demand.
+
+Transient failures (connection drops, timeouts, 4xx replies) are retried
+with exponential backoff up to EMAIL_MAX_ATTEMPTS; permanent ones (5xx)
+fail the message right away.
+"""
+import logging
+import os
+import smtplib
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import Message
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import EmailMessage, EmailStatus
+from app.services.email_service import EmailService
+from app.services.job_queue import retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether sending again later may succeed"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPConnectError):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+
+class SMTPConnection:
+    """One reusable, authenticated SMTP connection (not thread-safe)"""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None
+    ):
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.user = user if user is not None else settings.SMTP_USER
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        self.use_tls = use_tls if use_tls is not None else settings.SMTP_USE_TLS
+        self.timeout = timeout or settings.SMTP_TIMEOUT
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.SMTP_IDLE_TIMEOUT
+        self.connects = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _open(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connects += 1
+        return smtp
+
+    def send(self, message: Message) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._smtp is None:
+            self._smtp = self._open()
+
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # O servidor fechou a conexão ociosa: reconecta uma vez
+            self.close()
+            self._smtp = self._open()
+            self._smtp.send_message(message)
+        finally:
+            # Uma recusa (ex.: 550) também é tráfego: a conexão segue em uso
+            self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+
+class EmailOutboxSender:
+    """Delivers the outbox in batches; start() runs it in a daemon thread"""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        connection: Optional[SMTPConnection] = None,
+        batch_size: Optional[int] = None,
+        sender_id: Optional[str] = None
+    ):
+        self.session_factory = session_factory
+        self.connection = connection or SMTPConnection()
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        self.sender_id = sender_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def claim_batch(self) -> List[Dict[str, Any]]:
+        """Marks up to batch_size due PENDING messages as SENDING for this sender"""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            ids = db.execute(
+                select(EmailMessage.id)
+                .where(EmailMessage.status == EmailStatus.PENDING, EmailMessage.next_attempt_at <= now)
+                .order_by(EmailMessage.next_attempt_at, EmailMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                return []
+
+            db.execute(
+                update(EmailMessage)
+                .where(EmailMessage.id.in_(ids), EmailMessage.status == EmailStatus.PENDING)
+                .values(
+                    status=EmailStatus.SENDING,
+                    attempts=EmailMessage.attempts + 1,
+                    locked_by=self.sender_id,
+                    locked_at=now,
+                )
+            )
+            # Só as linhas que este sender de fato marcou (SQLite não tem SKIP LOCKED)
+            rows = db.execute(
+                select(
+                    EmailMessage.id, EmailMessage.to_email, EmailMessage.subject,
+                    EmailMessage.html_content, EmailMessage.attempts
+                )
+                .where(
+                    EmailMessage.id.in_(ids),
+                    EmailMessage.locked_by == self.sender_id,
+                    EmailMessage.locked_at == now,
+                )
+                .order_by(EmailMessage.id)
+            ).mappings().all()
+            db.commit()
+            return [dict(row) for row in rows]
+        finally:
+            db.close()
+
+    def send_batch(self) -> int:
+        """Sends one batch over the shared connection; returns how many were attempted"""
+        messages = self.claim_batch()
+        if not messages:
+            return 0
+
+        now = datetime.utcnow()
+        outcomes = []
+        for message in messages:
+            outcome = {
+                "id": message["id"],
+                "status": EmailStatus.SENT,
+                "sent_at": now,
+                "next_attempt_at": now,
+                "last_error": None,
+                "locked_by": None,
+                "locked_at": None,
+            }
+            try:
+                self.connection.send(
+                    EmailService.build_message(message["to_email"], message["subject"], message["html_content"])
+                )
+            except Exception as e:
+                transient = is_transient(e)
+                if transient:
+                    # Conexão possivelmente quebrada: a próxima mensagem reconecta
+                    self.connection.close()
+                retry = transient and message["attempts"] < settings.EMAIL_MAX_ATTEMPTS
+                delay = retry_delay(message["attempts"], settings.EMAIL_RETRY_BASE_DELAY, settings.EMAIL_RETRY_MAX_DELAY)
+                outcome.update(
+                    status=EmailStatus.PENDING if retry else EmailStatus.FAILED,
+                    sent_at=None,
+                    next_attempt_at=now + timedelta(seconds=delay) if retry else now,
+                    last_error=f"{type(e).__name__}: {e}",
+                )
+            outcomes.append(outcome)
+
+        db = self.session_factory()
+        try:
+            # UPDATE em lote pela chave primária (executemany)
+            db.execute(update(EmailMessage), outcomes)
+            db.commit()
+        finally:
+            db.close()
+        return len(messages)
+
+    def requeue_stale(self) -> int:
+        """SENDING for longer than EMAIL_LOCK_TIMEOUT (sender died): back to PENDING"""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.EMAIL_LOCK_TIMEOUT)
+            count = db.execute(
+                update(EmailMessage)
+                .where(EmailMessage.status == EmailStatus.SENDING, EmailMessage.locked_at < cutoff)
+                .values(status=EmailStatus.PENDING, locked_by=None, locked_at=None)
+            ).rowcount
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def drain(self) -> int:
+        """Sends everything that is due now; returns how many were attempted"""
+        total = 0
+        while True:
+            sent = self.send_batch()
+            if not sent:
+                return total
+            total += sent
+
+    # Thread de envio -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="email-outbox-sender", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """New messages were committed: send now instead of at the next poll"""
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.connection.close()
+
+    def _run(self) -> None:
+        last_recovery = 0.0
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                if time.monotonic() - last_recovery > settings.EMAIL_LOCK_TIMEOUT / 2:
+                    self.requeue_stale()
+                    last_recovery = time.monotonic()
+                if self.send_batch():
+                    continue
+            except Exception:
+                logger.exception("Email outbox error")
+            self.connection.close_if_idle()
+            self._wake.wait(settings.EMAIL_POLL_INTERVAL)
+
+
+email_sender = EmailOutboxSender()
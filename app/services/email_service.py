@@ -1,22 +1,39 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.models import EmailMessage
+
+
+PASSWORD_RESET_SUBJECT = "Recuperação de Senha - BioCalc"
 
 
 class EmailService:
     
+    @staticmethod
+    def build_message(to_email: str, subject: str, html_content: str) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        msg['To'] = to_email
+        
+        html_part = MIMEText(html_content, 'html')
+        msg.attach(html_part)
+        return msg
+    
+    @staticmethod
+    def enqueue_email(db: Session, to_email: str, subject: str, html_content: str) -> EmailMessage:
+        """Queue an email in the outbox (sent by the background sender; does not commit)"""
+        message = EmailMessage(to_email=to_email, subject=subject, html_content=html_content)
+        db.add(message)
+        return message
+    
     @staticmethod
     def send_email(to_email: str, subject: str, html_content: str) -> bool:
-        """Send email using SMTP"""
+        """Send email using SMTP, synchronously (prefer enqueue_email in requests)"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
-            msg['To'] = to_email
-            
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            msg = EmailService.build_message(to_email, subject, html_content)
             
             # Connect to SMTP server
             with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
@@ -32,6 +49,24 @@ class EmailService:
     @staticmethod
     def send_password_reset_email(email: str, token: str) -> bool:
         """Send password reset email"""
+        return EmailService.send_email(
+            to_email=email,
+            subject=PASSWORD_RESET_SUBJECT,
+            html_content=EmailService.password_reset_html(token)
+        )
+    
+    @staticmethod
+    def enqueue_password_reset_email(db: Session, email: str, token: str) -> EmailMessage:
+        """Queue the password reset email in the outbox (does not commit)"""
+        return EmailService.enqueue_email(
+            db,
+            to_email=email,
+            subject=PASSWORD_RESET_SUBJECT,
+            html_content=EmailService.password_reset_html(token)
+        )
+    
+    @staticmethod
+    def password_reset_html(token: str) -> str:
         reset_link = f"{settings.FRONTEND_URL}/biocalc/reset-password?token={token}"
         
         html_content = f"""
@@ -76,8 +111,4 @@ class EmailService:
         </html>
         """
         
-        return EmailService.send_email(
-            to_email=email,
-            subject="Recuperação de Senha - BioCalc",
-            html_content=html_content
-        )
\ No newline at end of file
+        return html_content
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""
+Snapshot imutável dos fatores de emissão (tabelas de referência).
+
+As tabelas auxiliares mudam raramente (reseed anual), então carregamos tudo
+uma única vez por processo e o CalculationService resolve os fatores por
+lookup em dicionário, sem nenhuma query durante o cálculo.
+
+Cada processo (API, workers) tem o próprio snapshot. reload_factor_catalog
+publica a versão nova em factor_catalog_state; get_factor_catalog compara o
+snapshot com a versão publicada a cada FACTOR_CATALOG_CHECK_INTERVAL
+segundos e o reconstrói quando ela mudou, e current_factor_catalog força essa
+verificação (antes de sobrescrever resultados gravados com outra versão).
+
+Os termos de busca de combustíveis/insumos ("Diesel", "Rede", ...) são
+resolvidos para uma linha exata no seed (tabela factor_aliases); o catálogo
+só faz o join por id, sem ILIKE nem dependência da ordem das linhas.
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import (
+    BiomassProperty,
+    VehicleEmissionFactor,
+    MUTFactor,
+    BiomassMUTAllocation,
+    BiomassProductionEmission,
+    IndustrialInputEmission,
+    StationaryCombustionEmission,
+    TransportModalFactor,
+    FactorAlias,
+    FactorCatalogState
+)
+
+
+# Project fuel columns -> search term used against the factor tables
+FUEL_SEARCH_TERMS: Tuple[Tuple[str, str], ...] = (
+    ("fuel_diesel", "Diesel"),
+    ("fuel_gasoline", "Gasolina"),
+    ("fuel_ethanol", "Etanol"),
+    ("fuel_biodiesel", "Biodiesel"),
+    ("fuel_gnv", "Gás Natural"),
+    ("fuel_lpg", "GLP"),
+    ("fuel_biomass", "Lenha"),
+    ("fuel_other", "Óleo combustível"),
+)
+
+# (search term, input_type) pairs resolved against IndustrialInputEmission
+INPUT_SEARCH_TERMS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("Amido", None),
+    ("Rede", "electricity"),
+    ("lubrificante", None),
+    ("Genérico", None),
+) + tuple((term, "fuel") for _, term in FUEL_SEARCH_TERMS)
+
+INDUSTRIAL_INPUTS = IndustrialInputEmission.__tablename__
+STATIONARY_COMBUSTION = StationaryCombustionEmission.__tablename__
+
+
+@dataclass(frozen=True)
+class BiomassEntry:
+    """Properties of one biomass (BiomassProperty row)"""
+    biomass_name: str
+    pci_mj_kg: float
+    combustion_emission: Optional[float]
+
+
+@dataclass(frozen=True)
+class FactorCatalog:
+    """
+    Immutable, dict-keyed view of every factor used by the calculation.
+    `version` is a digest of the contents, so it is stable across processes.
+    """
+    version: str
+    biomass: Mapping[str, BiomassEntry]
+    production_emissions: Mapping[str, float]  # biomass_name -> kg CO2eq/kg
+    mut_factors: Mapping[Tuple[str, str], float]  # (state, culture) -> factor
+    mut_allocations: Mapping[str, float]  # biomass_name -> allocation_product
+    vehicle_factors: Mapping[str, float]  # vehicle_type -> kg CO2eq/t.km
+    modal_factors: Mapping[str, float]  # modal_type -> kg CO2eq/t.km
+    water_factor: Optional[float]
+    input_factors: Mapping[Tuple[str, Optional[str]], float]  # (term, input_type) -> factor
+    combustion_factors: Mapping[str, float]  # term -> co2_eq_emission
+
+    def get_biomass(self, biomass_name: Optional[str]) -> Optional[BiomassEntry]:
+        return self.biomass.get(biomass_name)
+
+    def input_factor(self, term: str, input_type: Optional[str] = None) -> Optional[float]:
+        return self.input_factors.get((term, input_type))
+
+    def combustion_factor(self, term: str) -> Optional[float]:
+        return self.combustion_factors.get(term)
+
+    def __reduce__(self):
+        # MappingProxyType can't be pickled; ship plain dicts (e.g. to pool workers)
+        state = {
+            name: dict(value) if isinstance(value, MappingProxyType) else value
+            for name, value in self.__dict__.items()
+        }
+        return (_restore_catalog, (state,))
+
+
+def _restore_catalog(state: Dict) -> FactorCatalog:
+    return FactorCatalog(**{
+        name: MappingProxyType(value) if isinstance(value, dict) else value
+        for name, value in state.items()
+    })
+
+
+def _first_by_key(rows, key_fn, value_fn) -> Dict:
+    """Keeps the first row (by id) for each key, like `.first()` did"""
+    result = {}
+    for row in rows:
+        key = key_fn(row)
+        if key not in result:
+            result[key] = value_fn(row)
+    return result
+
+
+def _first_match(rows, term: str, type_fn=None, input_type: Optional[str] = None):
+    """Case-insensitive substring match, equivalent to ILIKE '%term%' ordered by id"""
+    needle = term.lower()
+    for name, row in rows:
+        if needle in name and (input_type is None or type_fn(row) == input_type):
+            return row
+    return None
+
+
+def resolve_factor_aliases(input_rows, combustion_rows) -> List[FactorAlias]:
+    """
+    Resolves every search term to one factor row (rows ordered by id, first
+    substring match wins). Used at seed time to fill factor_aliases, and as
+    fallback when the table is still empty.
+    """
+    aliases = []
+
+    named_inputs = [(r.input_name.lower(), r) for r in input_rows]
+    for term, input_type in INPUT_SEARCH_TERMS:
+        row = _first_match(named_inputs, term, type_fn=lambda r: r.input_type, input_type=input_type)
+        if row is not None:
+            aliases.append(FactorAlias(
+                factor_table=INDUSTRIAL_INPUTS, term=term, input_type=input_type or "",
+                factor_id=row.id, factor_name=row.input_name
+            ))
+
+    named_fuels = [(r.fuel_name.lower(), r) for r in combustion_rows]
+    for _, term in FUEL_SEARCH_TERMS:
+        row = _first_match(named_fuels, term)
+        if row is not None:
+            aliases.append(FactorAlias(
+                factor_table=STATIONARY_COMBUSTION, term=term, input_type="",
+                factor_id=row.id, factor_name=row.fuel_name
+            ))
+
+    return aliases
+
+
+def rebuild_factor_aliases(db: Session) -> int:
+    """Replaces factor_aliases with a fresh resolution (does not commit)"""
+    input_rows = db.query(IndustrialInputEmission).order_by(IndustrialInputEmission.id).all()
+    combustion_rows = db.query(StationaryCombustionEmission).order_by(StationaryCombustionEmission.id).all()
+    aliases = resolve_factor_aliases(input_rows, combustion_rows)
+
+    db.query(FactorAlias).delete(synchronize_session=False)
+    db.add_all(aliases)
+    db.flush()
+    return len(aliases)
+
+
+def _compute_version(payload: Dict) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def build_factor_catalog(db: Session) -> FactorCatalog:
+    """Loads every reference table once and builds a new catalog"""
+    biomass_rows = db.query(BiomassProperty).order_by(BiomassProperty.id).all()
+    production_rows = db.query(BiomassProductionEmission).order_by(BiomassProductionEmission.id).all()
+    mut_rows = db.query(MUTFactor).order_by(MUTFactor.id).all()
+    allocation_rows = db.query(BiomassMUTAllocation).order_by(BiomassMUTAllocation.id).all()
+    vehicle_rows = db.query(VehicleEmissionFactor).order_by(VehicleEmissionFactor.id).all()
+    modal_rows = db.query(TransportModalFactor).order_by(TransportModalFactor.id).all()
+    input_rows = db.query(IndustrialInputEmission).order_by(IndustrialInputEmission.id).all()
+    combustion_rows = db.query(StationaryCombustionEmission).order_by(StationaryCombustionEmission.id).all()
+
+    biomass = _first_by_key(
+        biomass_rows,
+        lambda r: r.biomass_name,
+        lambda r: BiomassEntry(r.biomass_name, r.pci_mj_kg, r.combustion_emission)
+    )
+    production = _first_by_key(production_rows, lambda r: r.biomass_name, lambda r: r.emission_factor)
+    mut = _first_by_key(mut_rows, lambda r: (r.state, r.culture), lambda r: r.emission_factor)
+    allocations = _first_by_key(allocation_rows, lambda r: r.biomass_name, lambda r: r.allocation_product)
+    vehicles = _first_by_key(vehicle_rows, lambda r: r.vehicle_type, lambda r: r.emission_factor)
+    modals = _first_by_key(modal_rows, lambda r: r.modal_type, lambda r: r.emission_factor)
+
+    water_factor = next((r.emission_factor for r in input_rows if r.input_type == "water"), None)
+
+    aliases = db.query(FactorAlias).order_by(FactorAlias.id).all() or resolve_factor_aliases(input_rows, combustion_rows)
+    inputs_by_id = {r.id: r for r in input_rows}
+    combustion_by_id = {r.id: r for r in combustion_rows}
+
+    input_factors = {}
+    combustion_factors = {}
+    for alias in aliases:
+        if alias.factor_table == INDUSTRIAL_INPUTS:
+            row = inputs_by_id.get(alias.factor_id)
+            if row is not None:
+                input_factors[(alias.term, alias.input_type or None)] = row.emission_factor
+        elif alias.factor_table == STATIONARY_COMBUSTION:
+            row = combustion_by_id.get(alias.factor_id)
+            if row is not None:
+                combustion_factors[alias.term] = row.co2_eq_emission
+
+    version = _compute_version({
+        "biomass": {k: [v.pci_mj_kg, v.combustion_emission] for k, v in biomass.items()},
+        "production": production,
+        "mut": {f"{s}|{c}": v for (s, c), v in mut.items()},
+        "allocations": allocations,
+        "vehicles": vehicles,
+        "modals": modals,
+        "water": water_factor,
+        "inputs": {f"{t}|{it}": v for (t, it), v in input_factors.items()},
+        "combustion": combustion_factors,
+    })
+
+    return FactorCatalog(
+        version=version,
+        biomass=MappingProxyType(biomass),
+        production_emissions=MappingProxyType(production),
+        mut_factors=MappingProxyType(mut),
+        mut_allocations=MappingProxyType(allocations),
+        vehicle_factors=MappingProxyType(vehicles),
+        modal_factors=MappingProxyType(modals),
+        water_factor=water_factor,
+        input_factors=MappingProxyType(input_factors),
+        combustion_factors=MappingProxyType(combustion_factors),
+    )
+
+
+def published_catalog_version(db: Session) -> Optional[str]:
+    """Version in factor_catalog_state (None before the first publish)"""
+    return db.query(FactorCatalogState.version).filter(FactorCatalogState.id == 1).scalar()
+
+
+def publish_factor_catalog(db: Session, catalog: FactorCatalog) -> None:
+    """Records `catalog` as the current version for every process (does not commit)"""
+    state = db.get(FactorCatalogState, 1)
+    if state is None:
+        db.add(FactorCatalogState(id=1, version=catalog.version, revision=1))
+    elif state.version != catalog.version:
+        state.version = catalog.version
+        state.revision += 1
+        state.published_at = datetime.utcnow()
+    db.flush()
+
+
+# Process-wide snapshot
+_catalog: Optional[FactorCatalog] = None
+_published: Optional[str] = None  # versão publicada vista na última verificação
+_checked_at = 0.0
+_catalog_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+def get_factor_catalog(db: Optional[Session] = None, max_age: Optional[float] = None) -> FactorCatalog:
+    """
+    Returns the process-wide catalog, loading it on first use and rebuilding
+    it when another process published a new version. The published version
+    is read at most every `max_age` seconds (FACTOR_CATALOG_CHECK_INTERVAL).
+    """
+    max_age = settings.FACTOR_CATALOG_CHECK_INTERVAL if max_age is None else max_age
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _checked_at < max_age:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or time.monotonic() - _checked_at >= max_age:
+            _with_session(db, _refresh_locked)
+        return _catalog
+
+
+def current_factor_catalog(db: Optional[Session] = None) -> FactorCatalog:
+    """get_factor_catalog checking the published version now"""
+    return get_factor_catalog(db, max_age=0)
+
+
+def reload_factor_catalog(db: Optional[Session] = None) -> FactorCatalog:
+    """Rebuilds the catalog (e.g. after reseeding the factor tables) and publishes it (commits)"""
+    with _catalog_lock:
+        _with_session(db, _reload_locked)
+        return _catalog
+
+
+def _with_session(db: Optional[Session], func: Callable[[Session], T]) -> T:
+    if db is not None:
+        return func(db)
+
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        return func(session)
+    finally:
+        session.close()
+
+
+def _refresh_locked(db: Session) -> None:
+    global _catalog, _published, _checked_at
+
+    published = published_catalog_version(db)
+    if _catalog is None or published not in (None, _published, _catalog.version):
+        _catalog = build_factor_catalog(db)
+    # Lembra a publicada: se as tabelas mudaram sem publicar, não reconstrói em loop
+    _published = published
+    _checked_at = time.monotonic()
+
+
+def _reload_locked(db: Session) -> None:
+    global _catalog, _published, _checked_at
+
+    catalog = build_factor_catalog(db)
+    publish_factor_catalog(db, catalog)
+    db.commit()
+    _catalog, _published, _checked_at = catalog, catalog.version, time.monotonic()
@@ -0,0 +1,44 @@
+"""
+Job kinds run by scripts/run_worker.py (registered on import).
+
+- recalculate_projects: bulk recalculation (resumes from the checkpoint,
+  so retries continue where the failed attempt stopped)
+- import_projects: CSV/XLSX import of an uploaded file; one attempt only,
+  since committed batches would be imported twice on a retry
+"""
+import os
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.services.job_queue import job_handler
+from app.services.project_import_service import ProjectImportService
+from app.services.recalculation_service import RecalculationService
+
+RECALCULATE_PROJECTS = "recalculate_projects"
+IMPORT_PROJECTS = "import_projects"
+
+
+@job_handler(RECALCULATE_PROJECTS)
+def recalculate_projects(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """payload: resume (bool), dependency_keys ([[factor_table, factor_key], ...] or None)"""
+    keys = payload.get("dependency_keys")
+    progress = RecalculationService().run(
+        resume=payload.get("resume", True),
+        dependency_keys=[tuple(key) for key in keys] if keys is not None else None
+    )
+    return progress.to_dict()
+
+
+@job_handler(IMPORT_PROJECTS)
+def import_projects(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """payload: path (uploaded file, removed afterwards), filename, user_id"""
+    path = payload["path"]
+    try:
+        with open(path, "rb") as f:
+            report = ProjectImportService(db).import_file(f, payload["filename"], payload["user_id"])
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return asdict(report)
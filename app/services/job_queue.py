@@ -0,0 +1,218 @@
+"""
+Background jobs on the `jobs` table.
+
+enqueue() inserts a QUEUED row inside the caller's transaction. Workers
+(scripts/run_worker.py) claim the oldest due row with
+SELECT ... FOR UPDATE SKIP LOCKED, so several processes can poll the same
+table without blocking each other; the claim itself is a conditional
+UPDATE (status still QUEUED), which keeps it safe on SQLite too, where
+FOR UPDATE is not emitted and writers are serialized instead.
+
+A failed attempt goes back to QUEUED with run_at pushed by an exponential
+backoff until max_attempts; jobs left RUNNING by a dead worker are
+re-queued after JOB_LOCK_TIMEOUT. Handlers are registered per kind with
+@job_handler (see app/services/job_handlers.py).
+"""
+import os
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Job, JobStatus
+
+# handler(db, payload) -> result (JSON-serializable) or None
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Registers the function that runs jobs of `kind`"""
+    def register(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def registered_kinds() -> Iterable[str]:
+    return tuple(_handlers)
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    user_id: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    run_at: Optional[datetime] = None
+) -> Job:
+    """Adds a job to the queue (flushes for the id; does not commit)"""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind '{kind}'")
+
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        user_id=user_id,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=run_at or datetime.utcnow(),
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def retry_delay(attempts: int, base_delay: Optional[float] = None, max_delay: Optional[float] = None) -> float:
+    """Seconds before the next attempt after `attempts` failures (exponential, capped)"""
+    base_delay = base_delay if base_delay is not None else settings.JOB_RETRY_BASE_DELAY
+    max_delay = max_delay if max_delay is not None else settings.JOB_RETRY_MAX_DELAY
+    return min(base_delay * 2 ** (attempts - 1), max_delay)
+
+
+class JobWorker:
+    """Claims and runs due jobs, one at a time"""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        worker_id: Optional[str] = None,
+        kinds: Optional[Iterable[str]] = None
+    ):
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.kinds = tuple(kinds) if kinds else None
+
+    def claim(self) -> Optional[int]:
+        """Marks the oldest due QUEUED job as RUNNING for this worker; returns its id"""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            stmt = (
+                select(Job.id)
+                .where(Job.status == JobStatus.QUEUED, Job.run_at <= now)
+                .order_by(Job.run_at, Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if self.kinds:
+                stmt = stmt.where(Job.kind.in_(self.kinds))
+
+            job_id = db.execute(stmt).scalar()
+            if job_id is None:
+                return None
+
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=self.worker_id,
+                    locked_at=now,
+                )
+            ).rowcount
+            db.commit()
+            # Outro worker levou antes (só acontece sem SKIP LOCKED, ex.: SQLite)
+            return job_id if claimed == 1 else None
+        finally:
+            db.close()
+
+    def run_once(self) -> bool:
+        """Runs one due job; False when there was nothing to do"""
+        job_id = self.claim()
+        if job_id is None:
+            return False
+        self.execute(job_id)
+        return True
+
+    def execute(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            job = db.get(Job, job_id)
+            handler = _handlers.get(job.kind)
+            payload = dict(job.payload or {})
+            db.commit()  # não segura o lock da linha durante o handler
+
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job kind '{job.kind}'")
+                result = handler(db, payload)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._fail(db, job_id, f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+                return
+
+            self._finish(db, job_id, JobStatus.SUCCEEDED, result=result)
+        finally:
+            db.close()
+
+    def _finish(self, db: Session, job_id: int, job_status: JobStatus, **values) -> None:
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status=job_status, finished_at=datetime.utcnow(), locked_by=None, locked_at=None, **values)
+        )
+        db.commit()
+
+    def _fail(self, db: Session, job_id: int, error: str) -> None:
+        job = db.get(Job, job_id)
+        if job.attempts >= job.max_attempts:
+            self._finish(db, job_id, JobStatus.FAILED, error=error)
+            return
+
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status=JobStatus.QUEUED,
+                run_at=datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts)),
+                locked_by=None,
+                locked_at=None,
+                error=error,
+            )
+        )
+        db.commit()
+
+    def requeue_stale(self) -> int:
+        """
+        Jobs RUNNING for longer than JOB_LOCK_TIMEOUT (worker died): back to
+        QUEUED, or FAILED when no attempts are left. Returns how many.
+        """
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+            stale = Job.status == JobStatus.RUNNING, Job.locked_at < cutoff
+            values = dict(locked_by=None, locked_at=None, error="Worker lost (lock timeout)")
+
+            failed = db.execute(
+                update(Job).where(*stale, Job.attempts >= Job.max_attempts)
+                .values(status=JobStatus.FAILED, finished_at=datetime.utcnow(), **values)
+            ).rowcount
+            requeued = db.execute(
+                update(Job).where(*stale).values(status=JobStatus.QUEUED, **values)
+            ).rowcount
+            db.commit()
+            return failed + requeued
+        finally:
+            db.close()
+
+    def run_forever(self, should_stop: Callable[[], bool] = lambda: False, poll_interval: Optional[float] = None) -> None:
+        """Polls until should_stop(); sleeps only when the queue is empty"""
+        poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL
+        last_recovery = 0.0
+
+        while not should_stop():
+            if time.monotonic() - last_recovery > settings.JOB_LOCK_TIMEOUT / 2:
+                self.requeue_stale()
+                last_recovery = time.monotonic()
+
+            if not self.run_once():
+                time.sleep(poll_interval)
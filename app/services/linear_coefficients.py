@@ -0,0 +1,206 @@
+"""
+Linear form of the emission calculation.
+
+For a fixed (biomass_type, state, agr_transport_vehicle) and catalog
+version every phase of CalculationService is linear in the features
+below, so the whole calculation reduces to one dot product per phase:
+
+    phase_emissions = coefficients[phase] · feature_vector(project)
+
+Features marked per-processed are divided by biomass_processed (kg) before
+the product, which is how the industrial and transport phases normalize.
+Coefficient vectors are built from the factor catalog once per key and
+kept in an LRU; results match calculate_phase_results up to float rounding.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.calculation_service import (
+    CBIO_PRICE,
+    DEFAULT_CHEMICAL_FACTOR,
+    DEFAULT_LUBRICANT_FACTOR,
+    DEFAULT_PRODUCTION_FACTOR,
+    DEFAULT_ROAD_FACTOR,
+    DEFAULT_STARCH_FACTOR,
+    DEFAULT_VEHICLE_FACTOR,
+    DEFAULT_WATER_FACTOR,
+    PHASE_COLUMNS,
+    PRODUCT_PCI_MJ_KG,
+    CalculationService,
+    culture_for_biomass,
+)
+from app.services.factor_catalog import FUEL_SEARCH_TERMS, FactorCatalog, get_factor_catalog
+
+FUEL_COLUMNS: Tuple[str, ...] = tuple(column for column, _ in FUEL_SEARCH_TERMS)
+
+# Divided by biomass_processed; "dom_transport" is dom_mass * dom_distance (t.km)
+PER_PROCESSED_FEATURES: Tuple[str, ...] = (
+    "elec_grid", "elec_solar", "elec_other",
+) + FUEL_COLUMNS + (
+    "water_consumption", "input_lubricant", "input_chemical", "dom_transport",
+)
+FEATURES: Tuple[str, ...] = ("constant", "starch_input", "agr_transport_distance") + PER_PROCESSED_FEATURES
+FEATURE_INDEX: Dict[str, int] = {name: index for index, name in enumerate(FEATURES)}
+
+CoefficientKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+@dataclass(frozen=True)
+class LinearCoefficients:
+    """Coefficient matrix (one row per PHASE_COLUMNS entry) for one configuration key"""
+    biomass_type: str
+    state: Optional[str]
+    vehicle: Optional[str]
+    catalog_version: str
+    pci: float
+    matrix: np.ndarray  # shape (len(PHASE_COLUMNS), len(FEATURES))
+
+    @property
+    def carbon_intensity(self) -> np.ndarray:
+        """Coefficients of the sum of the phases (C21)"""
+        return self.matrix.sum(axis=0)
+
+    def phase_results(self, features: np.ndarray) -> Dict[str, float]:
+        values = self.matrix @ features
+        results = {"pci": self.pci}
+        results.update({phase: float(value) for phase, value in zip(PHASE_COLUMNS, values)})
+        return results
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """phase -> feature -> coefficient, plus "carbon_intensity" for the total"""
+        rows = dict(zip(PHASE_COLUMNS, self.matrix))
+        rows["carbon_intensity"] = self.carbon_intensity
+        return {
+            name: {feature: float(value) for feature, value in zip(FEATURES, row)}
+            for name, row in rows.items()
+        }
+
+
+def coefficient_key(project: Any) -> CoefficientKey:
+    return (
+        getattr(project, "biomass_type", None),
+        getattr(project, "state", None) or None,
+        getattr(project, "agr_transport_vehicle", None) or None,
+    )
+
+
+def feature_vector(project: Any) -> np.ndarray:
+    """Features of a Project (or any object with the same attributes), in FEATURES order"""
+    x = np.zeros(len(FEATURES))
+    x[0] = 1.0
+    x[FEATURE_INDEX["starch_input"]] = project.starch_input or 0.0
+    x[FEATURE_INDEX["agr_transport_distance"]] = project.agr_transport_distance or 0.0
+
+    processed = project.biomass_processed
+    if not processed:
+        return x
+
+    inverse = 1.0 / processed
+    for name in ("elec_grid", "elec_solar", "elec_other", "water_consumption", "input_lubricant", "input_chemical"):
+        x[FEATURE_INDEX[name]] = (getattr(project, name) or 0.0) * inverse
+    for column in FUEL_COLUMNS:
+        qty = getattr(project, column)
+        if qty and qty > 0:
+            x[FEATURE_INDEX[column]] = qty * inverse
+    if processed > 0 and project.dom_mass and project.dom_distance:
+        x[FEATURE_INDEX["dom_transport"]] = project.dom_mass * project.dom_distance * inverse
+    return x
+
+
+def build_coefficients(catalog: FactorCatalog, biomass_type: str, state: Optional[str], vehicle: Optional[str]) -> LinearCoefficients:
+    """Mirrors the phase formulas of CalculationService with every factor resolved"""
+    biomass = catalog.get_biomass(biomass_type)
+    if not biomass:
+        raise ValueError(f"Biomass '{biomass_type}' not found in database")
+
+    kg_per_mj = 1.0 / biomass.pci_mj_kg if biomass.pci_mj_kg and biomass.pci_mj_kg > 0 else 0.0
+    matrix = np.zeros((len(PHASE_COLUMNS), len(FEATURES)))
+    agricultural, industrial, transport, use = (matrix[PHASE_COLUMNS.index(phase)] for phase in (
+        "agricultural_emissions", "industrial_emissions", "transport_emissions", "use_emissions"
+    ))
+
+    def _factor(value: Optional[float], default: float) -> float:
+        return value if value is not None else default
+
+    # Fase agrícola: produção + MUT (constantes para a chave), amido e transporte
+    production = catalog.production_emissions.get(biomass.biomass_name, DEFAULT_PRODUCTION_FACTOR)
+    mut = 0.0
+    if state:
+        emission = catalog.mut_factors.get((state, culture_for_biomass(biomass.biomass_name)))
+        if emission is not None:
+            allocation = catalog.mut_allocations.get(biomass.biomass_name, 1.0)
+            if allocation > 1.0:
+                allocation /= 100.0
+            mut = kg_per_mj * emission * allocation
+    agricultural[FEATURE_INDEX["constant"]] = kg_per_mj * production + mut
+    agricultural[FEATURE_INDEX["starch_input"]] = _factor(catalog.input_factor("Amido"), DEFAULT_STARCH_FACTOR)
+    if vehicle:
+        vehicle_factor = catalog.vehicle_factors.get(vehicle, DEFAULT_VEHICLE_FACTOR)
+        agricultural[FEATURE_INDEX["agr_transport_distance"]] = (kg_per_mj / 1000.0) * vehicle_factor
+
+    # Fase industrial (por kg de biomassa processada)
+    grid = catalog.input_factor("Rede", "electricity") or 0.0
+    industrial[FEATURE_INDEX["elec_grid"]] = grid * kg_per_mj
+    industrial[FEATURE_INDEX["elec_other"]] = grid * kg_per_mj
+    for column, term in FUEL_SEARCH_TERMS:
+        total_factor = (catalog.input_factor(term, "fuel") or 0.0) + (catalog.combustion_factor(term) or 0.0)
+        industrial[FEATURE_INDEX[column]] = total_factor * kg_per_mj
+    industrial[FEATURE_INDEX["water_consumption"]] = _factor(catalog.water_factor, DEFAULT_WATER_FACTOR) * kg_per_mj
+    industrial[FEATURE_INDEX["input_lubricant"]] = _factor(catalog.input_factor("lubrificante"), DEFAULT_LUBRICANT_FACTOR) * kg_per_mj
+    industrial[FEATURE_INDEX["input_chemical"]] = _factor(catalog.input_factor("Genérico"), DEFAULT_CHEMICAL_FACTOR) * kg_per_mj
+
+    # Distribuição doméstica (rodoviário)
+    transport[FEATURE_INDEX["dom_transport"]] = catalog.modal_factors.get("road", DEFAULT_ROAD_FACTOR) * kg_per_mj
+
+    # Fase de uso
+    use[FEATURE_INDEX["constant"]] = biomass.combustion_emission or 0.0
+
+    matrix.setflags(write=False)
+    return LinearCoefficients(
+        biomass_type=biomass.biomass_name,
+        state=state,
+        vehicle=vehicle,
+        catalog_version=catalog.version,
+        pci=biomass.pci_mj_kg,
+        matrix=matrix,
+    )
+
+
+_coefficient_cache = LRUCache(settings.COEFFICIENT_CACHE_SIZE)
+
+
+class LinearCalculationService:
+    """Calculation as cached coefficients · features (no database access once the catalog is loaded)"""
+
+    def __init__(self, catalog: Optional[FactorCatalog] = None, cache: Optional[LRUCache] = None):
+        self.catalog = catalog or get_factor_catalog()
+        self.cache = cache if cache is not None else _coefficient_cache
+
+    def coefficients(self, biomass_type: str, state: Optional[str] = None, vehicle: Optional[str] = None) -> LinearCoefficients:
+        key = (biomass_type, state or None, vehicle or None, self.catalog.version)
+        coefficients = self.cache.get(key)
+        if coefficients is None:
+            coefficients = build_coefficients(self.catalog, *key[:3])
+            self.cache.put(key, coefficients)
+        return coefficients
+
+    def calculate_phase_results(self, project: Any) -> Dict[str, float]:
+        return self.coefficients(*coefficient_key(project)).phase_results(feature_vector(project))
+
+    def calculate_project_results(self, project: Any) -> Dict[str, Any]:
+        """Same keys as CalculationService.calculate_project_results"""
+        calculator = CalculationService(db=None, catalog=self.catalog)
+        return calculator.combine_phase_results(project, self.calculate_phase_results(project))
+
+
+def cbio_constants() -> Dict[str, float]:
+    """Constants that turn a carbon intensity into CBIOs/revenue (see _calculate_cbios)"""
+    return {
+        "fossil_reference": settings.FOSSIL_REFERENCE_WEIGHTED,
+        "product_pci_mj_kg": PRODUCT_PCI_MJ_KG,
+        "cbio_price": CBIO_PRICE,
+    }
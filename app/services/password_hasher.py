@@ -0,0 +1,194 @@
+"""
+bcrypt off the request path.
+
+Hashing and verification (~250 ms of CPU at 12 rounds) run in a dedicated
+ProcessPoolExecutor of PASSWORD_HASH_WORKERS processes, so a burst of
+logins only competes with itself: the event loop and the threadpool keep
+serving every other route. At most PASSWORD_HASH_MAX_PENDING operations
+may be queued or running per API process; past that the request gets 503
+with Retry-After instead of joining an ever-growing queue.
+PASSWORD_HASH_WORKERS=0 runs bcrypt inline (scripts, tools).
+
+The work factor is PASSWORD_BCRYPT_ROUNDS. verify() also returns a new
+hash whenever the stored one was made with a different cost, so logins
+migrate existing users transparently after the setting changes.
+"""
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+# Executadas nos processos do pool: só recebem argumentos simples ---------
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    # min = max = default: qualquer outro custo conta como desatualizado
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def _hash(password: str, rounds: int) -> Tuple[str, float]:
+    started = time.perf_counter()
+    hashed = _context(rounds).hash(password)
+    return hashed, time.perf_counter() - started
+
+
+def _verify(password: str, hashed: str, rounds: int) -> Tuple[Tuple[bool, Optional[str]], float]:
+    started = time.perf_counter()
+    result = _context(rounds).verify_and_update(password, hashed)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """Bounded bcrypt executor shared by the API process (thread-safe)"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        rounds: Optional[int] = None
+    ):
+        self.workers = workers if workers is not None else settings.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        self.rounds = rounds or settings.PASSWORD_BCRYPT_ROUNDS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "completed": 0, "failed": 0, "rejected": 0, "max_pending_seen": 0,
+            "compute_time_ms": 0.0, "wait_time_ms": 0.0,
+        }
+
+    # Pool -----------------------------------------------------------------
+
+    def start(self) -> None:
+        """Starts the worker processes (otherwise done on first use)"""
+        if self.workers > 0:
+            executor = self._get_executor()
+            # Os processos só sobem com tarefas: um aquecimento por worker
+            for _ in range(self.workers):
+                executor.submit(_context, self.rounds)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: fork de um processo com event loop e threads não é seguro
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # Fila limitada + métricas -----------------------------------------------
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent authentication requests, try again shortly",
+                    headers={"Retry-After": str(self._retry_after())},
+                )
+            self._pending += 1
+            self._stats["max_pending_seen"] = max(self._stats["max_pending_seen"], self._pending)
+
+    def _retry_after(self) -> int:
+        """Seconds until the current queue is expected to drain (lock held)"""
+        completed = self._stats["completed"]
+        average = self._stats["compute_time_ms"] / completed / 1000 if completed else 0.25
+        return max(1, math.ceil(self._pending * average / max(self.workers, 1)))
+
+    def _release(self, started: float, outcome: Optional[Tuple[Any, float]]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if outcome is None:
+                self._stats["failed"] += 1
+                return
+            compute = outcome[1]
+            self._stats["completed"] += 1
+            self._stats["compute_time_ms"] += compute * 1000
+            self._stats["wait_time_ms"] += max(time.perf_counter() - started - compute, 0.0) * 1000
+
+    def _submit(self, func: Callable[..., Tuple[Any, float]], *args) -> Future:
+        self._reserve()
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._release(started, None)
+            raise
+
+        def done(f: Future) -> None:
+            self._release(started, None if f.cancelled() or f.exception() else f.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def _run(self, func: Callable[..., Tuple[Any, float]], *args) -> Any:
+        """Blocking call (scripts and tools)"""
+        if self.workers <= 0:
+            return func(*args)[0]
+        return self._submit(func, *args).result()[0]
+
+    async def _run_async(self, func: Callable[..., Tuple[Any, float]], *args) -> Any:
+        if self.workers <= 0:
+            return (await run_in_threadpool(func, *args))[0]
+        return (await asyncio.wrap_future(self._submit(func, *args)))[0]
+
+    # API --------------------------------------------------------------------
+
+    def hash_sync(self, password: str) -> str:
+        return self._run(_hash, password, self.rounds)
+
+    def verify_sync(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new hash when the stored cost differs from PASSWORD_BCRYPT_ROUNDS)"""
+        return self._run(_verify, password, hashed, self.rounds)
+
+    async def hash(self, password: str) -> str:
+        return await self._run_async(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new hash when the stored cost differs from PASSWORD_BCRYPT_ROUNDS)"""
+        return await self._run_async(_verify, password, hashed, self.rounds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "queued": max(self._pending - self.workers, 0),
+                **self._stats,
+                "compute_time_ms": round(self._stats["compute_time_ms"], 3),
+                "wait_time_ms": round(self._stats["wait_time_ms"], 3),
+                "avg_compute_ms": round(self._stats["compute_time_ms"] / completed, 3) if completed else None,
+                "avg_wait_ms": round(self._stats["wait_time_ms"] / completed, 3) if completed else None,
+            }
+
+
+password_hasher = PasswordHasher()
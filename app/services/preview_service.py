@@ -0,0 +1,63 @@
+"""
+Stateless what-if calculation for POST /projects/preview.
+
+Nothing touches the database: inputs are evaluated with the cached
+linear coefficients of their (biomass, state, vehicle) key, see
+app/services/linear_coefficients.py, so a cache miss costs one dot
+product per phase; results match CalculationService up to float
+rounding. They are kept in a bounded LRU keyed by a canonical hash of the
+calculation inputs plus the catalog version.
+"""
+import hashlib
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.batch_calculation import INPUT_FIELDS, NUMERIC_FIELDS
+from app.services.factor_catalog import FactorCatalog, get_factor_catalog
+from app.services.linear_coefficients import LinearCalculationService
+
+
+_preview_cache = LRUCache(settings.PREVIEW_CACHE_SIZE)
+
+
+def canonical_inputs(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Only the fields the calculation reads, with numbers normalized (None/int -> float)"""
+    return {
+        name: float(data.get(name) or 0.0) if name in NUMERIC_FIELDS else data.get(name)
+        for name in INPUT_FIELDS
+    }
+
+
+def preview_cache_key(inputs: Dict[str, Any], catalog_version: str) -> str:
+    encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{catalog_version}:{encoded}".encode("utf-8")).hexdigest()
+
+
+class PreviewService:
+    """Computes project results without creating a Project row"""
+
+    def __init__(self, catalog: Optional[FactorCatalog] = None, cache: Optional[LRUCache] = None):
+        self.catalog = catalog or get_factor_catalog()
+        self.cache = cache if cache is not None else _preview_cache
+
+    def preview(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Returns (results, cached). Raises ValueError for an unknown biomass,
+        like calculate_project_results.
+        """
+        inputs = canonical_inputs(data)
+        key = preview_cache_key(inputs, self.catalog.version)
+
+        results = self.cache.get(key)
+        if results is not None:
+            return dict(results), True
+
+        calc_service = LinearCalculationService(catalog=self.catalog)
+        results = calc_service.calculate_project_results(SimpleNamespace(**inputs))
+        results["catalog_version"] = self.catalog.version
+
+        self.cache.put(key, results)
+        return dict(results), False
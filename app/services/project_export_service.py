@@ -0,0 +1,143 @@
+"""
+Streaming export of a user's projects (inputs and calculated results).
+
+Rows come from a server-side cursor (yield_per, only the exported columns)
+and are encoded chunk by chunk, so memory does not depend on the number of
+projects. CSV and NDJSON are sent as they are produced; XLSX is written
+with openpyxl in write-only mode to a temporary file (a zip can only be
+finished at the end) and then streamed from disk.
+
+The export columns use the ProjectCreate names, so a CSV/XLSX export can
+be fed back to POST /projects/import.
+"""
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Project, ProjectStatus
+from app.schemas.project import ProjectResponse
+from app.services.project_service import project_filters
+
+EXPORT_FIELDS: Tuple[str, ...] = ("id",) + tuple(
+    name for name in ProjectResponse.model_fields if name not in ("id", "user_id")
+)
+
+_XLSX_READ_SIZE = 64 * 1024
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    XLSX = "xlsx"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _text(value: Any) -> Any:
+    value = _plain(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ProjectExportService:
+    """Encodes the projects of one user as CSV, NDJSON or XLSX chunks"""
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal, yield_per: Optional[int] = None):
+        self.session_factory = session_factory
+        self.yield_per = yield_per or settings.EXPORT_YIELD_PER
+
+    def iter_batches(
+        self,
+        user_id: int,
+        status: Optional[ProjectStatus] = None,
+        biomass_type: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> Iterator[Sequence[Tuple]]:
+        """
+        Rows (EXPORT_FIELDS order) in batches of yield_per, oldest first.
+        Opens its own session: the generator outlives the request handler.
+        """
+        db = self.session_factory()
+        try:
+            stmt = (
+                select(*(getattr(Project, name) for name in EXPORT_FIELDS))
+                .where(Project.user_id == user_id, *project_filters(status, biomass_type, state))
+                .order_by(Project.id)
+                .execution_options(yield_per=self.yield_per)
+            )
+            for partition in db.execute(stmt).partitions():
+                yield partition
+        finally:
+            db.close()
+
+    def stream(self, export_format: ExportFormat, user_id: int, **filters) -> Iterator[bytes]:
+        batches = self.iter_batches(user_id, **filters)
+        if export_format == ExportFormat.NDJSON:
+            return self._ndjson(batches)
+        if export_format == ExportFormat.XLSX:
+            return self._xlsx(batches)
+        return self._csv(batches)
+
+    @staticmethod
+    def _csv(batches: Iterator[Sequence[Tuple]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for rows in batches:
+            writer.writerows([_text(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Sem projetos: só o cabeçalho
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _ndjson(batches: Iterator[Sequence[Tuple]]) -> Iterator[bytes]:
+        for rows in batches:
+            lines: List[str] = [
+                json.dumps(dict(zip(EXPORT_FIELDS, map(_text, row))), ensure_ascii=False)
+                for row in rows
+            ]
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _xlsx(batches: Iterator[Sequence[Tuple]]) -> Iterator[bytes]:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Projetos")
+        sheet.append(EXPORT_FIELDS)
+        for rows in batches:
+            for row in rows:
+                sheet.append([_plain(value) for value in row])
+
+        with tempfile.TemporaryFile() as f:
+            workbook.save(f)
+            f.seek(0)
+            while True:
+                chunk = f.read(_XLSX_READ_SIZE)
+                if not chunk:
+                    break
+                yield chunk
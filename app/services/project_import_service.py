@@ -0,0 +1,224 @@
+"""
+Bulk project import from CSV/XLSX (one project per row, ProjectBase column names).
+
+Rows are streamed from the file (csv reader over the binary stream, openpyxl
+in read-only mode), validated with ProjectCreate in batches, calculated with
+the NumPy batch kernel on the cached factor catalog and inserted as plain
+parameter dicts (one executemany INSERT ... RETURNING id per batch, sent as
+multi-row VALUES where the driver supports it; no ORM instances are built).
+Each batch is committed on its own; a row that fails validation or
+calculation is reported with its line number and skipped, never aborting
+the file.
+"""
+import csv
+import io
+import os
+import re
+import zipfile
+from dataclasses import dataclass, field
+from itertools import islice
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Project, ProjectStatus, round_cbios
+from app.schemas.project import ProjectCreate
+from app.services.calculation_service import CalculationService
+from app.services.dependency_index import DependencyIndexService
+
+# Columns typed as text in ProjectCreate (spreadsheets hand CNPJ/phone as numbers)
+TEXT_FIELDS = frozenset(
+    name for name, info in ProjectCreate.model_fields.items()
+    if info.annotation in (str, Optional[str])
+)
+
+_DECIMAL_COMMA = re.compile(r"^-?\d+(\.\d{3})*,\d+$|^-?\d+,\d+$")
+
+Row = Tuple[int, Dict[str, Any]]  # (line number in the file, column -> value)
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import; errors hold the line number and messages of each skipped row"""
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, row: int, messages: List[str]) -> None:
+        self.failed += 1
+        # Bounded: the counter keeps going, the detail stops at IMPORT_MAX_ERRORS
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+
+
+def _clean(column: str, value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+        if column not in TEXT_FIELDS and _DECIMAL_COMMA.match(value):
+            # "1.234,5" / "0,25" (planilhas em pt-BR)
+            return value.replace(".", "").replace(",", ".")
+        return value
+    if column in TEXT_FIELDS and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    return value
+
+
+def _rows(header: Iterable[Any], records: Iterable[Iterable[Any]], first_line: int) -> Iterator[Row]:
+    columns = [str(column).strip() if column is not None else None for column in header]
+    if "name" not in columns:
+        raise ValueError("Missing required column 'name' in the header")
+
+    for line, record in enumerate(records, start=first_line):
+        values = {
+            column: _clean(column, value)
+            for column, value in zip(columns, record)
+            if column
+        }
+        if any(value is not None for value in values.values()):
+            # Células vazias ficam fora: o default do schema vale
+            yield line, {column: value for column, value in values.items() if value is not None}
+
+
+def read_csv_rows(stream: BinaryIO) -> Iterator[Row]:
+    """Rows of a CSV file (',' ';' or tab separated, UTF-8), read incrementally"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    sample = text.readline()
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(text, dialect)
+    header = next(csv.reader([sample], dialect), [])
+    try:
+        yield from _rows(header, reader, first_line=2)
+    finally:
+        text.detach()
+
+
+def read_xlsx_rows(stream: BinaryIO) -> Iterator[Row]:
+    """Rows of the first sheet of an XLSX file (openpyxl read-only mode)"""
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Invalid XLSX file: {e}")
+    try:
+        records = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(records, ())
+        yield from _rows(header, records, first_line=2)
+    finally:
+        workbook.close()
+
+
+def file_extension(filename: str) -> str:
+    """".csv" or ".xlsx"; ValueError for anything else"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in (".csv", ".xlsx"):
+        raise ValueError(f"Unsupported file type '{extension}' (use .csv or .xlsx)")
+    return extension
+
+
+def read_rows(stream: BinaryIO, filename: str) -> Iterator[Row]:
+    if file_extension(filename) == ".csv":
+        return read_csv_rows(stream)
+    return read_xlsx_rows(stream)
+
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+class ProjectImportService:
+    """Creates COMPLETED projects from file rows, batch by batch"""
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: Optional[int] = None,
+        on_progress: Optional[Callable[[ImportReport], None]] = None
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.on_progress = on_progress
+        self.calc_service = CalculationService(db)
+        self.dependency_index = DependencyIndexService(db)
+
+    def import_file(self, stream: BinaryIO, filename: str, user_id: int) -> ImportReport:
+        """Raises ValueError for an unsupported file or a header without 'name'"""
+        return self.import_rows(read_rows(stream, filename), user_id)
+
+    def import_rows(self, rows: Iterable[Row], user_id: int) -> ImportReport:
+        report = ImportReport()
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self._import_batch(batch, user_id, report)
+            if self.on_progress:
+                self.on_progress(report)
+        report.errors.sort(key=lambda error: error["row"])
+        return report
+
+    def _import_batch(self, batch: List[Row], user_id: int, report: ImportReport) -> None:
+        report.total_rows += len(batch)
+
+        lines: List[int] = []
+        projects: List[SimpleNamespace] = []
+        for line, values in batch:
+            try:
+                project_data = ProjectCreate.model_validate(values)
+            except ValidationError as e:
+                report.add_error(line, _validation_messages(e))
+                continue
+            lines.append(line)
+            projects.append(SimpleNamespace(**project_data.model_dump()))
+
+        if not projects:
+            return
+
+        catalog_version = self.calc_service.catalog.version
+        params = []
+        calculated = []
+        for line, project, results in zip(lines, projects, self.calc_service.calculate_projects_results(projects)):
+            if results is None:
+                report.add_error(line, [
+                    f"biomass_type: Biomass '{project.biomass_type}' not found in database"
+                    if project.biomass_type else "biomass_type: Field required"
+                ])
+                continue
+            params.append({
+                **vars(project),
+                **results,
+                "cbios": round_cbios(results["cbios"]),  # Core INSERT: o validator do modelo não roda
+                "user_id": user_id,
+                "current_step": 10,
+                "status": ProjectStatus.COMPLETED,
+                "results_catalog_version": catalog_version,
+            })
+            calculated.append(project)
+
+        if not params:
+            return
+
+        ids = self.db.execute(
+            insert(Project).returning(Project.id, sort_by_parameter_order=True),
+            params
+        ).scalars().all()
+        for project, project_id in zip(calculated, ids):
+            project.id = project_id
+        self.dependency_index.record_for_new_projects(calculated)
+        self.db.commit()
+        report.imported += len(params)
@@ -1,49 +1,137 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import Project, ProjectStatus, User
-from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectListItem
 from app.services.calculation_service import CalculationService
-from typing import List, Optional
+from app.services.dependency_index import DependencyIndexService
+from typing import List, Optional, Sequence, Tuple
 from fastapi import HTTPException
 
 
+# Only the columns ProjectListItem needs (not the ~80 of the model)
+LIST_COLUMNS = tuple(getattr(Project, name) for name in ProjectListItem.model_fields)
+
+
+def encode_cursor(created_at: datetime, project_id: int) -> str:
+    """Opaque keyset cursor: position after the (created_at, id) of the last row"""
+    payload = json.dumps([created_at.isoformat(), project_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(project_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def project_filters(
+    status: Optional[ProjectStatus] = None,
+    biomass_type: Optional[str] = None,
+    state: Optional[str] = None
+) -> list:
+    """WHERE criteria shared by the listing and the export"""
+    criteria = []
+    if status is not None:
+        criteria.append(Project.status == status)
+    if biomass_type is not None:
+        criteria.append(Project.biomass_type == biomass_type)
+    if state is not None:
+        criteria.append(Project.state == state)
+    return criteria
+
+
+def project_list_query(
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[ProjectStatus] = None,
+    biomass_type: Optional[str] = None,
+    state: Optional[str] = None
+):
+    """
+    One page of the user's projects, newest first (ix_projects_user_created_id).
+    Fetches limit + 1 rows so the caller knows whether there is a next page.
+    """
+    stmt = select(*LIST_COLUMNS).where(
+        Project.user_id == user_id, *project_filters(status, biomass_type, state)
+    )
+    
+    if cursor:
+        created_at, project_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Project.created_at, Project.id) < tuple_(created_at, project_id))
+    
+    return stmt.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Row], limit: int) -> Tuple[List[Row], Optional[str]]:
+    """(rows of the page, cursor of the next page or None)"""
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+
+def apply_results(project: Project, results: dict, catalog_version: str) -> None:
+    """Stores calculate_project_results output and marks the project COMPLETED"""
+    for key, value in results.items():
+        setattr(project, key, value)
+    project.results_catalog_version = catalog_version
+    project.status = ProjectStatus.COMPLETED
+
+
 class ProjectService:
     """Service for project operations"""
     
     def __init__(self, db: Session):
         self.db = db
         self.calc_service = CalculationService(db)
+        self.dependency_index = DependencyIndexService(db)
     
     def create_project(self, project_data: ProjectCreate, user_id: int) -> Project:
-        """Create a new project and calculate results"""
-        # Create project
-        project = Project(
-            user_id=user_id,
-            **project_data.model_dump()
-        )
+        """Create a complete project and calculate it in the same transaction"""
+        return self.create_projects([project_data], user_id)[0]
+    
+    def create_projects(self, projects_data: Sequence[ProjectCreate], user_id: int) -> List[Project]:
+        """
+        Create complete projects and calculate them in one transaction
+        Calculated before the INSERT (batched, on the cached factor catalog),
+        so each project is written once; nothing is saved if any fails (422)
+        """
+        projects = [
+            Project(user_id=user_id, current_step=10, **project_data.model_dump())
+            for project_data in projects_data
+        ]
         
-        self.db.add(project)
-        self.db.flush()  # Get ID without committing
+        results = self.calc_service.calculate_projects_results(projects)
+        errors = [
+            {
+                "index": index,
+                "msg": f"Biomass '{project.biomass_type}' not found in database"
+                if project.biomass_type else "biomass_type is required",
+            }
+            for index, (project, result) in enumerate(zip(projects, results))
+            if result is None
+        ]
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
         
-        # Calculate results
-        try:
-            results = self.calc_service.calculate_project_results(project)
-            
-            # Update project with results
-            for key, value in results.items():
-                setattr(project, key, value)
-            
-            # Mark as completed
-            project.status = ProjectStatus.COMPLETED
-            
-        except Exception as e:
-            # If calculation fails, keep as draft
-            project.status = ProjectStatus.DRAFT
-            print(f"Calculation error: {e}")
+        catalog_version = self.calc_service.catalog.version
+        for project, result in zip(projects, results):
+            apply_results(project, result, catalog_version)
         
+        self.db.add_all(projects)
+        self.db.flush()  # ids for the dependency rows
+        self.dependency_index.record_for_new_projects(projects)
         self.db.commit()
-        self.db.refresh(project)
         
-        return project
+        return projects
     
     def get_project(self, project_id: int, user_id: int) -> Optional[Project]:
         """Get a project by ID"""
@@ -54,13 +142,13 @@ class ProjectService:
         
         return project
     
-    def list_user_projects(self, user_id: int) -> List[Project]:
-        """List all projects for a user"""
-        projects = self.db.query(Project).filter(
-            Project.user_id == user_id
-        ).order_by(Project.created_at.desc()).all()
-        
-        return projects
+    def list_user_projects(self, user_id: int, limit: int, cursor: Optional[str] = None, **filters) -> Tuple[List[Row], Optional[str]]:
+        """
+        One page of the user's projects (ProjectListItem columns only)
+        Returns (rows, next cursor); filters: status, biomass_type, state
+        """
+        rows = self.db.execute(project_list_query(user_id, limit, cursor, **filters)).all()
+        return split_page(rows, limit)
     
     def update_project(self, project_id: int, user_id: int, project_data: ProjectUpdate) -> Project:
         """Update a project and recalculate"""
@@ -74,24 +162,19 @@ class ProjectService:
         for key, value in update_data.items():
             setattr(project, key, value)
         
-        # Recalculate
+        # Recalculate (nothing is saved if the calculation fails)
         try:
+            self.calc_service.catalog_for(project)
             results = self.calc_service.calculate_project_results(project)
-            
-            for key, value in results.items():
-                setattr(project, key, value)
-            
-            project.status = ProjectStatus.COMPLETED
-            
-        except Exception as e:
-            project.status = ProjectStatus.DRAFT
-            print(f"Calculation error: {e}")
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
         
+        apply_results(project, results, self.calc_service.catalog.version)
+        self.dependency_index.record_for_project(project)
         self.db.commit()
-        self.db.refresh(project)
         
         return project
-    
+        
     def delete_project(self, project_id: int, user_id: int) -> bool:
         """Delete a project"""
         project = self.get_project(project_id, user_id)
@@ -103,3 +186,50 @@ class ProjectService:
         self.db.commit()
         
         return True
+
+
+class AsyncProjectService:
+    """
+    ProjectService over an AsyncSession (async routes)
+    Reads are native async queries; create/update reuse ProjectService
+    through run_sync (same rules, I/O still awaited on the event loop)
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_project(self, project_data: ProjectCreate, user_id: int) -> Project:
+        return await self.db.run_sync(
+            lambda session: ProjectService(session).create_project(project_data, user_id)
+        )
+    
+    async def create_projects(self, projects_data: Sequence[ProjectCreate], user_id: int) -> List[Project]:
+        return await self.db.run_sync(
+            lambda session: ProjectService(session).create_projects(projects_data, user_id)
+        )
+    
+    async def get_project(self, project_id: int, user_id: int) -> Optional[Project]:
+        result = await self.db.execute(
+            select(Project).where(Project.id == project_id, Project.user_id == user_id)
+        )
+        return result.scalars().first()
+    
+    async def list_user_projects(self, user_id: int, limit: int, cursor: Optional[str] = None, **filters) -> Tuple[List[Row], Optional[str]]:
+        result = await self.db.execute(project_list_query(user_id, limit, cursor, **filters))
+        return split_page(result.all(), limit)
+    
+    async def update_project(self, project_id: int, user_id: int, project_data: ProjectUpdate) -> Project:
+        return await self.db.run_sync(
+            lambda session: ProjectService(session).update_project(project_id, user_id, project_data)
+        )
+    
+    async def delete_project(self, project_id: int, user_id: int) -> bool:
+        project = await self.get_project(project_id, user_id)
+        
+        if not project:
+            return False
+        
+        await self.db.delete(project)
+        await self.db.commit()
+        
+        return True
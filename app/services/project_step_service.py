@@ -1,3 +1,6 @@
+from pydantic import BaseModel
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import Project, ProjectStatus
 from app.schemas.project_steps import (
@@ -5,8 +8,10 @@ from app.schemas.project_steps import (
     ProjectStep4, ProjectStep5, ProjectStep6, ProjectStep7,
     ProjectStep8, ProjectStep9, ProjectStep10
 )
-from app.services.calculation_service import CalculationService
-from typing import Optional
+from app.services.batch_calculation import RESULT_FIELDS
+from app.services.calculation_service import CalculationService, PHASE_COLUMNS, PHASE_INPUTS, RESULT_INPUTS
+from app.services.dependency_index import DependencyIndexService
+from typing import Callable, Dict, Optional, Set
 from fastapi import HTTPException
 
 
@@ -16,6 +21,7 @@ class ProjectStepService:
     def __init__(self, db: Session):
         self.db = db
         self.calc_service = CalculationService(db)
+        self.dependency_index = DependencyIndexService(db)
     
     def create_project_step0(self, step_data: ProjectStep0, user_id: int) -> Project:
         """
@@ -36,29 +42,75 @@ class ProjectStepService:
         return project
     
     def update_step(self, project_id: int, user_id: int, step_number: int, step_data: dict) -> Project:
+        """Atualiza um step específico do projeto (ver _apply_step)"""
+        project = self._apply_step(project_id, user_id, step_number, step_data)
+        self.db.commit()
+        
+        return project
+    
+    def _apply_step(self, project_id: int, user_id: int, step_number: int, step_data: dict) -> Project:
         """
-        Atualiza um step específico do projeto
-        Valida ownership e atualiza current_step se avançou
+        Grava os campos de um step, sem commit
+        
+        Um único UPDATE ... RETURNING, filtrado pelo dono do projeto e só
+        quando algum campo do step muda (IS DISTINCT FROM) ou o current_step
+        avança; sem mudança não há escrita, e cada coluna só recebe o valor
+        enviado se ele for diferente. O RETURNING também diz quais campos
+        mudaram de fato (comparados com a linha antiga), e só as fases que
+        leem esses campos são recalculadas, num segundo UPDATE só com as
+        colunas de resultado que mudaram.
         """
-        project = self.db.query(Project).filter(
-            Project.id == project_id,
-            Project.user_id == user_id
-        ).first()
+        columns = Project.__table__.c
+        values = {key: value for key, value in step_data.items() if key in columns}
+        owned = (Project.id == project_id, Project.user_id == user_id)
+        advances = Project.current_step < step_number
+        # Por campo: o valor atual é diferente do enviado?
+        distinct = {key: columns[key].is_distinct_from(value) for key, value in values.items()}
+        changed = [flag.label(key) for key, flag in distinct.items()]
         
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        stmt = (
+            update(Project)
+            .where(or_(advances, *distinct.values()))
+            .values(
+                **{
+                    key: case((distinct[key], value), else_=columns[key])
+                    for key, value in values.items()
+                },
+                # Atualiza current_step se avançou
+                current_step=case((advances, step_number), else_=Project.current_step)
+            )
+            .returning(Project)
+            .execution_options(synchronize_session="fetch")
+        )
         
-        # Atualiza campos do step
-        for key, value in step_data.items():
-            if hasattr(project, key):
-                setattr(project, key, value)
+        if self.db.get_bind().dialect.name == "postgresql":
+            # A linha antiga (travada) entra no FROM: o RETURNING devolve as
+            # flags calculadas antes da escrita, tudo no mesmo round-trip
+            old = select(Project.id, *changed).where(*owned).with_for_update().subquery("old")
+            stmt = stmt.where(Project.id == old.c.id).returning(*(old.c[key] for key in values))
+            row = self.db.execute(stmt).first()
+            project = row[0] if row is not None else None
+            changed_fields = {key for key, flag in zip(values, row[1:]) if flag} if row is not None else set()
+        else:
+            # SQLite não aceita a tabela do FROM no RETURNING: as flags vêm antes
+            flags = self.db.execute(select(*changed).where(*owned)).first() if changed else None
+            project = self.db.execute(stmt.where(*owned)).scalars().first()
+            changed_fields = {key for key in values if flags is not None and flags._mapping[key]}
         
-        # Atualiza current_step se avançou
-        if step_number > project.current_step:
-            project.current_step = step_number
+        if project is None:
+            # Nada mudou, ou o projeto não existe / é de outro usuário
+            project = self.db.query(Project).filter(*owned).first()
+            
+            if not project:
+                raise HTTPException(status_code=404, detail="Project not found")
+            changed_fields = set()
         
-        self.db.commit()
-        self.db.refresh(project)
+        # Recalcula só as fases que leem os campos que mudaram
+        try:
+            self._refresh_phase_results(project, changed_fields)
+        except ValueError:
+            # Biomassa desconhecida: descarta parciais, o erro aparece na finalização
+            self._clear_phase_results(project)
         
         return project
     
@@ -102,19 +154,56 @@ class ProjectStepService:
         """Step 10: Volume de Produção"""
         return self.update_step(project_id, user_id, 10, step_data.model_dump())
     
+    def update_steps(self, project_id: int, user_id: int, steps: Dict[int, BaseModel], calculate: bool = False) -> Project:
+        """
+        Vários steps de uma vez (PUT /projects/{id}/steps): os campos são
+        mesclados em ordem de step e gravados num único UPDATE; com
+        `calculate`, finaliza na mesma transação. Nada é gravado se algo falhar.
+        """
+        values = {}
+        for number in sorted(steps):
+            values.update(step_values(number, steps[number]))
+        
+        if steps:
+            project = self._apply_step(project_id, user_id, max(steps), values)
+        else:
+            project = self._get_owned_project(project_id, user_id)
+        
+        if calculate:
+            self._finalize(project)
+        
+        self.db.commit()
+        
+        return project
+    
+    def step_updater(self, step_number: int) -> Callable[[int, int, BaseModel], Project]:
+        """update_stepN method for a step number (1-10)"""
+        return {
+            1: self.update_step1,
+            2: self.update_step2,
+            3: self.update_step3,
+            4: self.update_step4,
+            5: self.update_step5,
+            6: self.update_step6,
+            7: self.update_step7,
+            8: self.update_step8,
+            9: self.update_step9,
+            10: self.update_step10
+        }[step_number]
+    
     def finalize_and_calculate(self, project_id: int, user_id: int) -> Project:
         """
         Finaliza projeto e executa cálculos
         Só pode ser chamado se current_step >= 10
         """
-        project = self.db.query(Project).filter(
-            Project.id == project_id,
-            Project.user_id == user_id
-        ).first()
-        
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = self._get_owned_project(project_id, user_id)
+        self._finalize(project)
+        self.db.commit()
         
+        return project
+    
+    def _finalize(self, project: Project) -> None:
+        """Valida e calcula os resultados finais, sem commit"""
         if project.current_step < 10:
             raise HTTPException(
                 status_code=400,
@@ -128,9 +217,11 @@ class ProjectStepService:
         if not project.production_volume:
             raise HTTPException(status_code=400, detail="Volume de produção é obrigatório")
         
-        # Executar cálculos
+        # Executar cálculos (só fases ausentes ou calculadas com outros fatores;
+        # o resto é a soma das parciais salvas em cada step)
         try:
-            results = self.calc_service.calculate_project_results(project)
+            self._refresh_phase_results(project, set())
+            results = self._combine_phase_results(project)
             
             # Atualizar projeto com resultados
             for key, value in results.items():
@@ -138,18 +229,75 @@ class ProjectStepService:
             
             # Marcar como completo
             project.status = ProjectStatus.COMPLETED
-            
-            self.db.commit()
-            self.db.refresh(project)
+            self.dependency_index.record_for_project(project)
+            self.db.flush()
             
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Erro ao calcular resultados: {str(e)}"
             )
+    
+    def _get_owned_project(self, project_id: int, user_id: int) -> Project:
+        project = self.db.query(Project).filter(
+            Project.id == project_id,
+            Project.user_id == user_id
+        ).first()
         
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
         return project
     
+    def _refresh_phase_results(self, project: Project, changed_fields: Set[str]) -> None:
+        """
+        Recalcula as fases cujos campos mudaram (ou ainda sem resultado) e grava
+        os parciais no projeto. carbon_intensity fica com a soma parcial; num
+        projeto COMPLETED os resultados finais são recombinados, também quando
+        só mudou um campo de RESULT_INPUTS (production_volume -> CBIOs).
+        Levanta ValueError se a biomassa não existir no catálogo.
+        """
+        if not project.biomass_type:
+            return
+        
+        catalog_version = self.calc_service.catalog_for(project).version
+        if project.results_catalog_version != catalog_version:
+            dirty = set(PHASE_COLUMNS)
+        else:
+            dirty = {
+                phase for phase, inputs in PHASE_INPUTS.items()
+                if getattr(project, phase) is None or changed_fields.intersection(inputs)
+            }
+        
+        completed = project.status == ProjectStatus.COMPLETED
+        if dirty:
+            for key, value in self.calc_service.calculate_phase_results(project, dirty).items():
+                setattr(project, key, value)
+            project.results_catalog_version = catalog_version
+        elif not (completed and changed_fields.intersection(RESULT_INPUTS)):
+            return
+        
+        if completed:
+            # Mantém os resultados finais coerentes com as novas entradas
+            for key, value in self._combine_phase_results(project).items():
+                setattr(project, key, value)
+            self.dependency_index.record_for_project(project)
+        else:
+            project.carbon_intensity = sum(getattr(project, phase) for phase in PHASE_COLUMNS)
+    
+    def _combine_phase_results(self, project: Project) -> dict:
+        phase_results = {key: getattr(project, key) for key in ("pci",) + PHASE_COLUMNS}
+        return self.calc_service.combine_phase_results(project, phase_results)
+    
+    def _clear_phase_results(self, project: Project) -> None:
+        # Parciais e finais (cbios, nota, redução): nada do cálculo anterior sobra
+        for key in RESULT_FIELDS:
+            setattr(project, key, None)
+        project.results_catalog_version = None
+        
+        # Resultados finais deixam de valer, como em ProjectService.update_project
+        if project.status == ProjectStatus.COMPLETED:
+            project.status = ProjectStatus.DRAFT
+    
     def get_project_progress(self, project_id: int, user_id: int) -> dict:
         """Retorna progresso do projeto"""
         project = self.db.query(Project).filter(
@@ -160,22 +308,83 @@ class ProjectStepService:
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        total_steps = 10
-        progress_percentage = (project.current_step / total_steps) * 100
+        return project_progress(project)
+
+
+def step_values(step_number: int, step_data: BaseModel) -> dict:
+    """Campos gravados por um step (como update_stepN: 1 e 10 completos, demais só os enviados)"""
+    return step_data.model_dump(exclude_unset=step_number not in (1, 10))
+
+
+def project_progress(project: Project) -> dict:
+    """Progresso (steps concluídos e se já pode calcular)"""
+    total_steps = 10
+    progress_percentage = (project.current_step / total_steps) * 100
+    
+    # Verifica se pode calcular (steps obrigatórios completos)
+    can_calculate = (
+        project.current_step >= 10 and
+        project.biomass_type is not None and
+        project.production_volume is not None
+    )
+    
+    return {
+        "id": project.id,
+        "name": project.name,
+        "status": project.status.value,
+        "current_step": project.current_step,
+        "total_steps": total_steps,
+        "progress_percentage": progress_percentage,
+        "can_calculate": can_calculate
+    }
+
+
+class AsyncProjectStepService:
+    """
+    ProjectStepService over an AsyncSession (async routes)
+    Steps and finalização reuse the sync rules through run_sync
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_project_step0(self, step_data: ProjectStep0, user_id: int) -> Project:
+        project = Project(
+            user_id=user_id,
+            status=ProjectStatus.DRAFT,
+            current_step=0,
+            **step_data.model_dump()
+        )
         
-        # Verifica se pode calcular (steps obrigatórios completos)
-        can_calculate = (
-            project.current_step >= 10 and
-            project.biomass_type is not None and
-            project.production_volume is not None
+        self.db.add(project)
+        await self.db.commit()
+        await self.db.refresh(project)
+        
+        return project
+    
+    async def update_step_number(self, project_id: int, user_id: int, step_number: int, step_data: BaseModel) -> Project:
+        """Steps 1-10, mesmas regras de ProjectStepService.update_stepN"""
+        return await self.db.run_sync(
+            lambda session: ProjectStepService(session).step_updater(step_number)(project_id, user_id, step_data)
+        )
+    
+    async def update_steps(self, project_id: int, user_id: int, steps: Dict[int, BaseModel], calculate: bool = False) -> Project:
+        return await self.db.run_sync(
+            lambda session: ProjectStepService(session).update_steps(project_id, user_id, steps, calculate)
         )
+    
+    async def finalize_and_calculate(self, project_id: int, user_id: int) -> Project:
+        return await self.db.run_sync(
+            lambda session: ProjectStepService(session).finalize_and_calculate(project_id, user_id)
+        )
+    
+    async def get_project_progress(self, project_id: int, user_id: int) -> dict:
+        result = await self.db.execute(
+            select(Project).where(Project.id == project_id, Project.user_id == user_id)
+        )
+        project = result.scalars().first()
         
-        return {
-            "id": project.id,
-            "name": project.name,
-            "status": project.status.value,
-            "current_step": project.current_step,
-            "total_steps": total_steps,
-            "progress_percentage": progress_percentage,
-            "can_calculate": can_calculate
-        }
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        return project_progress(project)
@@ -0,0 +1,378 @@
+"""
+Bulk recalculation of COMPLETED projects after the factor tables change.
+
+Projects are streamed by id with a server-side cursor (only the input
+columns), computed chunk by chunk with the NumPy batch kernel across a
+process pool, and written back with batched UPDATEs. A JSON checkpoint
+(last committed id) makes an interrupted run resumable.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from types import SimpleNamespace
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Project, ProjectStatus, round_cbios
+from app.services.batch_calculation import INPUT_FIELDS, RESULT_FIELDS, calculate_batch, columns_from_rows
+from app.services.dependency_index import Dependency, DependencyIndexService
+from app.services.factor_catalog import FactorCatalog, reload_factor_catalog
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecalculationProgress:
+    """Progress of a recalculation run (also the checkpoint content)"""
+    catalog_version: str
+    scope: Optional[str] = None  # dependency keys of a targeted run (None = all projects)
+    total: int = 0
+    processed: int = 0
+    updated: int = 0
+    failed: int = 0  # inputs the calculation rejects (e.g. unknown biomass)
+    skipped: int = 0  # edited by a user after being read: left as saved
+    last_id: int = 0
+    started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["finished"] = self.finished
+        return data
+
+
+# Per-process catalog for pool workers (set by the initializer)
+_worker_catalog: Optional[FactorCatalog] = None
+
+
+def _init_worker(catalog: FactorCatalog) -> None:
+    global _worker_catalog
+    _worker_catalog = catalog
+
+
+def _calculate_chunk(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return calculate_batch(columns, _worker_catalog)
+
+
+class RecalculationService:
+    """Recalculates every COMPLETED project with the current factors"""
+
+    def __init__(
+        self,
+        catalog: Optional[FactorCatalog] = None,
+        session_factory: sessionmaker = SessionLocal,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        on_progress: Optional[Callable[[RecalculationProgress], None]] = None
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.RECALC_CHUNK_SIZE
+        self.workers = workers if workers is not None else (settings.RECALC_WORKERS or os.cpu_count() or 1)
+        self.checkpoint_path = checkpoint_path if checkpoint_path is not None else settings.RECALC_CHECKPOINT_PATH
+        self.on_progress = on_progress
+        self._catalog = catalog
+        self._dependency_keys: Optional[Sequence[Dependency]] = None
+
+    @property
+    def catalog(self) -> FactorCatalog:
+        """
+        Fresh snapshot from the DB unless one was given (the tables were just
+        reseeded), published before any result is stamped with it so other
+        processes stop using the old one
+        """
+        if self._catalog is None:
+            db = self.session_factory()
+            try:
+                self._catalog = reload_factor_catalog(db)
+            finally:
+                db.close()
+        return self._catalog
+
+    def run(
+        self,
+        resume: bool = True,
+        dependency_keys: Optional[Sequence[Dependency]] = None
+    ) -> RecalculationProgress:
+        """
+        Recalculates COMPLETED projects: all of them, or only those whose
+        dependency index matches `dependency_keys` (see DependencyIndexService).
+        With resume=True an unfinished checkpoint for the same catalog version
+        and scope continues from its last committed id.
+        """
+        scope = json.dumps(sorted(dependency_keys), ensure_ascii=False) if dependency_keys is not None else None
+        self._dependency_keys = dependency_keys
+
+        progress = self._start_progress(resume, scope)
+        self._report(progress)
+
+        read_db = self.session_factory()
+        write_db = self.session_factory()
+        executor = self._create_executor()
+        pending: Deque[Tuple[List[int], List, List, Future]] = deque()
+
+        try:
+            for ids, updated_ats, rows in self._stream_chunks(read_db, progress.last_id):
+                future = self._submit(executor, columns_from_rows(rows))
+                pending.append((ids, updated_ats, rows, future))
+
+                # Keep a bounded number of chunks in flight, write back in id order
+                while len(pending) > max(self.workers, 1) * 2:
+                    self._write_chunk(write_db, progress, *pending.popleft())
+
+            while pending:
+                self._write_chunk(write_db, progress, *pending.popleft())
+
+            progress.finished_at = datetime.utcnow().isoformat()
+
+        except Exception as e:
+            write_db.rollback()
+            progress.error = str(e)
+            raise
+
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            read_db.close()
+            write_db.close()
+            self._save_checkpoint(progress)
+            self._report(progress)
+
+        return progress
+
+    def _start_progress(self, resume: bool, scope: Optional[str]) -> RecalculationProgress:
+        catalog_version = self.catalog.version
+
+        if resume:
+            checkpoint = self._load_checkpoint()
+            if (
+                checkpoint is not None
+                and not checkpoint.finished
+                and checkpoint.catalog_version == catalog_version
+                and checkpoint.scope == scope
+            ):
+                checkpoint.error = None
+                return checkpoint
+
+        db = self.session_factory()
+        try:
+            total = db.execute(
+                select(func.count(Project.id)).where(*self._filters(db))
+            ).scalar_one()
+        finally:
+            db.close()
+
+        return RecalculationProgress(catalog_version=catalog_version, scope=scope, total=total)
+
+    def _filters(self, db: Session) -> List:
+        filters = [Project.status == ProjectStatus.COMPLETED]
+        if self._dependency_keys is not None:
+            affected = DependencyIndexService(db).affected_projects_subquery(self._dependency_keys)
+            filters.append(Project.id.in_(affected))
+        return filters
+
+    def _stream_chunks(self, db: Session, after_id: int):
+        """
+        Yields (ids, updated_ats, input rows) per chunk via a server-side cursor.
+        Dialects without server-side cursors (SQLite, where an open cursor
+        also blocks the writer) page by id instead.
+        """
+        def query(last_id: int):
+            return (
+                select(Project.id, Project.updated_at, *[getattr(Project, name) for name in INPUT_FIELDS])
+                .where(*self._filters(db), Project.id > last_id)
+                .order_by(Project.id)
+            )
+
+        def to_chunk(rows):
+            ids = [row[0] for row in rows]
+            updated_ats = [row[1] for row in rows]
+            return ids, updated_ats, [tuple(row[2:]) for row in rows]
+
+        if db.get_bind().dialect.supports_server_side_cursors:
+            stmt = query(after_id).execution_options(yield_per=self.chunk_size)
+            for rows in db.execute(stmt).partitions(self.chunk_size):
+                yield to_chunk(rows)
+            return
+
+        last_id = after_id
+        while True:
+            rows = db.execute(query(last_id).limit(self.chunk_size)).all()
+            db.rollback()  # release the read lock before the writer commits
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield to_chunk(rows)
+
+    def _create_executor(self) -> Optional[Executor]:
+        if self.workers <= 1:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.catalog,)
+        )
+
+    def _submit(self, executor: Optional[Executor], columns: Dict[str, np.ndarray]) -> Future:
+        if executor is not None:
+            return executor.submit(_calculate_chunk, columns)
+
+        future: Future = Future()
+        future.set_result(calculate_batch(columns, self.catalog))
+        return future
+
+    def _write_chunk(
+        self,
+        db: Session,
+        progress: RecalculationProgress,
+        ids: List[int],
+        updated_ats: List,
+        rows: List[Tuple],
+        future: Future
+    ) -> None:
+        results = future.result()
+        valid = results["valid"].tolist()
+        values = {name: results[name].tolist() for name in RESULT_FIELDS}
+
+        params = []
+        for i, project_id in enumerate(ids):
+            if not valid[i]:
+                continue
+            row = {name: values[name][i] for name in RESULT_FIELDS}
+            row["cbios"] = round_cbios(row["cbios"])  # mesmo arredondamento em todo caminho de escrita
+            row["b_id"] = project_id
+            row["b_updated_at"] = updated_ats[i]
+            row["results_catalog_version"] = self.catalog.version
+            params.append(row)
+
+        updated = skipped = 0
+        if params:
+            # Skip rows edited by a user since they were read
+            stmt = (
+                update(Project.__table__)
+                .where(
+                    Project.__table__.c.id == bindparam("b_id"),
+                    Project.__table__.c.updated_at.is_not_distinct_from(bindparam("b_updated_at"))
+                )
+                .values({name: bindparam(name) for name in RESULT_FIELDS + ("results_catalog_version",)})
+            )
+            result = db.execute(stmt, params)
+            if result.supports_sane_multi_rowcount():
+                updated = result.rowcount
+                skipped = len(params) - updated
+            else:
+                # Driver sem rowcount por lote: não há como separar os pulados
+                updated = len(params)
+
+        # Backfill the dependency index for projects calculated before it existed
+        DependencyIndexService(db).record_missing([
+            (project_id, SimpleNamespace(**dict(zip(INPUT_FIELDS, row))))
+            for project_id, row, is_valid in zip(ids, rows, valid)
+            if is_valid
+        ])
+        db.commit()
+
+        progress.processed += len(ids)
+        progress.updated += updated
+        progress.skipped += skipped
+        progress.failed += len(ids) - len(params)
+        progress.last_id = ids[-1]
+
+        self._save_checkpoint(progress)
+        self._report(progress)
+
+    def _load_checkpoint(self) -> Optional[RecalculationProgress]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            data = json.load(f)
+        data.pop("finished", None)
+        return RecalculationProgress(**data)
+
+    def _save_checkpoint(self, progress: RecalculationProgress) -> None:
+        if not self.checkpoint_path:
+            return
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(progress.to_dict(), f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _report(self, progress: RecalculationProgress) -> None:
+        if self.on_progress:
+            self.on_progress(progress)
+
+
+# Status of the run started from the admin endpoint (per process)
+_status_lock = threading.Lock()
+_current_status: Optional[Dict] = None
+_running = False
+
+
+def get_recalculation_status() -> Optional[Dict]:
+    return _current_status
+
+
+def try_start_recalculation() -> bool:
+    """
+    Marks a run as started; False if one is already running in this process.
+    Whoever gets True must either hand off to run_recalculation_in_background
+    or call release_recalculation()
+    """
+    global _running
+    with _status_lock:
+        if _running:
+            return False
+        _running = True
+        return True
+
+
+def release_recalculation() -> None:
+    """Clears the running flag when the run is abandoned before it starts"""
+    global _running
+    with _status_lock:
+        _running = False
+
+
+def run_recalculation_in_background(
+    resume: bool = True,
+    dependency_keys: Optional[Sequence[Dependency]] = None
+) -> None:
+    """Entry point for BackgroundTasks (call try_start_recalculation first)"""
+    global _running, _current_status
+
+    def on_progress(progress: RecalculationProgress) -> None:
+        global _current_status
+        _current_status = progress.to_dict()
+
+    try:
+        RecalculationService(on_progress=on_progress).run(resume=resume, dependency_keys=dependency_keys)
+    except Exception as e:
+        logger.exception("Recalculation failed")
+        # GET /admin/recalculate mostra a falha (também as anteriores ao primeiro progresso)
+        _current_status = {
+            **(_current_status or {}),
+            "error": f"{type(e).__name__}: {e}",
+            "failed_at": datetime.utcnow().isoformat(),
+        }
+    finally:
+        with _status_lock:
+            _running = False
@@ -0,0 +1,22 @@
+"""
+Evaluator for the BioCalc_EngS.xlsx formulas (extracted_data/).
+
+The formulas are parsed into a typed DAG, compiled once into an evaluation
+plan and evaluated with dirty-cell recomputation.
+"""
+from app.services.spreadsheet.formula import parse_formula
+from app.services.spreadsheet.functions import ExcelError
+from app.services.spreadsheet.graph import CellKind, EvaluationPlan, FormulaGraph, Spreadsheet
+from app.services.spreadsheet.biocalc import evaluate_project, get_biocalc_plan, project_inputs
+
+__all__ = [
+    "parse_formula",
+    "ExcelError",
+    "CellKind",
+    "EvaluationPlan",
+    "FormulaGraph",
+    "Spreadsheet",
+    "evaluate_project",
+    "get_biocalc_plan",
+    "project_inputs",
+]
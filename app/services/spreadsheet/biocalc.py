@@ -0,0 +1,183 @@
+"""
+BioCalc_EngS.xlsx bound to the Project model.
+
+Maps Project fields to the input cells of the EngS_BioCalc sheet and the
+result cells (C21..C29, H24, H29) back to the keys returned by
+CalculationService.calculate_project_results. The plan is compiled once
+per process; each thread keeps its own Spreadsheet, so consecutive
+evaluations only recompute the cells downstream of the inputs that differ.
+
+Lookups follow the spreadsheet lists ('Dados auxiliares'). Vehicle names
+from the database (VehicleEmissionFactor) are translated to the sheet list
+(VEHICLE_NAMES); a vehicle in neither raises ValueError instead of letting
+IFERROR turn the transport emissions into 0.
+"""
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.spreadsheet.functions import ExcelError
+from app.services.spreadsheet.graph import EvaluationPlan, FormulaGraph, Spreadsheet
+
+ENTRY_SHEET = "EngS_BioCalc"
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+def _percent(value: Any) -> Any:
+    return value / 100.0 if value is not None else None
+
+
+def _kg_to_t(value: Any) -> Any:
+    return value / 1000.0 if value is not None else None
+
+
+def _m3_to_liters(value: Any) -> Any:
+    return value * 1000.0 if value is not None else None
+
+
+# 'Dados auxiliares'!B70:B76 (VLOOKUP range of E50, E101 and E112), spaces included
+SHEET_VEHICLES: Tuple[str, ...] = (
+    "Transporte, caminhão 7.5-16t",
+    "Transporte caminhão 16-32t",
+    "Transporte, caminhão  >32t",
+    "Transporte, caminhão  60m³",
+    "Transporte, navio",
+    "Transporte, balsa",
+    "Transporte, ferroviário",
+)
+
+# VehicleEmissionFactor.vehicle_type (scripts/seed_database.py) -> sheet list
+VEHICLE_NAMES: Dict[str, str] = {
+    "Caminhão Toco/Semipesado (16-32t)": "Transporte caminhão 16-32t",
+    "Carreta/Pesado (>32t)": "Transporte, caminhão  >32t",
+    "VUC (Urbano)": "Transporte, caminhão 7.5-16t",
+    "Trem (Ferroviário Padrão)": "Transporte, ferroviário",
+}
+
+
+def _vehicle(value: Any) -> Any:
+    if value is None or value == "" or value in SHEET_VEHICLES:
+        return value or None
+    if value in VEHICLE_NAMES:
+        return VEHICLE_NAMES[value]
+    raise ValueError(f"Vehicle '{value}' has no match in the spreadsheet list")
+
+
+# (Project field, input cell, conversion to the spreadsheet unit)
+INPUT_CELLS: Tuple[Tuple[str, str, Callable[[Any], Any]], ...] = (
+    # Fase agrícola
+    ("biomass_type", "E33", _same),
+    ("biomass_consumption_known", "E34", _same),
+    ("biomass_consumption_value", "E35", _same),
+    ("starch_input", "E38", _same),
+    ("production_state", "E42", _same),
+    ("wood_residue_stage", "E44", _same),
+    ("agr_transport_distance", "E49", _same),
+    ("agr_transport_vehicle", "E50", _vehicle),
+    # Fase industrial
+    ("biomass_processed", "E59", _same),
+    ("elec_grid", "E62", _same),
+    ("elec_other", "E63", _same),
+    ("elec_hydro", "E64", _same),
+    ("elec_biomass", "E65", _same),
+    ("elec_wind", "E66", _same),
+    ("elec_solar", "E67", _same),
+    ("fuel_diesel", "E71", _same),
+    ("fuel_gnv", "E72", _same),
+    ("fuel_lpg", "E73", _same),
+    ("fuel_gasoline", "E74", _same),
+    ("fuel_ethanol", "E75", _same),
+    ("fuel_biomass", "E78", _same),
+    ("water_consumption", "E87", _m3_to_liters),
+    ("input_lubricant", "E88", _same),
+    # Fase de distribuição
+    ("dom_mass", "E96", _kg_to_t),
+    ("dom_distance", "E97", _same),
+    ("dom_modal_rail_pct", "E98", _percent),
+    ("dom_vehicle_type", "E101", _vehicle),
+    ("exp_mass", "E107", _same),
+    ("exp_factory_port_dist", "E108", _same),
+    ("exp_modal_rail_pct", "E109", _percent),
+    ("exp_modal_water_pct", "E110", _percent),
+    ("exp_vehicle_port", "E112", _vehicle),
+    ("exp_port_consumer_dist", "E113", _same),
+    # CBIOs
+    ("production_volume", "H21", _same),
+)
+
+# calculate_project_results key -> result cell
+RESULT_CELLS: Dict[str, str] = {
+    "carbon_intensity": "C21",
+    "agricultural_emissions": "C23",
+    "industrial_emissions": "C24",
+    "transport_emissions": "C25",
+    "use_emissions": "C26",
+    "efficiency_note": "C27",
+    "emission_reduction": "C29",
+    "cbios": "H24",
+    "cbios_revenue": "H29",
+}
+
+
+def project_inputs(project: Any) -> Dict[str, Any]:
+    """
+    Input cell -> value for a Project (or any object with the same attributes)
+    Raises ValueError for a vehicle missing from VEHICLE_NAMES and the sheet list
+    """
+    inputs = {cell: convert(getattr(project, field, None)) for field, cell, convert in INPUT_CELLS}
+    # Sem informação de consumo específico o wizard assume "Não" (E34)
+    if inputs["E34"] is None:
+        inputs["E34"] = "Não"
+    # Sem estado de produção informado, usa o estado da empresa (E42)
+    if inputs["E42"] is None:
+        inputs["E42"] = getattr(project, "state", None)
+    return inputs
+
+
+_plan: Optional[EvaluationPlan] = None
+_plan_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_biocalc_plan() -> EvaluationPlan:
+    """Compiled EngS_BioCalc plan (built on first use from SPREADSHEET_DATA_DIR)"""
+    global _plan
+    if _plan is None:
+        with _plan_lock:
+            if _plan is None:
+                graph = FormulaGraph.from_extracted_data(settings.SPREADSHEET_DATA_DIR, ENTRY_SHEET)
+                _plan = graph.compile()
+    return _plan
+
+
+def _thread_sheet() -> Spreadsheet:
+    plan = get_biocalc_plan()
+    sheet = getattr(_local, "sheet", None)
+    if sheet is None or sheet.plan is not plan:
+        sheet = _local.sheet = plan.new_sheet()
+    return sheet
+
+
+def _result_value(value: Any) -> Optional[float]:
+    # Text fallbacks (" ", "") and Excel errors mean "no result"
+    if isinstance(value, ExcelError) or isinstance(value, str) or value is None:
+        return None
+    return float(value)
+
+
+def evaluate_project(project: Any, sheet: Optional[Spreadsheet] = None) -> Dict[str, Optional[float]]:
+    """
+    Evaluates the spreadsheet for a project. Returns the RESULT_CELLS keys
+    (emission_reduction in %, like calculate_project_results); None where
+    the spreadsheet shows a blank/error. ValueError: see project_inputs.
+    """
+    sheet = sheet or _thread_sheet()
+    sheet.set_inputs(project_inputs(project))
+
+    results = {key: _result_value(sheet.get(cell)) for key, cell in RESULT_CELLS.items()}
+    if results["emission_reduction"] is not None:
+        results["emission_reduction"] *= 100
+    return results
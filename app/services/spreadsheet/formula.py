@@ -0,0 +1,318 @@
+"""
+Tokenizer and parser for the subset of Excel formulas used by BioCalc_EngS.xlsx.
+
+Formulas are parsed into a small typed AST; references are resolved to
+absolute (sheet, column, row) addresses at parse time.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+
+def column_index(letters: str) -> int:
+    """'A' -> 1, 'AA' -> 27"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord("A") + 1)
+    return index
+
+
+def column_letters(index: int) -> str:
+    """1 -> 'A', 27 -> 'AA'"""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+CellAddress = Tuple[str, int, int]  # (sheet, column, row)
+
+_CELL_RE = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+
+def parse_address(address: str, default_sheet: str) -> CellAddress:
+    """'E33', "'Dados auxiliares'!D32" or 'EngS_BioCalc!E33' -> (sheet, column, row)"""
+    sheet = default_sheet
+    if "!" in address:
+        sheet, address = address.rsplit("!", 1)
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+
+    match = _CELL_RE.match(address.strip())
+    if not match:
+        raise ValueError(f"Invalid cell address '{address}'")
+    return sheet, column_index(match.group(1)), int(match.group(2))
+
+
+def format_address(address: CellAddress) -> str:
+    sheet, column, row = address
+    return f"{sheet}!{column_letters(column)}{row}"
+
+
+# ============================================================================
+# AST
+# ============================================================================
+
+@dataclass(frozen=True)
+class Number:
+    value: float
+
+
+@dataclass(frozen=True)
+class Text:
+    value: str
+
+
+@dataclass(frozen=True)
+class Boolean:
+    value: bool
+
+
+@dataclass(frozen=True)
+class Empty:
+    """Omitted function argument, e.g. IFERROR(x,)"""
+
+
+@dataclass(frozen=True)
+class CellRef:
+    address: CellAddress
+
+
+@dataclass(frozen=True)
+class RangeRef:
+    sheet: str
+    first_column: int
+    first_row: int
+    last_column: int
+    last_row: int
+
+    def addresses(self) -> List[List[CellAddress]]:
+        """Cells row by row"""
+        return [
+            [(self.sheet, column, row) for column in range(self.first_column, self.last_column + 1)]
+            for row in range(self.first_row, self.last_row + 1)
+        ]
+
+
+@dataclass(frozen=True)
+class UnaryOp:
+    op: str
+    operand: "Node"
+
+
+@dataclass(frozen=True)
+class BinaryOp:
+    op: str
+    left: "Node"
+    right: "Node"
+
+
+@dataclass(frozen=True)
+class Call:
+    name: str
+    args: Tuple["Node", ...]
+
+
+Node = Union[Number, Text, Boolean, Empty, CellRef, RangeRef, UnaryOp, BinaryOp, Call]
+
+
+def references(node: Node) -> List[CellAddress]:
+    """Every cell read by the expression (ranges expanded)"""
+    if isinstance(node, CellRef):
+        return [node.address]
+    if isinstance(node, RangeRef):
+        return [address for row in node.addresses() for address in row]
+    if isinstance(node, UnaryOp):
+        return references(node.operand)
+    if isinstance(node, BinaryOp):
+        return references(node.left) + references(node.right)
+    if isinstance(node, Call):
+        return [address for arg in node.args for address in references(arg)]
+    return []
+
+
+# ============================================================================
+# Tokenizer
+# ============================================================================
+
+_SHEET = r"(?:'(?:[^']|'')+'|[A-Za-z_][\w\.]*)!"
+_CELL = r"\$?[A-Za-z]{1,3}\$?\d+"
+
+_TOKEN_RE = re.compile(
+    rf"""
+    (?P<ws>\s+)
+    |(?P<string>"(?:[^"]|"")*")
+    |(?P<ref>(?:{_SHEET})?{_CELL}(?::{_CELL})?)(?![\w(])
+    |(?P<func>[A-Za-z_][\w\.]*)(?=\s*\()
+    |(?P<bool>TRUE|FALSE)(?!\w)
+    |(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<op><>|<=|>=|[-+*/^&=<>%])
+    |(?P<punct>[(),;])
+    """,
+    re.VERBOSE
+)
+
+Token = Tuple[str, str]
+
+
+def tokenize(formula: str) -> List[Token]:
+    tokens: List[Token] = []
+    position = 0
+    while position < len(formula):
+        match = _TOKEN_RE.match(formula, position)
+        if not match:
+            raise ValueError(f"Unexpected character at {position} in {formula!r}")
+        kind = match.lastgroup
+        if kind != "ws":
+            tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+# ============================================================================
+# Parser (Excel precedence: comparison < & < +- < */ < ^ < unary < %)
+# ============================================================================
+
+_COMPARISONS = ("=", "<>", "<", ">", "<=", ">=")
+
+
+class _Parser:
+    def __init__(self, tokens: List[Token], sheet: str, formula: str):
+        self.tokens = tokens
+        self.position = 0
+        self.sheet = sheet
+        self.formula = formula
+
+    def peek(self) -> Optional[Token]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> Token:
+        token = self.peek()
+        if token is None:
+            raise ValueError(f"Unexpected end of formula {self.formula!r}")
+        self.position += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, text = self.take()
+        if text != value:
+            raise ValueError(f"Expected '{value}' but got '{text}' in {self.formula!r}")
+
+    def at(self, kind: str, *values: str) -> bool:
+        token = self.peek()
+        return token is not None and token[0] == kind and (not values or token[1] in values)
+
+    def parse(self) -> Node:
+        node = self.comparison()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected '{self.peek()[1]}' in {self.formula!r}")
+        return node
+
+    def comparison(self) -> Node:
+        node = self.concat()
+        while self.at("op", *_COMPARISONS):
+            op = self.take()[1]
+            node = BinaryOp(op, node, self.concat())
+        return node
+
+    def concat(self) -> Node:
+        node = self.additive()
+        while self.at("op", "&"):
+            self.take()
+            node = BinaryOp("&", node, self.additive())
+        return node
+
+    def additive(self) -> Node:
+        node = self.multiplicative()
+        while self.at("op", "+", "-"):
+            op = self.take()[1]
+            node = BinaryOp(op, node, self.multiplicative())
+        return node
+
+    def multiplicative(self) -> Node:
+        node = self.power()
+        while self.at("op", "*", "/"):
+            op = self.take()[1]
+            node = BinaryOp(op, node, self.power())
+        return node
+
+    def power(self) -> Node:
+        node = self.unary()
+        while self.at("op", "^"):
+            self.take()
+            node = BinaryOp("^", node, self.unary())
+        return node
+
+    def unary(self) -> Node:
+        if self.at("op", "-", "+"):
+            op = self.take()[1]
+            return UnaryOp(op, self.unary())
+        return self.postfix()
+
+    def postfix(self) -> Node:
+        node = self.primary()
+        while self.at("op", "%"):
+            self.take()
+            node = UnaryOp("%", node)
+        return node
+
+    def primary(self) -> Node:
+        kind, text = self.take()
+
+        if kind == "number":
+            return Number(float(text))
+        if kind == "string":
+            return Text(text[1:-1].replace('""', '"'))
+        if kind == "bool":
+            return Boolean(text == "TRUE")
+        if kind == "ref":
+            return self.reference(text)
+        if kind == "func":
+            return self.call(text)
+        if text == "(":
+            node = self.comparison()
+            self.expect(")")
+            return node
+
+        raise ValueError(f"Unexpected '{text}' in {self.formula!r}")
+
+    def reference(self, text: str) -> Node:
+        if ":" not in text:
+            return CellRef(parse_address(text, self.sheet))
+
+        first, last = text.split(":")
+        sheet, first_column, first_row = parse_address(first, self.sheet)
+        _, last_column, last_row = parse_address(last, sheet)
+        return RangeRef(
+            sheet,
+            min(first_column, last_column), min(first_row, last_row),
+            max(first_column, last_column), max(first_row, last_row)
+        )
+
+    def call(self, name: str) -> Node:
+        self.expect("(")
+        args: List[Node] = []
+        if self.at("punct", ")"):
+            self.take()
+            return Call(name.upper(), ())
+
+        while True:
+            if self.at("punct", ",", ";", ")"):
+                args.append(Empty())
+            else:
+                args.append(self.comparison())
+
+            kind, text = self.take()
+            if text == ")":
+                return Call(name.upper(), tuple(args))
+            if text not in (",", ";"):
+                raise ValueError(f"Unexpected '{text}' in {self.formula!r}")
+
+
+def parse_formula(formula: str, sheet: str) -> Node:
+    """Parses '=...' (the leading '=' is optional) with references relative to `sheet`"""
+    text = formula.strip()
+    if text.startswith("="):
+        text = text[1:]
+    return _Parser(tokenize(text), sheet, formula).parse()
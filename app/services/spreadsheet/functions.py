@@ -0,0 +1,558 @@
+"""
+Excel value semantics and the compiler from formula AST to Python closures.
+
+Each expression is compiled once into a function of the flat cell-value
+list, so evaluating a cell is a chain of plain Python calls. Excel errors
+(#N/A, #DIV/0!, ...) are raised as ExcelError and stored as cell values,
+which keeps IFERROR/IFS lazy exactly like the spreadsheet.
+"""
+import re
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.services.spreadsheet.formula import (
+    Node, Number, Text, Boolean, Empty, CellRef, RangeRef, UnaryOp, BinaryOp, Call, CellAddress
+)
+
+
+class ExcelError(Exception):
+    """An Excel error value (#N/A, #VALUE!, ...)"""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+    def __repr__(self) -> str:
+        return self.code
+
+
+NA = "#N/A"
+VALUE = "#VALUE!"
+DIV0 = "#DIV/0!"
+REF = "#REF!"
+NAME = "#NAME?"
+NUM = "#NUM!"
+
+Values = List[Any]
+Getter = Callable[[Values], Any]
+
+
+class Arg:
+    """Compiled argument: a scalar expression, a single-cell reference or a range"""
+    __slots__ = ("kind", "get", "shape")
+
+    VALUE = "value"
+    REF = "ref"
+    RANGE = "range"
+
+    def __init__(self, kind: str, get: Getter, shape: Optional[tuple] = None):
+        self.kind = kind
+        self.get = get
+        self.shape = shape  # (rows, columns) for ranges
+
+
+# ============================================================================
+# Coercion
+# ============================================================================
+
+def _raise_if_error(value: Any) -> Any:
+    if isinstance(value, ExcelError):
+        raise ExcelError(value.code)
+    return value
+
+
+def to_number(value: Any) -> float:
+    value = _raise_if_error(value)
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value == "":
+        # Texto vazio conta como 0, como no app que calculou os valores do
+        # BioCalc_EngS.xlsx (H29 = H24*H27 com H24 = ""); " " continua #VALUE!
+        return 0.0
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        raise ExcelError(VALUE)
+
+
+def to_text(value: Any) -> str:
+    value = _raise_if_error(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else format(value, ".15g")
+    return str(value)
+
+
+def to_bool(value: Any) -> bool:
+    value = _raise_if_error(value)
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    text = str(value).upper()
+    if text in ("TRUE", "FALSE"):
+        return text == "TRUE"
+    raise ExcelError(VALUE)
+
+
+def _type_rank(value: Any) -> int:
+    # Excel ordering: numbers < text < logical
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def compare(op: str, left: Any, right: Any) -> bool:
+    left = _raise_if_error(left)
+    right = _raise_if_error(right)
+
+    # Blank compares as "" against text and as 0 otherwise
+    if left is None:
+        left = "" if isinstance(right, str) else (False if isinstance(right, bool) else 0.0)
+    if right is None:
+        right = "" if isinstance(left, str) else (False if isinstance(left, bool) else 0.0)
+
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        a, b = left_rank, right_rank
+    elif left_rank == 1:
+        a, b = left.lower(), right.lower()
+    else:
+        a, b = left, right
+
+    if op == "=":
+        return a == b
+    if op == "<>":
+        return a != b
+    if op == "<":
+        return a < b
+    if op == ">":
+        return a > b
+    if op == "<=":
+        return a <= b
+    return a >= b
+
+
+def _numbers_in(values: Sequence[Any]) -> List[float]:
+    """Numbers inside references (text, logical and blank cells are ignored)"""
+    result = []
+    for value in values:
+        _raise_if_error(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            result.append(float(value))
+    return result
+
+
+def _flatten(rows: Sequence[Sequence[Any]]) -> List[Any]:
+    return [value for row in rows for value in row]
+
+
+def _collect_numbers(args: Sequence[Arg], values: Values) -> List[float]:
+    numbers: List[float] = []
+    for arg in args:
+        if arg.kind == Arg.RANGE:
+            numbers.extend(_numbers_in(_flatten(arg.get(values))))
+        elif arg.kind == Arg.REF:
+            numbers.extend(_numbers_in([arg.get(values)]))
+        else:
+            numbers.append(to_number(arg.get(values)))
+    return numbers
+
+
+def _as_rows(arg: Arg, values: Values) -> List[List[Any]]:
+    if arg.kind == Arg.RANGE:
+        return arg.get(values)
+    return [[arg.get(values)]]
+
+
+def _scalar(arg: Arg, values: Values) -> Any:
+    if arg.kind == Arg.RANGE:
+        rows = arg.get(values)
+        if len(rows) == 1 and len(rows[0]) == 1:
+            return _raise_if_error(rows[0][0])
+        raise ExcelError(VALUE)
+    return _raise_if_error(arg.get(values))
+
+
+def _wildcard(pattern: str) -> "re.Pattern":
+    """Excel wildcards (* ? with ~ escape) as a case-insensitive full match"""
+    out = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            out.append(re.escape(char))
+            escaped = False
+        elif char == "~":
+            escaped = True
+        elif char == "*":
+            out.append(".*")
+        elif char == "?":
+            out.append(".")
+        else:
+            out.append(re.escape(char))
+    return re.compile("".join(out), re.IGNORECASE | re.DOTALL)
+
+
+def _matches(criterion: Any, value: Any) -> bool:
+    """Exact-match semantics of VLOOKUP/MATCH (case-insensitive, wildcards for text)"""
+    if isinstance(value, ExcelError):
+        return False
+    if isinstance(criterion, str):
+        if not isinstance(value, str):
+            return False
+        if any(char in criterion for char in "*?~"):
+            return _wildcard(criterion).fullmatch(value) is not None
+        return criterion.lower() == value.lower()
+    if isinstance(criterion, bool):
+        return isinstance(value, bool) and value == criterion
+    if value is None or isinstance(value, (str, bool)):
+        return False
+    return float(value) == float(criterion)
+
+
+_CRITERIA_RE = re.compile(r"^(<=|>=|<>|<|>|=)?(.*)$", re.DOTALL)
+
+
+def _criteria(criterion: Any) -> Callable[[Any], bool]:
+    """SUMIF/COUNTIF criteria (">0", "Pinus", 5, "<>x", ...)"""
+    if not isinstance(criterion, str):
+        return lambda value: _matches(criterion, value)
+
+    op, operand = _CRITERIA_RE.match(criterion).groups()
+    try:
+        target: Any = float(operand)
+    except ValueError:
+        target = operand
+
+    if op is None or op == "=":
+        if target == "":
+            return lambda value: value is None or value == ""
+        return lambda value: _matches(target, value)
+
+    def check(value: Any) -> bool:
+        if isinstance(value, ExcelError) or value is None:
+            return op == "<>" and target != ""
+        if isinstance(target, float) and (isinstance(value, str) or isinstance(value, bool)):
+            return op == "<>"
+        if isinstance(target, str) and not isinstance(value, str):
+            return op == "<>"
+        return compare(op, value, target)
+
+    return check
+
+
+# ============================================================================
+# Functions (lazy: each receives compiled Args and the value list)
+# ============================================================================
+
+def fn_sum(args: Sequence[Arg], values: Values) -> float:
+    return sum(_collect_numbers(args, values), 0.0)
+
+
+def fn_average(args: Sequence[Arg], values: Values) -> float:
+    numbers = _collect_numbers(args, values)
+    if not numbers:
+        raise ExcelError(DIV0)
+    return sum(numbers, 0.0) / len(numbers)
+
+
+def fn_min(args: Sequence[Arg], values: Values) -> float:
+    numbers = _collect_numbers(args, values)
+    return min(numbers) if numbers else 0.0
+
+
+def fn_max(args: Sequence[Arg], values: Values) -> float:
+    numbers = _collect_numbers(args, values)
+    return max(numbers) if numbers else 0.0
+
+
+def fn_iferror(args: Sequence[Arg], values: Values) -> Any:
+    if len(args) != 2:
+        raise ExcelError(VALUE)
+    try:
+        return _scalar(args[0], values)
+    except ExcelError:
+        return _scalar(args[1], values)
+
+
+def fn_if(args: Sequence[Arg], values: Values) -> Any:
+    if not 2 <= len(args) <= 3:
+        raise ExcelError(VALUE)
+    if to_bool(_scalar(args[0], values)):
+        return _scalar(args[1], values)
+    return _scalar(args[2], values) if len(args) == 3 else False
+
+
+def fn_ifs(args: Sequence[Arg], values: Values) -> Any:
+    if len(args) % 2:
+        raise ExcelError(VALUE)
+    for i in range(0, len(args), 2):
+        if to_bool(_scalar(args[i], values)):
+            return _scalar(args[i + 1], values)
+    raise ExcelError(NA)
+
+
+def fn_rounddown(args: Sequence[Arg], values: Values) -> float:
+    number = to_number(_scalar(args[0], values))
+    digits = int(to_number(_scalar(args[1], values))) if len(args) > 1 else 0
+    quantum = Decimal(1).scaleb(-digits)
+    return float(Decimal(repr(number)).quantize(quantum, rounding=ROUND_DOWN))
+
+
+def fn_round(args: Sequence[Arg], values: Values) -> float:
+    number = to_number(_scalar(args[0], values))
+    digits = int(to_number(_scalar(args[1], values))) if len(args) > 1 else 0
+    quantum = Decimal(1).scaleb(-digits)
+    return float(Decimal(repr(number)).quantize(quantum, rounding=ROUND_HALF_UP))
+
+
+def fn_vlookup(args: Sequence[Arg], values: Values) -> Any:
+    if not 3 <= len(args) <= 4:
+        raise ExcelError(VALUE)
+
+    lookup = _scalar(args[0], values)
+    rows = _as_rows(args[1], values)
+    column = int(to_number(_scalar(args[2], values)))
+    approximate = to_bool(_scalar(args[3], values)) if len(args) == 4 else True
+
+    if column < 1:
+        raise ExcelError(VALUE)
+    if not rows or column > len(rows[0]):
+        raise ExcelError(REF)
+    if lookup is None:
+        lookup = 0.0
+
+    if not approximate:
+        for row in rows:
+            if _matches(lookup, row[0]):
+                return _raise_if_error(row[column - 1])
+        raise ExcelError(NA)
+
+    # Approximate match: last row whose key is <= lookup (table sorted ascending)
+    found = None
+    for row in rows:
+        key = row[0]
+        if key is None or isinstance(key, ExcelError) or _type_rank(key) != _type_rank(lookup):
+            continue
+        if compare("<=", key, lookup):
+            found = row
+        else:
+            break
+    if found is None:
+        raise ExcelError(NA)
+    return _raise_if_error(found[column - 1])
+
+
+def fn_sumif(args: Sequence[Arg], values: Values) -> float:
+    if not 2 <= len(args) <= 3:
+        raise ExcelError(VALUE)
+
+    criteria_rows = _as_rows(args[0], values)
+    check = _criteria(_scalar(args[1], values))
+    sum_rows = _as_rows(args[2], values) if len(args) == 3 else criteria_rows
+
+    total = 0.0
+    for criteria_row, sum_row in zip(criteria_rows, sum_rows):
+        for criterion_value, value in zip(criteria_row, sum_row):
+            if not check(criterion_value):
+                continue
+            _raise_if_error(value)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                total += value
+    return total
+
+
+def fn_sumproduct(args: Sequence[Arg], values: Values) -> float:
+    arrays = [_flatten(_as_rows(arg, values)) for arg in args]
+    if not arrays:
+        raise ExcelError(VALUE)
+    size = len(arrays[0])
+    if any(len(array) != size for array in arrays):
+        raise ExcelError(VALUE)
+
+    total = 0.0
+    for items in zip(*arrays):
+        product = 1.0
+        for item in items:
+            _raise_if_error(item)
+            # Non-numeric entries count as zero
+            product *= item if isinstance(item, (int, float)) and not isinstance(item, bool) else 0.0
+        total += product
+    return total
+
+
+def fn_and(args: Sequence[Arg], values: Values) -> bool:
+    return all(to_bool(value) for arg in args for value in _flatten(_as_rows(arg, values)) if value is not None)
+
+
+def fn_or(args: Sequence[Arg], values: Values) -> bool:
+    return any(to_bool(value) for arg in args for value in _flatten(_as_rows(arg, values)) if value is not None)
+
+
+def fn_not(args: Sequence[Arg], values: Values) -> bool:
+    return not to_bool(_scalar(args[0], values))
+
+
+def fn_abs(args: Sequence[Arg], values: Values) -> float:
+    return abs(to_number(_scalar(args[0], values)))
+
+
+FUNCTIONS: Dict[str, Callable[[Sequence[Arg], Values], Any]] = {
+    "SUM": fn_sum,
+    "AVERAGE": fn_average,
+    "MIN": fn_min,
+    "MAX": fn_max,
+    "IF": fn_if,
+    "IFS": fn_ifs,
+    "IFERROR": fn_iferror,
+    "ROUND": fn_round,
+    "ROUNDDOWN": fn_rounddown,
+    "VLOOKUP": fn_vlookup,
+    "SUMIF": fn_sumif,
+    "SUMPRODUCT": fn_sumproduct,
+    "AND": fn_and,
+    "OR": fn_or,
+    "NOT": fn_not,
+    "ABS": fn_abs,
+}
+
+
+# ============================================================================
+# Compiler
+# ============================================================================
+
+def _arithmetic(op: str, left: Getter, right: Getter) -> Getter:
+    if op == "+":
+        return lambda v: to_number(left(v)) + to_number(right(v))
+    if op == "-":
+        return lambda v: to_number(left(v)) - to_number(right(v))
+    if op == "*":
+        return lambda v: to_number(left(v)) * to_number(right(v))
+
+    if op == "/":
+        def divide(v: Values) -> float:
+            numerator = to_number(left(v))
+            denominator = to_number(right(v))
+            if denominator == 0:
+                raise ExcelError(DIV0)
+            return numerator / denominator
+        return divide
+
+    def power(v: Values) -> float:
+        base = to_number(left(v))
+        exponent = to_number(right(v))
+        try:
+            result = base ** exponent
+        except (OverflowError, ZeroDivisionError):
+            raise ExcelError(NUM if base != 0 else DIV0)
+        if isinstance(result, complex):
+            raise ExcelError(NUM)
+        return result
+    return power
+
+
+def _raise(code: str) -> Getter:
+    def fail(v: Values) -> Any:
+        raise ExcelError(code)
+    return fail
+
+
+def compile_expression(node: Node, resolve: Callable[[CellAddress], int]) -> Arg:
+    """
+    Compiles an AST into an Arg whose getter reads the flat value list;
+    `resolve` maps a cell address to its index in that list.
+    """
+    if isinstance(node, Number):
+        value = node.value
+        return Arg(Arg.VALUE, lambda v: value)
+
+    if isinstance(node, Text):
+        text = node.value
+        return Arg(Arg.VALUE, lambda v: text)
+
+    if isinstance(node, Boolean):
+        flag = node.value
+        return Arg(Arg.VALUE, lambda v: flag)
+
+    if isinstance(node, Empty):
+        return Arg(Arg.VALUE, lambda v: None)
+
+    if isinstance(node, CellRef):
+        index = resolve(node.address)
+        return Arg(Arg.REF, lambda v: v[index])
+
+    if isinstance(node, RangeRef):
+        grid = [[resolve(address) for address in row] for row in node.addresses()]
+        return Arg(
+            Arg.RANGE,
+            lambda v: [[v[index] for index in row] for row in grid],
+            shape=(len(grid), len(grid[0]))
+        )
+
+    if isinstance(node, UnaryOp):
+        operand = compile_scalar(node.operand, resolve)
+        if node.op == "-":
+            return Arg(Arg.VALUE, lambda v: -to_number(operand(v)))
+        if node.op == "%":
+            return Arg(Arg.VALUE, lambda v: to_number(operand(v)) / 100.0)
+        return Arg(Arg.VALUE, lambda v: to_number(operand(v)))
+
+    if isinstance(node, BinaryOp):
+        left = compile_scalar(node.left, resolve)
+        right = compile_scalar(node.right, resolve)
+        op = node.op
+        if op == "&":
+            return Arg(Arg.VALUE, lambda v: to_text(left(v)) + to_text(right(v)))
+        if op in ("=", "<>", "<", ">", "<=", ">="):
+            return Arg(Arg.VALUE, lambda v: compare(op, left(v), right(v)))
+        return Arg(Arg.VALUE, _arithmetic(op, left, right))
+
+    if isinstance(node, Call):
+        function = FUNCTIONS.get(node.name)
+        if function is None:
+            # Unsupported/unknown functions (e.g. __xludf.DUMMYFUNCTION) behave like #NAME?
+            return Arg(Arg.VALUE, _raise(NAME))
+        args = [compile_expression(arg, resolve) for arg in node.args]
+        return Arg(Arg.VALUE, lambda v: function(args, v))
+
+    raise TypeError(f"Unknown node {node!r}")
+
+
+def compile_scalar(node: Node, resolve: Callable[[CellAddress], int]) -> Getter:
+    """Like compile_expression, but a range collapses to its single cell or #VALUE!"""
+    arg = compile_expression(node, resolve)
+    if arg.kind != Arg.RANGE:
+        get = arg.get
+        return lambda v: _raise_if_error(get(v))
+    return lambda v: _scalar(arg, v)
+
+
+def compile_cell(node: Node, resolve: Callable[[CellAddress], int]) -> Getter:
+    """Getter for a whole cell formula: errors become values, a blank result shows as 0"""
+    get = compile_scalar(node, resolve)
+
+    def evaluate(v: Values) -> Any:
+        try:
+            result = get(v)
+        except ExcelError as error:
+            return error
+        return 0.0 if result is None else result
+
+    return evaluate
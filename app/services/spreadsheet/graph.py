@@ -0,0 +1,294 @@
+"""
+Typed dependency graph of spreadsheet cells, compiled into an evaluation plan.
+
+Only the cells reachable from the formulas of the entry sheet are loaded.
+The plan keeps the formula cells in topological order with one compiled
+closure each; a Spreadsheet holds the current values and, when inputs
+change, recomputes only the downstream cells whose precedents actually
+changed (early cut-off when a recomputed value is unchanged).
+"""
+import csv
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from app.services.spreadsheet.formula import (
+    CellAddress, Node, format_address, parse_address, parse_formula, references
+)
+from app.services.spreadsheet.functions import ExcelError, compile_cell
+
+
+class CellKind(str, Enum):
+    INPUT = "input"  # non-formula cell of the entry sheet (user data)
+    CONSTANT = "constant"  # non-formula cell of a reference sheet (e.g. 'Dados auxiliares')
+    FORMULA = "formula"
+
+
+@dataclass
+class CellNode:
+    id: int
+    address: CellAddress
+    kind: CellKind
+    value: Any = None  # initial value for INPUT/CONSTANT cells
+    formula: Optional[str] = None
+    ast: Optional[Node] = None
+    precedents: Tuple[int, ...] = ()
+    dependents: List[int] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return format_address(self.address)
+
+
+@dataclass
+class SheetData:
+    """Raw cells of one sheet: formulas and literal values"""
+    formulas: Dict[Tuple[int, int], str]
+    values: Dict[Tuple[int, int], Any]
+
+
+def _literal(cell: Dict) -> Any:
+    value = cell.get("value")
+    kind = cell.get("type")
+    if kind == "n":
+        return float(value)
+    if kind == "b":
+        return str(value).lower() in ("true", "1")
+    return value
+
+
+def load_extracted_sheet(data_dir: str, sheet: str) -> SheetData:
+    """
+    Reads sheet_<name>_formulas.csv (authoritative formulas) and
+    sheet_<name>_data.json (literal values) from extracted_data/
+    """
+    formulas: Dict[Tuple[int, int], str] = {}
+    values: Dict[Tuple[int, int], Any] = {}
+
+    data_path = os.path.join(data_dir, f"sheet_{sheet}_data.json")
+    if os.path.exists(data_path):
+        with open(data_path, encoding="utf-8") as f:
+            for cell in json.load(f):
+                key = (cell["col"], cell["row"])
+                if cell.get("type") == "f":
+                    formulas[key] = cell["value"]
+                else:
+                    values[key] = _literal(cell)
+
+    formulas_path = os.path.join(data_dir, f"sheet_{sheet}_formulas.csv")
+    if os.path.exists(formulas_path):
+        with open(formulas_path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                _, column, row_number = parse_address(row["cell"], sheet)
+                formulas[(column, row_number)] = row["formula"]
+                values.pop((column, row_number), None)
+
+    if not formulas and not values:
+        raise FileNotFoundError(f"No extracted data for sheet '{sheet}' in {data_dir}")
+
+    return SheetData(formulas=formulas, values=values)
+
+
+class FormulaGraph:
+    """DAG of the cells reachable from the formulas of `entry_sheet`"""
+
+    def __init__(self, entry_sheet: str, sheet_loader: Callable[[str], SheetData]):
+        self.entry_sheet = entry_sheet
+        self.nodes: List[CellNode] = []
+        self.index: Dict[CellAddress, int] = {}
+        self._sheets: Dict[str, SheetData] = {}
+        self._sheet_loader = sheet_loader
+        self._build()
+
+    @classmethod
+    def from_extracted_data(cls, data_dir: str, entry_sheet: str) -> "FormulaGraph":
+        return cls(entry_sheet, lambda sheet: load_extracted_sheet(data_dir, sheet))
+
+    def node(self, address: str) -> CellNode:
+        """Node by address ('E33' on the entry sheet, or "'Dados auxiliares'!D32")"""
+        key = parse_address(address, self.entry_sheet)
+        if key not in self.index:
+            raise KeyError(f"Cell {format_address(key)} is not part of the graph")
+        return self.nodes[self.index[key]]
+
+    def _sheet(self, name: str) -> SheetData:
+        if name not in self._sheets:
+            self._sheets[name] = self._sheet_loader(name)
+        return self._sheets[name]
+
+    def _add(self, address: CellAddress) -> Tuple[int, bool]:
+        """Returns (node id, is new formula node)"""
+        if address in self.index:
+            return self.index[address], False
+
+        sheet_name, column, row = address
+        sheet = self._sheet(sheet_name)
+        node_id = len(self.nodes)
+        formula = sheet.formulas.get((column, row))
+
+        if formula is not None:
+            node = CellNode(node_id, address, CellKind.FORMULA, formula=formula)
+        else:
+            kind = CellKind.INPUT if sheet_name == self.entry_sheet else CellKind.CONSTANT
+            node = CellNode(node_id, address, kind, value=sheet.values.get((column, row)))
+
+        self.nodes.append(node)
+        self.index[address] = node_id
+        return node_id, formula is not None
+
+    def _build(self) -> None:
+        entry = self._sheet(self.entry_sheet)
+        pending = deque()
+        for column, row in sorted(entry.formulas, key=lambda key: (key[1], key[0])):
+            node_id, _ = self._add((self.entry_sheet, column, row))
+            pending.append(node_id)
+
+        while pending:
+            node = self.nodes[pending.popleft()]
+            try:
+                node.ast = parse_formula(node.formula, node.address[0])
+            except ValueError as e:
+                raise ValueError(f"{node.name}: {e}")
+
+            precedents = []
+            for address in references(node.ast):
+                precedent_id, is_new_formula = self._add(address)
+                if is_new_formula:
+                    pending.append(precedent_id)
+                if precedent_id not in precedents:
+                    precedents.append(precedent_id)
+                    self.nodes[precedent_id].dependents.append(node.id)
+            node.precedents = tuple(precedents)
+
+    def topological_order(self) -> List[int]:
+        """Formula nodes, precedents first (raises ValueError on circular references)"""
+        remaining = {
+            node.id: sum(1 for p in node.precedents if self.nodes[p].kind == CellKind.FORMULA)
+            for node in self.nodes if node.kind == CellKind.FORMULA
+        }
+        ready = deque(sorted(node_id for node_id, count in remaining.items() if count == 0))
+        order = []
+
+        while ready:
+            node_id = ready.popleft()
+            order.append(node_id)
+            for dependent in self.nodes[node_id].dependents:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(remaining):
+            cycle = sorted(self.nodes[i].name for i, count in remaining.items() if count > 0)
+            raise ValueError(f"Circular reference between {', '.join(cycle[:10])}")
+        return order
+
+    def compile(self) -> "EvaluationPlan":
+        return EvaluationPlan(self)
+
+
+class EvaluationPlan:
+    """Compiled, immutable evaluation plan of a FormulaGraph"""
+
+    def __init__(self, graph: FormulaGraph):
+        self.graph = graph
+        self.order: Tuple[int, ...] = tuple(graph.topological_order())
+        self.rank: Dict[int, int] = {node_id: rank for rank, node_id in enumerate(self.order)}
+        self.precedents: Tuple[Tuple[int, ...], ...] = tuple(node.precedents for node in graph.nodes)
+        self.dependents: Tuple[Tuple[int, ...], ...] = tuple(tuple(node.dependents) for node in graph.nodes)
+
+        resolve = graph.index.__getitem__
+        self.evaluators: Tuple[Optional[Callable], ...] = tuple(
+            compile_cell(node.ast, resolve) if node.kind == CellKind.FORMULA else None
+            for node in graph.nodes
+        )
+
+        values = [node.value for node in graph.nodes]
+        for node_id in self.order:
+            values[node_id] = self.evaluators[node_id](values)
+        self.initial_values: Tuple[Any, ...] = tuple(values)
+
+        self.affected = lru_cache(maxsize=1024)(self._affected)
+        self._ids: Dict[str, int] = {}
+
+    def _affected(self, changed: FrozenSet[int]) -> Tuple[int, ...]:
+        """Formula cells downstream of `changed`, in evaluation order"""
+        seen = set()
+        stack = list(changed)
+        while stack:
+            for dependent in self.dependents[stack.pop()]:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return tuple(sorted(seen, key=self.rank.__getitem__))
+
+    def id_of(self, address: str) -> int:
+        node_id = self._ids.get(address)
+        if node_id is None:
+            node_id = self._ids[address] = self.graph.node(address).id
+        return node_id
+
+    def new_sheet(self) -> "Spreadsheet":
+        return Spreadsheet(self, list(self.initial_values))
+
+
+def _same(old: Any, new: Any) -> bool:
+    return type(old) is type(new) and old == new
+
+
+class Spreadsheet:
+    """Mutable cell values over a shared EvaluationPlan"""
+
+    def __init__(self, plan: EvaluationPlan, values: List[Any]):
+        self.plan = plan
+        self.values = values
+
+    def copy(self) -> "Spreadsheet":
+        return Spreadsheet(self.plan, list(self.values))
+
+    def get(self, address: str) -> Any:
+        return self.values[self.plan.id_of(address)]
+
+    def get_many(self, addresses: Iterable[str]) -> Dict[str, Any]:
+        return {address: self.get(address) for address in addresses}
+
+    def set_inputs(self, changes: Mapping[str, Any]) -> List[str]:
+        """
+        Assigns INPUT/CONSTANT cells and recomputes only the dirty formula cells.
+        Returns the names of the cells whose value changed.
+        """
+        nodes = self.plan.graph.nodes
+        changed = set()
+
+        for address, value in changes.items():
+            node_id = self.plan.id_of(address)
+            if nodes[node_id].kind == CellKind.FORMULA:
+                raise ValueError(f"{nodes[node_id].name} is a formula cell")
+            if isinstance(value, int) and not isinstance(value, bool):
+                value = float(value)
+            if not _same(self.values[node_id], value):
+                self.values[node_id] = value
+                changed.add(node_id)
+
+        if not changed:
+            return []
+
+        values = self.values
+        evaluators = self.plan.evaluators
+        precedents = self.plan.precedents
+
+        for node_id in self.plan.affected(frozenset(changed)):
+            if not any(p in changed for p in precedents[node_id]):
+                continue
+            value = evaluators[node_id](values)
+            if not _same(values[node_id], value):
+                values[node_id] = value
+                changed.add(node_id)
+
+        return [nodes[node_id].name for node_id in changed]
+
+    def is_error(self, address: str) -> bool:
+        return isinstance(self.get(address), ExcelError)
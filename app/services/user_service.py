@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
@@ -5,10 +7,12 @@ from typing import Optional
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.services.auth_service import get_password_hash
+from app.services.auth_service import principal_cache
+from app.services.password_hasher import password_hasher
 
 
 class UserService:
+    """Sync lookups (scripts); writes go through AsyncUserService"""
     
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
@@ -19,22 +23,56 @@ class UserService:
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get user by email"""
         return db.query(User).filter(User.email == email).first()
+
+
+class AsyncUserService:
+    """
+    Users over an AsyncSession (routes); bcrypt runs in the password_hasher
+    pool, off the event loop. Creation, updates and login only live here.
+    """
+    
+    @staticmethod
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """Get user by email"""
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    async def authenticate(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """User when the password matches; rehashes it if the bcrypt cost changed"""
+        user = await AsyncUserService.get_user_by_email(db, email)
+        
+        if not user:
+            return None
+        
+        valid, new_hash = await password_hasher.verify(password, user.hashed_password)
+        if not valid:
+            return None
+        
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+        
+        return user
+    
+    @staticmethod
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user"""
-        # Check if user already exists
-        existing_user = UserService.get_user_by_email(db, user_data.email)
+        existing_user = await AsyncUserService.get_user_by_email(db, user_data.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        # Hash password
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         
-        # Create user
         new_user = User(
             name=user_data.name,
             email=user_data.email,
@@ -45,24 +83,24 @@ class UserService:
         
         try:
             db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            await db.commit()
+            await db.refresh(new_user)
             return new_user
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Error creating user. Email may already be in use."
             )
     
     @staticmethod
-    def update_user(
-        db: Session, 
-        user_id: int, 
+    async def update_user(
+        db: AsyncSession,
+        user_id: int,
         user_data: UserUpdate
     ) -> User:
         """Update user information"""
-        user = UserService.get_user_by_id(db, user_id)
+        user = await AsyncUserService.get_user_by_id(db, user_id)
         
         if not user:
             raise HTTPException(
@@ -70,25 +108,24 @@ class UserService:
                 detail="User not found"
             )
         
-        # Update only provided fields
+        previous_email = user.email
         update_data = user_data.model_dump(exclude_unset=True)
         
-        # If password is being updated, hash it
         if "password" in update_data and update_data["password"]:
-            update_data["hashed_password"] = get_password_hash(update_data["password"])
+            update_data["hashed_password"] = await password_hasher.hash(update_data["password"])
             del update_data["password"]
         
-        # Update user fields
         for field, value in update_data.items():
             setattr(user, field, value)
         
         try:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+            principal_cache.invalidate(user.id, previous_email, user.email)
             return user
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Error updating user"
-            )
\ No newline at end of file
+            )
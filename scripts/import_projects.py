@@ -0,0 +1,81 @@
+"""
+Importa projetos completos de um arquivo CSV ou XLSX (um projeto por linha,
+colunas com os nomes de ProjectCreate) para a conta de um usuário.
+
+Uso:
+    python scripts/import_projects.py ARQUIVO --user-email EMAIL [--batch-size N]
+                                      [--errors ARQUIVO.json]
+
+Cada lote de --batch-size linhas é validado, calculado e gravado num único
+commit; linhas com erro são listadas no final (ou gravadas em --errors) e
+não interrompem a importação.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.project_import_service import ImportReport, ProjectImportService
+from app.services.user_service import UserService
+
+
+def print_progress(report: ImportReport):
+    print(
+        f"\r  rows={report.total_rows} imported={report.imported} failed={report.failed}",
+        end="",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import of projects from CSV/XLSX")
+    parser.add_argument("file", help="Arquivo .csv ou .xlsx")
+    parser.add_argument("--user-email", required=True, help="Dono dos projetos importados")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument("--errors", help="Grava as linhas com erro neste arquivo JSON")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("BIOCALC PROJECT IMPORT")
+    print("=" * 80)
+
+    db = SessionLocal()
+    try:
+        user = UserService.get_user_by_email(db, args.user_email)
+        if not user:
+            parser.error(f"User '{args.user_email}' not found")
+
+        service = ProjectImportService(db, batch_size=args.batch_size, on_progress=print_progress)
+        with open(args.file, "rb") as f:
+            report = service.import_file(f, args.file, user.id)
+    except ValueError as e:
+        print(f"\n❌ Import failed: {str(e)}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⚠ Interrupted. Batches already committed were kept.")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print()
+    print(f"✓ Imported {report.imported} of {report.total_rows} rows (Failed: {report.failed})")
+
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            json.dump(report.errors, f, ensure_ascii=False, indent=2)
+        print(f"Errors written to {args.errors}")
+    else:
+        for error in report.errors[:20]:
+            print(f"  line {error['row']}: {'; '.join(error['errors'])}")
+        if report.failed > 20:
+            print(f"  ... {report.failed - 20} more (use --errors ARQUIVO.json)")
+
+
+if __name__ == "__main__":
+    main()
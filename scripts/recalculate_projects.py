@@ -0,0 +1,90 @@
+"""
+Recalcula todos os projetos concluídos com os fatores de emissão atuais.
+Rodar após scripts/seed_database.py quando os fatores mudarem.
+
+Uso:
+    python scripts/recalculate_projects.py [--chunk-size N] [--workers N]
+                                           [--checkpoint ARQUIVO] [--no-resume]
+                                           [--factor-table TABELA --factor-key CHAVE]
+
+Com --factor-table/--factor-key só os projetos que dependem daquele fator
+são recalculados (ex.: --factor-table mut_factors --factor-key "Paraná|Pinus").
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.dependency_index import DependencyIndexService
+from app.services.recalculation_service import RecalculationService, RecalculationProgress
+
+
+def print_progress(progress: RecalculationProgress):
+    total = progress.total or 1
+    pct = min(progress.processed / total * 100, 100.0)
+    print(
+        f"\r  {progress.processed}/{progress.total} ({pct:5.1f}%) "
+        f"updated={progress.updated} skipped={progress.skipped} failed={progress.failed} last_id={progress.last_id}",
+        end="",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk recalculation of completed projects")
+    parser.add_argument("--chunk-size", type=int, default=settings.RECALC_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: RECALC_WORKERS ou nº de CPUs)")
+    parser.add_argument("--checkpoint", default=settings.RECALC_CHECKPOINT_PATH)
+    parser.add_argument("--no-resume", action="store_true", help="Ignora o checkpoint e recomeça do início")
+    parser.add_argument("--factor-table", help="Tabela do fator alterado")
+    parser.add_argument("--factor-key", help="Chave natural da linha alterada")
+    args = parser.parse_args()
+
+    if bool(args.factor_table) != bool(args.factor_key):
+        parser.error("--factor-table and --factor-key must be used together")
+
+    print("=" * 80)
+    print("BIOCALC BULK RECALCULATION")
+    print("=" * 80)
+
+    service = RecalculationService(
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        on_progress=print_progress
+    )
+    print(f"Catalog version: {service.catalog.version}")
+
+    dependency_keys = None
+    if args.factor_table:
+        db = SessionLocal()
+        try:
+            index = DependencyIndexService(db)
+            dependency_keys = index.keys_for_factor(args.factor_table, args.factor_key)
+            print(f"Affected projects: {index.count_affected(dependency_keys)}")
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            db.close()
+
+    try:
+        progress = service.run(resume=not args.no_resume, dependency_keys=dependency_keys)
+    except KeyboardInterrupt:
+        print("\n⚠ Interrupted. Run again to resume from the checkpoint.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Recalculation failed: {str(e)}")
+        print("Run again to resume from the checkpoint.")
+        sys.exit(1)
+
+    print()
+    print(f"✓ Processed {progress.processed} projects (Updated: {progress.updated}, Skipped: {progress.skipped}, Failed: {progress.failed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Worker de jobs em segundo plano (tabela jobs): recalculação, importações...
+
+Uso:
+    python scripts/run_worker.py [--processes N] [--kinds KIND ...]
+                                 [--poll-interval SEGUNDOS] [--once]
+
+Cada processo busca o próximo job com SELECT ... FOR UPDATE SKIP LOCKED, então
+vários processos (ou máquinas) podem rodar ao mesmo tempo. Com --once o
+worker esvazia a fila e termina (útil em cron/testes). SIGINT/SIGTERM
+terminam depois do job em andamento.
+"""
+
+import argparse
+import multiprocessing
+import signal
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services import job_handlers  # noqa: F401 (registra os handlers)
+from app.services.job_queue import JobWorker, registered_kinds
+
+
+def run(kinds, poll_interval: float, once: bool) -> None:
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    worker = JobWorker(kinds=kinds)
+    print(f"Worker {worker.worker_id} started (kinds: {', '.join(kinds or registered_kinds())})", flush=True)
+
+    if once:
+        worker.requeue_stale()
+        while not stopping and worker.run_once():
+            pass
+    else:
+        worker.run_forever(should_stop=lambda: bool(stopping), poll_interval=poll_interval)
+
+    print(f"Worker {worker.worker_id} stopped", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background job worker")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--kinds", nargs="*", help="Só estes tipos de job (padrão: todos)")
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="Processa os jobs pendentes e termina")
+    args = parser.parse_args()
+
+    unknown = set(args.kinds or ()) - set(registered_kinds())
+    if unknown:
+        parser.error(f"Unknown job kinds: {', '.join(sorted(unknown))}")
+
+    if args.processes <= 1:
+        run(args.kinds, args.poll_interval, args.once)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run, args=(args.kinds, args.poll_interval, args.once))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
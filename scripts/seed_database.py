@@ -10,7 +10,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine, Base
+from app.core.database import SessionLocal
+from app.services.factor_catalog import rebuild_factor_aliases, reload_factor_catalog
 from app.models import (
     BiomassProperty,
     VehicleEmissionFactor,
@@ -47,13 +48,6 @@ except ImportError:
     )
 
 
-def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✓ Tables created")
-
-
 def seed_biomass_properties(db: Session):
     """Seed biomass properties table from EXTRACTED DATA"""
     print("\nSeeding biomass properties (from extracted data)...")
@@ -285,14 +279,23 @@ def seed_mut_factors(db: Session):
     print(f"✓ Processed {len(MUT_FACTORS_DATA)} MUT factors (Added: {count})")
 
 
+def seed_factor_aliases(db: Session):
+    """Resolve fuel/input search terms to exact factor rows (factor_aliases)"""
+    print("\nResolving factor aliases...")
+    
+    count = rebuild_factor_aliases(db)
+    
+    db.commit()
+    print(f"✓ Resolved {count} factor aliases")
+
+
 def main():
     """Main seeding function"""
     print("=" * 80)
     print("BIOCALC DATABASE SEEDING v2")
     print("=" * 80)
     
-    # Create tables
-    create_tables()
+    # Só popula: o schema vem de `alembic upgrade head`, rodado antes
     
     # Create database session
     db = SessionLocal()
@@ -311,6 +314,13 @@ def main():
         seed_biomass_mut_allocations(db)
         seed_stationary_combustion_emissions(db)
         
+        # Must run after the input/combustion tables are seeded
+        seed_factor_aliases(db)
+        
+        # Publica a versão nova: API e workers trocam o snapshot sozinhos
+        catalog = reload_factor_catalog(db)
+        print(f"✓ Published factor catalog version {catalog.version}")
+        
         print("\n" + "=" * 80)
         print("✅ DATABASE SEEDING COMPLETED SUCCESSFULLY!")
         print("=" * 80)
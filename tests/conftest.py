@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401 (registra todas as tabelas no metadata)
+from app.core.database import Base
+from app.models import (
+    BiomassMUTAllocation,
+    BiomassProductionEmission,
+    BiomassProperty,
+    IndustrialInputEmission,
+    MUTFactor,
+    StationaryCombustionEmission,
+    TransportModalFactor,
+    User,
+    VehicleEmissionFactor,
+)
+from app.services import factor_catalog
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # SQLite em arquivo: cada sessão abre a própria conexão, como os workers
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_factor_catalog():
+    # O catálogo é por processo: cada teste o carrega do próprio banco
+    factor_catalog._catalog, factor_catalog._published = None, None
+    yield
+    factor_catalog._catalog, factor_catalog._published = None, None
+
+
+class FakeClock:
+    """Relógio manual para os caches com TTL e o rate limiter"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def seed_factors(db) -> None:
+    """Small factor set touching every lookup of the calculation (commits)"""
+    db.add_all([
+        BiomassProperty(biomass_name="Pinus Virgem", pci_mj_kg=18.8, combustion_emission=0.0),
+        BiomassProperty(biomass_name="Eucalipto Virgem", pci_mj_kg=17.5, combustion_emission=0.001),
+        BiomassProperty(biomass_name="Casca de Amendoim", pci_mj_kg=16.0, combustion_emission=None),
+        BiomassProductionEmission(biomass_name="Pinus Virgem", emission_factor=0.03),
+        BiomassProductionEmission(biomass_name="Eucalipto Virgem", emission_factor=0.025),
+        MUTFactor(state="SP", culture="Pinus", emission_factor=0.12),
+        MUTFactor(state="SP", culture="Eucalipto", emission_factor=0.08),
+        MUTFactor(state="MG", culture="Amendoim", emission_factor=0.2),
+        BiomassMUTAllocation(biomass_name="Pinus Virgem", allocation_product=60.0),
+        BiomassMUTAllocation(biomass_name="Casca de Amendoim", allocation_product=0.4),
+        VehicleEmissionFactor(vehicle_type="Caminhão Toco/Semipesado (16-32t)", emission_factor=0.07),
+        VehicleEmissionFactor(vehicle_type="Caminhão Pesado (>32t)", emission_factor=0.05),
+        TransportModalFactor(modal_type="road", emission_factor=0.062),
+        IndustrialInputEmission(input_name="Amido de milho", input_type="chemical", emission_factor=0.6),
+        IndustrialInputEmission(input_name="Rede elétrica", input_type="electricity", emission_factor=0.09),
+        IndustrialInputEmission(input_name="Água", input_type="water", emission_factor=0.2),
+        IndustrialInputEmission(input_name="Óleo lubrificante", input_type="chemical", emission_factor=3.2),
+        IndustrialInputEmission(input_name="Químico Genérico", input_type="chemical", emission_factor=1.9),
+        IndustrialInputEmission(input_name="Diesel", input_type="fuel", emission_factor=0.5),
+        IndustrialInputEmission(input_name="Gás Natural", input_type="fuel", emission_factor=0.3),
+        StationaryCombustionEmission(fuel_name="Diesel A", co2_eq_emission=2.6),
+        StationaryCombustionEmission(fuel_name="Lenha", co2_eq_emission=0.02),
+        StationaryCombustionEmission(fuel_name="GLP", co2_eq_emission=2.9),
+    ])
+    db.commit()
+
+
+@pytest.fixture
+def factors(db):
+    seed_factors(db)
+
+
+@pytest.fixture
+def user(db):
+    user = User(name="Maria", email="maria@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
@@ -0,0 +1,150 @@
+import hashlib
+from datetime import timedelta
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import User
+from app.services import auth_service
+from app.services.auth_service import PrincipalCache, create_access_token, create_user_access_token, decode_access_token
+
+TTL = 60.0
+
+
+@pytest.fixture
+def cache(clock):
+    return PrincipalCache(maxsize=2, ttl=TTL, clock=clock)
+
+
+def _user(user_id: int = 1, email: str = "maria@example.com") -> User:
+    return User(id=user_id, name="Maria", email=email, hashed_password="hash")
+
+
+def test_ttl_cache_entries_expire_on_the_clock(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=TTL, clock=clock)
+    ttl_cache.put("a", 1)
+    ttl_cache.put("b", 2, ttl=5)
+
+    clock.advance(4.9)
+    assert (ttl_cache.get("a"), ttl_cache.get("b")) == (1, 2)
+    clock.advance(0.1)
+    assert (ttl_cache.get("a"), ttl_cache.get("b")) == (1, None)
+    clock.advance(TTL - 5)
+    assert ttl_cache.get("a") is None
+    assert len(ttl_cache) == 0
+    assert (ttl_cache.hits, ttl_cache.misses) == (3, 2)
+
+
+def test_ttl_cache_skips_expired_ttls_and_evicts_least_recent(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl=TTL, clock=clock)
+    ttl_cache.put("old", 0, ttl=0)
+    ttl_cache.put("a", 1)
+    ttl_cache.put("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.put("c", 3)
+
+    assert len(ttl_cache) == 2
+    assert (ttl_cache.get("old"), ttl_cache.get("a"), ttl_cache.get("b"), ttl_cache.get("c")) == (None, 1, None, 3)
+
+
+def test_principal_is_served_as_a_detached_copy_until_the_ttl(cache, clock):
+    key = PrincipalCache.key({"sub": "maria@example.com", "uid": 1})
+    cache.put(key, _user(), cache.generation)
+
+    clock.advance(TTL - 1)
+    user = cache.get(key)
+    assert (user.id, user.email, user.hashed_password) == (1, "maria@example.com", "hash")
+    assert user is not cache.get(key)
+
+    clock.advance(1)
+    assert cache.get(key) is None
+
+
+def test_legacy_tokens_are_keyed_by_email():
+    assert PrincipalCache.key({"sub": "maria@example.com"}) == ("sub", "maria@example.com")
+    assert PrincipalCache.key({"sub": "maria@example.com", "uid": "7"}) == ("uid", 7)
+
+
+def test_invalidate_drops_the_uid_and_every_email_key(cache):
+    keys = [("uid", 1), ("sub", "antigo@example.com")]
+    for key in keys:
+        cache.put(key, _user(), cache.generation)
+
+    cache.invalidate(1, "antigo@example.com", "maria@example.com", None)
+
+    assert [cache.get(key) for key in keys] == [None, None]
+
+
+def test_load_racing_an_invalidation_is_not_cached(cache):
+    key = ("uid", 1)
+    # get_current_user lê a geração antes da consulta...
+    generation = cache.generation
+    stale = _user(email="antigo@example.com")
+    # ...e o usuário muda (invalidate) antes do put
+    cache.invalidate(1, "antigo@example.com", "maria@example.com")
+    cache.put(key, stale, generation)
+    assert cache.get(key) is None
+
+    # A próxima carga (depois da mudança) entra normalmente
+    cache.put(key, _user(), cache.generation)
+    assert cache.get(key).email == "maria@example.com"
+
+
+def test_clear_also_discards_loads_in_flight(cache):
+    generation = cache.generation
+    cache.clear()
+    cache.put(("uid", 1), _user(), generation)
+
+    assert cache.get(("uid", 1)) is None
+    assert cache.stats["size"] == 0
+
+
+@pytest.fixture
+def claims_cache(clock, monkeypatch):
+    cache = TTLCache(maxsize=10, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, clock=clock)
+    monkeypatch.setattr(auth_service, "claims_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def jwt_decodes(monkeypatch):
+    calls = []
+    original = auth_service.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(auth_service.jwt, "decode", counting_decode)
+    return calls
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def test_claims_are_cached_until_the_token_expires(claims_cache, clock, jwt_decodes):
+    token = create_user_access_token(_user(), expires_delta=timedelta(seconds=30))
+
+    claims = decode_access_token(token)
+    assert (claims["sub"], claims["uid"]) == ("maria@example.com", 1)
+    assert decode_access_token(token) == claims
+    assert len(jwt_decodes) == 1
+
+    # A entrada vence no "exp" do token (30 s), não no TTL do cache
+    clock.advance(28)
+    assert claims_cache.get(_token_key(token)) == claims
+    clock.advance(3)
+    assert claims_cache.get(_token_key(token)) is None
+
+
+def test_rejected_tokens_are_not_cached(claims_cache, jwt_decodes):
+    expired = create_user_access_token(_user(), expires_delta=timedelta(seconds=-5))
+    forged = create_user_access_token(_user())[:-2] + "xx"
+    no_subject = create_access_token({"uid": 1})
+
+    for token in (expired, forged, no_subject, expired):
+        assert decode_access_token(token) is None
+    assert len(jwt_decodes) == 4
+    assert len(claims_cache) == 0
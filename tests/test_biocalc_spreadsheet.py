@@ -0,0 +1,87 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from openpyxl import load_workbook
+
+from app.services.spreadsheet import CellKind, ExcelError, evaluate_project, get_biocalc_plan, project_inputs
+from app.services.spreadsheet.biocalc import SHEET_VEHICLES, VEHICLE_NAMES
+
+WORKBOOK = os.path.join(os.path.dirname(__file__), os.pardir, "definições", "BioCalc_EngS.xlsx")
+
+
+@pytest.fixture(scope="module")
+def workbook():
+    # data_only: os valores calculados e salvos junto com as fórmulas
+    workbook = load_workbook(WORKBOOK, data_only=True)
+    yield workbook
+    workbook.close()
+
+
+@pytest.fixture
+def plan():
+    return get_biocalc_plan()
+
+
+def _cached(workbook, address):
+    sheet, column, row = address
+    value = workbook[sheet].cell(row=row, column=column).value
+    if isinstance(value, str) and value.startswith("#"):
+        return ExcelError(value)
+    # openpyxl lê o texto vazio salvo como None
+    return "" if value is None else value
+
+
+def test_formula_cells_match_the_workbook_cached_values(workbook, plan):
+    formulas = [node for node in plan.graph.nodes if node.kind == CellKind.FORMULA]
+    assert len(formulas) > 300
+
+    for node in formulas:
+        expected = _cached(workbook, node.address)
+        value = plan.initial_values[node.id]
+        if isinstance(expected, (int, float)) and not isinstance(expected, bool):
+            assert value == pytest.approx(expected, rel=1e-9, abs=1e-12), node.name
+        else:
+            assert value == expected, node.name
+
+
+def test_vehicle_list_matches_the_workbook(workbook):
+    sheet = workbook["Dados auxiliares"]
+    assert tuple(sheet.cell(row=row, column=2).value for row in range(70, 77)) == SHEET_VEHICLES
+    assert set(VEHICLE_NAMES.values()) <= set(SHEET_VEHICLES)
+
+
+@pytest.mark.parametrize("vehicle, sheet_vehicle", [
+    *VEHICLE_NAMES.items(),
+    ("Transporte, navio", "Transporte, navio"),
+    (None, None),
+    ("", None),
+])
+def test_vehicles_are_translated_to_the_sheet_list(vehicle, sheet_vehicle):
+    project = SimpleNamespace(agr_transport_vehicle=vehicle, dom_vehicle_type=vehicle, exp_vehicle_port=vehicle)
+
+    inputs = project_inputs(project)
+
+    assert (inputs["E50"], inputs["E101"], inputs["E112"]) == (sheet_vehicle,) * 3
+
+
+def test_database_vehicle_gives_transport_emissions(plan):
+    project = SimpleNamespace(
+        biomass_type="Pinus Virgem", state="SP", agr_transport_distance=80,
+        agr_transport_vehicle="Caminhão Toco/Semipesado (16-32t)",
+    )
+    sheet = plan.new_sheet()
+
+    evaluate_project(project, sheet)
+
+    # E53 = E52 * fator do veículo; com IFERROR viraria " " (0 nas somas)
+    factor = sheet.get("'Dados auxiliares'!D71")
+    assert isinstance(factor, float) and factor > 0
+    assert isinstance(sheet.get("E52"), float) and sheet.get("E52") > 0
+    assert sheet.get("E53") == pytest.approx(sheet.get("E52") * factor)
+
+
+@pytest.mark.parametrize("field", ["agr_transport_vehicle", "dom_vehicle_type", "exp_vehicle_port"])
+def test_unknown_vehicle_is_rejected(field):
+    with pytest.raises(ValueError, match="Carroça"):
+        evaluate_project(SimpleNamespace(**{field: "Carroça"}), get_biocalc_plan().new_sheet())
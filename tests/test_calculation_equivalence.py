@@ -0,0 +1,133 @@
+"""
+The scalar CalculationService is the reference; the batch kernel must match
+it exactly and the linear coefficients up to float rounding, over random
+inputs that include None/0/negative quantities and unknown keys.
+"""
+import pickle
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.cache import LRUCache
+from app.services.batch_calculation import INPUT_FIELDS, NUMERIC_FIELDS, calculate_batch, columns_from_projects, results_to_records
+from app.services.calculation_service import CalculationService
+from app.services.factor_catalog import build_factor_catalog, get_factor_catalog
+from app.services.linear_coefficients import LinearCalculationService
+from app.services.preview_service import PreviewService
+
+SEED = 20261017
+SAMPLES = 3000
+
+
+@pytest.fixture
+def catalog(db, factors):
+    return get_factor_catalog(db)
+
+
+def _number(rng: random.Random):
+    roll = rng.random()
+    if roll < 0.08:
+        return None
+    if roll < 0.16:
+        return 0.0
+    if roll < 0.22:
+        return -rng.uniform(0, 1_000)
+    if roll < 0.25:
+        return rng.uniform(0, 1e-6)
+    return rng.uniform(0, 2_000_000)
+
+
+def random_projects(catalog, count: int = SAMPLES, seed: int = SEED):
+    rng = random.Random(seed)
+    biomasses = list(catalog.biomass) + ["Biomassa Desconhecida", None]
+    states = sorted({state for state, _ in catalog.mut_factors}) + ["XX", "", None]
+    vehicles = list(catalog.vehicle_factors) + ["Carroça", "", None]
+
+    projects = []
+    for _ in range(count):
+        values = {name: _number(rng) for name in NUMERIC_FIELDS}
+        values.update(
+            biomass_type=rng.choice(biomasses),
+            state=rng.choice(states),
+            agr_transport_vehicle=rng.choice(vehicles),
+        )
+        projects.append(SimpleNamespace(**{name: values[name] for name in INPUT_FIELDS}))
+    return projects
+
+
+def scalar_results(catalog, project):
+    """calculate_project_results, or None where it raises (unknown biomass)"""
+    try:
+        return CalculationService(db=None, catalog=catalog).calculate_project_results(project)
+    except ValueError:
+        return None
+
+
+def test_inputs_cover_the_edge_cases(catalog):
+    projects = random_projects(catalog)
+    assert any(p.biomass_type not in catalog.biomass for p in projects)
+    assert any(p.state == "XX" for p in projects) and any(p.agr_transport_vehicle == "Carroça" for p in projects)
+    for name in ("biomass_processed", "fuel_diesel", "dom_mass"):
+        values = [getattr(p, name) for p in projects]
+        assert None in values and 0.0 in values and any(v is not None and v < 0 for v in values)
+
+
+def test_batch_matches_scalar_exactly(catalog):
+    projects = random_projects(catalog)
+
+    batch = results_to_records(calculate_batch(columns_from_projects(projects), catalog))
+
+    for project, got in zip(projects, batch):
+        assert got == scalar_results(catalog, project), vars(project)
+
+
+def test_linear_coefficients_match_scalar(catalog):
+    linear = LinearCalculationService(catalog=catalog, cache=LRUCache(64))
+
+    for project in random_projects(catalog):
+        expected = scalar_results(catalog, project)
+        if expected is None:
+            with pytest.raises(ValueError):
+                linear.calculate_project_results(project)
+            continue
+
+        got = linear.calculate_project_results(project)
+        assert got.keys() == expected.keys()
+        for name, value in expected.items():
+            assert got[name] == pytest.approx(value, rel=1e-12, abs=1e-12), (name, vars(project))
+
+
+def test_preview_serves_the_linear_results(catalog):
+    service = PreviewService(catalog=catalog, cache=LRUCache(16))
+
+    for project in random_projects(catalog, count=200):
+        expected = scalar_results(catalog, project)
+        if expected is None:
+            continue
+        results, _ = service.preview(vars(project))
+        assert results.pop("catalog_version") == catalog.version
+        assert results == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+def test_catalog_snapshot_is_stable_and_survives_pickling(db, catalog):
+    """Pool workers receive the catalog pickled; a rebuild of the same rows keeps the version"""
+    assert build_factor_catalog(db).version == catalog.version
+
+    restored = pickle.loads(pickle.dumps(catalog))
+    assert restored.version == catalog.version
+
+    for project in random_projects(catalog, count=500):
+        assert scalar_results(restored, project) == scalar_results(catalog, project), vars(project)
+
+
+def test_default_service_uses_the_published_snapshot(db, catalog):
+    service = CalculationService(db)
+    assert service.catalog is catalog
+
+    for project in random_projects(catalog, count=200):
+        try:
+            got = service.calculate_project_results(project)
+        except ValueError:
+            got = None
+        assert got == scalar_results(catalog, project)
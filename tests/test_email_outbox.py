@@ -0,0 +1,171 @@
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models import EmailMessage, EmailStatus
+from app.services.email_outbox import EmailOutboxSender, SMTPConnection
+from app.services.email_service import EmailService
+
+
+class RecordingHandler:
+    """Accepts messages, or answers with the next queued reply (e.g. a 451)"""
+
+    def __init__(self):
+        self.replies = []
+        self.delivered = []
+        self.sessions = []  # uma por conexão SMTP
+
+    async def handle_DATA(self, server, session, envelope):
+        if not any(seen is session for seen in self.sessions):
+            self.sessions.append(session)
+        if self.replies:
+            return self.replies.pop(0)
+        self.delivered.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture
+def sender(session_factory, smtp_server):
+    connection = SMTPConnection(
+        host=smtp_server.hostname, port=smtp_server.port, user="", password="",
+        use_tls=False, timeout=5, idle_timeout=60
+    )
+    sender = EmailOutboxSender(session_factory, connection=connection, batch_size=2, sender_id="s1")
+    yield sender
+    connection.close()
+
+
+def _enqueue(session_factory, count: int):
+    db = session_factory()
+    try:
+        messages = [
+            EmailService.enqueue_email(db, f"user{i}@example.com", f"Assunto {i}", f"<p>{i}</p>")
+            for i in range(count)
+        ]
+        db.commit()
+        return [message.id for message in messages]
+    finally:
+        db.close()
+
+
+def _get(session_factory, message_id) -> EmailMessage:
+    db = session_factory()
+    try:
+        return db.get(EmailMessage, message_id)
+    finally:
+        db.close()
+
+
+def _make_due(session_factory, message_id) -> None:
+    db = session_factory()
+    try:
+        db.execute(
+            update(EmailMessage).where(EmailMessage.id == message_id)
+            .values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_batches_share_one_connection(session_factory, smtp_server, sender):
+    ids = _enqueue(session_factory, 5)
+
+    assert sender.drain() == 5  # três lotes de até 2
+
+    handler = smtp_server.handler
+    assert sorted(envelope.rcpt_tos[0] for envelope in handler.delivered) == [
+        f"user{i}@example.com" for i in range(5)
+    ]
+    assert len(handler.sessions) == 1
+    assert sender.connection.connects == 1
+    for message_id in ids:
+        message = _get(session_factory, message_id)
+        assert message.status == EmailStatus.SENT
+        assert message.attempts == 1
+        assert message.sent_at is not None and message.locked_by is None
+
+
+def test_transient_failure_is_retried_with_backoff(session_factory, smtp_server, sender):
+    (message_id,) = _enqueue(session_factory, 1)
+    handler = smtp_server.handler
+    handler.replies = ["451 4.3.0 Try again later"] * 2
+
+    for attempt in (1, 2):
+        before = datetime.utcnow()
+        assert sender.drain() == 1
+
+        message = _get(session_factory, message_id)
+        assert message.status == EmailStatus.PENDING
+        assert message.attempts == attempt
+        assert "451" in message.last_error
+        delay = settings.EMAIL_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+        assert before + timedelta(seconds=delay) <= message.next_attempt_at <= datetime.utcnow() + timedelta(seconds=delay)
+
+        # Não reenviada antes do backoff
+        assert sender.drain() == 0
+        _make_due(session_factory, message_id)
+
+    assert sender.drain() == 1
+    message = _get(session_factory, message_id)
+    assert message.status == EmailStatus.SENT
+    assert message.attempts == 3
+    assert message.last_error is None
+    assert len(handler.delivered) == 1
+    # Cada falha temporária descarta a conexão
+    assert sender.connection.connects == 3
+
+
+def test_max_attempts_ends_in_failure(session_factory, smtp_server, sender, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 3)
+    (message_id,) = _enqueue(session_factory, 1)
+    handler = smtp_server.handler
+    handler.replies = ["451 4.3.0 Try again later"] * 10
+
+    for _ in range(2):
+        assert sender.drain() == 1
+        assert _get(session_factory, message_id).status == EmailStatus.PENDING
+        _make_due(session_factory, message_id)
+
+    assert sender.drain() == 1
+    message = _get(session_factory, message_id)
+    assert message.status == EmailStatus.FAILED
+    assert message.attempts == 3
+    assert "451" in message.last_error
+    assert message.sent_at is None
+    assert sender.drain() == 0
+    assert handler.delivered == []
+
+
+def test_permanent_failure_is_not_retried(session_factory, smtp_server, sender):
+    failing, delivered = _enqueue(session_factory, 2)
+    smtp_server.handler.replies = ["550 5.1.1 Mailbox unavailable"]
+
+    assert sender.drain() == 2
+
+    message = _get(session_factory, failing)
+    assert message.status == EmailStatus.FAILED
+    assert message.attempts == 1
+    assert "550" in message.last_error
+    # 5xx não derruba a conexão: a próxima mensagem vai pela mesma
+    assert _get(session_factory, delivered).status == EmailStatus.SENT
+    assert sender.connection.connects == 1
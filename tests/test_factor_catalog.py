@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models import BiomassProductionEmission, FactorCatalogState
+from app.schemas.project_steps import ProjectStep0, ProjectStep10
+from app.services.calculation_service import CalculationService
+from app.services.factor_catalog import (
+    build_factor_catalog,
+    current_factor_catalog,
+    get_factor_catalog,
+    publish_factor_catalog,
+    reload_factor_catalog,
+)
+from app.services.project_step_service import ProjectStepService
+from tests.test_project_steps import STEPS
+
+
+@pytest.fixture(autouse=True)
+def slow_checks(monkeypatch):
+    # Só as verificações forçadas enxergam a publicação durante o teste
+    monkeypatch.setattr(settings, "FACTOR_CATALOG_CHECK_INTERVAL", 3600.0)
+
+
+def _reseed_elsewhere(session_factory, factor: float) -> str:
+    """Changes a factor and publishes it the way another process would"""
+    db = session_factory()
+    try:
+        db.execute(
+            update(BiomassProductionEmission)
+            .where(BiomassProductionEmission.biomass_name == "Pinus Virgem")
+            .values(emission_factor=factor)
+        )
+        catalog = build_factor_catalog(db)
+        publish_factor_catalog(db, catalog)
+        db.commit()
+        return catalog.version
+    finally:
+        db.close()
+
+
+def test_reload_publishes_the_version(db, factors):
+    catalog = reload_factor_catalog(db)
+
+    state = db.get(FactorCatalogState, 1)
+    assert state.version == catalog.version
+    assert state.revision == 1
+
+    # Mesma versão: nada muda
+    reload_factor_catalog(db)
+    db.refresh(state)
+    assert state.revision == 1
+
+
+def test_snapshot_follows_a_version_published_elsewhere(db, session_factory, factors):
+    old = get_factor_catalog(db)
+    new_version = _reseed_elsewhere(session_factory, 0.5)
+
+    assert get_factor_catalog(db) is old  # dentro do intervalo de verificação
+    current = current_factor_catalog(db)
+    assert current.version == new_version
+    assert current.production_emissions["Pinus Virgem"] == 0.5
+    assert get_factor_catalog(db) is current
+    assert db.get(FactorCatalogState, 1).revision == 1
+
+
+def test_unpublished_edits_do_not_rebuild_in_a_loop(db, session_factory, factors):
+    reload_factor_catalog(db)
+    catalog = current_factor_catalog(db)
+
+    db.execute(update(BiomassProductionEmission).values(emission_factor=0.9))
+    db.commit()
+
+    assert current_factor_catalog(db) is catalog
+
+
+def test_step_save_keeps_results_of_a_newer_catalog(db, session_factory, factors, user):
+    service = ProjectStepService(db)
+    project = service.create_project_step0(ProjectStep0(name="Planta", state="SP"), user.id)
+    for number in range(1, 11):
+        service.step_updater(number)(project.id, user.id, STEPS[number])
+    project = service.finalize_and_calculate(project.id, user.id)
+    old_version = project.results_catalog_version
+
+    # Outro processo republicou e a recalculação em massa gravou a versão nova
+    new_version = _reseed_elsewhere(session_factory, 0.5)
+    new_catalog = build_factor_catalog(db)
+    new_results = CalculationService(db, catalog=new_catalog).calculate_project_results(project)
+    project.agricultural_emissions = new_results["agricultural_emissions"]
+    project.results_catalog_version = new_version
+    db.commit()
+    assert get_factor_catalog(db).version == old_version  # este processo ainda tem o snapshot antigo
+
+    project = ProjectStepService(db).update_step10(project.id, user.id, ProjectStep10(production_volume=50))
+
+    assert project.results_catalog_version == new_version
+    assert project.agricultural_emissions == pytest.approx(new_results["agricultural_emissions"])
+    expected = CalculationService(db, catalog=new_catalog).calculate_project_results(project)
+    assert project.cbios == round(expected["cbios"])
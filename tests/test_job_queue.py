@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, update
+
+from app.core.config import settings
+from app.models import Job, JobStatus
+from app.services.job_queue import JobWorker, enqueue, job_handler, retry_delay
+
+ECHO = "test_echo"
+BROKEN = "test_broken"
+
+
+@job_handler(ECHO)
+def _echo(db, payload):
+    return {"echo": payload}
+
+
+@job_handler(BROKEN)
+def _broken(db, payload):
+    raise RuntimeError("boom")
+
+
+def _enqueue(session_factory, kind, **kwargs) -> int:
+    db = session_factory()
+    try:
+        job = enqueue(db, kind, **kwargs)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+
+def _get(session_factory, job_id) -> Job:
+    db = session_factory()
+    try:
+        return db.get(Job, job_id)
+    finally:
+        db.close()
+
+
+def _make_due(session_factory, job_id) -> None:
+    db = session_factory()
+    try:
+        db.execute(update(Job).where(Job.id == job_id).values(run_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_enqueue_claim_execute(session_factory):
+    job_id = _enqueue(session_factory, ECHO, payload={"x": 1}, user_id=None)
+    assert _get(session_factory, job_id).status == JobStatus.QUEUED
+
+    worker = JobWorker(session_factory, worker_id="w1")
+    assert worker.claim() == job_id
+
+    job = _get(session_factory, job_id)
+    assert job.status == JobStatus.RUNNING
+    assert job.attempts == 1
+    assert job.locked_by == "w1"
+
+    worker.execute(job_id)
+    job = _get(session_factory, job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"echo": {"x": 1}}
+    assert job.locked_by is None and job.finished_at is not None
+    assert worker.run_once() is False
+
+
+def test_enqueue_unknown_kind(session_factory):
+    db = session_factory()
+    try:
+        with pytest.raises(ValueError):
+            enqueue(db, "no_such_kind")
+    finally:
+        db.close()
+
+
+def test_double_claim_returns_none(engine, session_factory):
+    job_id = _enqueue(session_factory, ECHO)
+    first = JobWorker(session_factory, worker_id="w1")
+    second = JobWorker(session_factory, worker_id="w2")
+    claimed_by_first = []
+
+    # w2 já leu o job como QUEUED; w1 o reivindica antes do UPDATE de w2
+    @event.listens_for(engine, "before_cursor_execute")
+    def race(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE jobs") and not claimed_by_first:
+            claimed_by_first.append(None)  # antes: o claim de w1 também passa por aqui
+            claimed_by_first[0] = first.claim()
+
+    assert second.claim() is None
+    event.remove(engine, "before_cursor_execute", race)
+
+    assert claimed_by_first == [job_id]
+    job = _get(session_factory, job_id)
+    assert job.status == JobStatus.RUNNING
+    assert job.locked_by == "w1"
+    assert job.attempts == 1
+    assert second.claim() is None
+
+
+def test_retry_backoff_until_max_attempts(session_factory):
+    job_id = _enqueue(session_factory, BROKEN, max_attempts=3)
+    worker = JobWorker(session_factory, worker_id="w1")
+
+    for attempt in (1, 2):
+        before = datetime.utcnow()
+        assert worker.run_once() is True
+
+        job = _get(session_factory, job_id)
+        assert job.status == JobStatus.QUEUED
+        assert job.attempts == attempt
+        assert "RuntimeError: boom" in job.error
+        delay = retry_delay(attempt)
+        assert delay == settings.JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+        assert before + timedelta(seconds=delay) <= job.run_at <= datetime.utcnow() + timedelta(seconds=delay)
+
+        # Não volta antes do backoff
+        assert worker.run_once() is False
+        _make_due(session_factory, job_id)
+
+    assert worker.run_once() is True
+    job = _get(session_factory, job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 3
+    assert job.finished_at is not None
+    assert worker.run_once() is False
+
+
+def test_retry_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_DELAY", 10.0)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_DELAY", 100.0)
+    assert retry_delay(1) == 10
+    assert retry_delay(3) == 40
+    assert retry_delay(10) == 100
+
+
+def test_requeue_stale(session_factory):
+    retried = _enqueue(session_factory, ECHO, max_attempts=3)
+    exhausted = _enqueue(session_factory, ECHO, max_attempts=1)
+    fresh = _enqueue(session_factory, ECHO, max_attempts=3)
+
+    # Três jobs RUNNING; os dois primeiros com o lock vencido (worker morto)
+    lost = datetime.utcnow() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT + 60)
+    db = session_factory()
+    try:
+        for job_id, locked_at in ((retried, lost), (exhausted, lost), (fresh, datetime.utcnow())):
+            db.execute(
+                update(Job).where(Job.id == job_id)
+                .values(status=JobStatus.RUNNING, attempts=1, locked_by="dead", locked_at=locked_at)
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    assert JobWorker(session_factory).requeue_stale() == 2
+
+    job = _get(session_factory, retried)
+    assert job.status == JobStatus.QUEUED and job.locked_by is None
+    assert job.error == "Worker lost (lock timeout)"
+    job = _get(session_factory, exhausted)
+    assert job.status == JobStatus.FAILED and job.finished_at is not None
+    assert _get(session_factory, fresh).status == JobStatus.RUNNING
+
+    worker = JobWorker(session_factory, worker_id="w2")
+    assert worker.run_once() is True
+    assert _get(session_factory, retried).status == JobStatus.SUCCEEDED
+    assert _get(session_factory, retried).attempts == 2
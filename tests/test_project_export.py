@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from app.models import Project, ProjectStatus, User
+from app.schemas.project import ProjectCreate
+from app.services.project_export_service import EXPORT_FIELDS, ExportFormat, ProjectExportService
+from app.services.project_import_service import ProjectImportService
+from app.services.project_service import ProjectService
+
+YIELD_PER = 2
+
+
+@pytest.fixture
+def projects(db, factors, user):
+    """5 projetos COMPLETED (mais que 2 lotes de YIELD_PER) e 1 DRAFT"""
+    created = ProjectService(db).create_projects([
+        ProjectCreate(
+            name=f"Planta {index}",
+            biomass_type="Pinus Virgem" if index % 2 else "Eucalipto Virgem",
+            state="SP" if index % 2 else "MG",
+            production_volume=5 + index,
+            biomass_processed=1_000_000 * (index + 1),
+            cnpj="00123456000199",
+        )
+        for index in range(5)
+    ], user.id)
+    draft = Project(user_id=user.id, name="Rascunho", current_step=3)
+    db.add(draft)
+    db.commit()
+    return created + [draft]
+
+
+@pytest.fixture
+def service(session_factory):
+    return ProjectExportService(session_factory, yield_per=YIELD_PER)
+
+
+def _chunks(service, export_format, user_id, **filters):
+    return list(service.stream(export_format, user_id, **filters))
+
+
+def test_csv_is_streamed_one_chunk_per_batch(service, user, projects):
+    chunks = _chunks(service, ExportFormat.CSV, user.id)
+
+    assert len(chunks) == 3  # 6 projetos / yield_per 2; o cabeçalho vai no primeiro
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [int(row["id"]) for row in rows] == [p.id for p in projects]
+    assert list(rows[0]) == list(EXPORT_FIELDS)
+    assert (rows[0]["status"], rows[-1]["status"]) == (ProjectStatus.COMPLETED.value, ProjectStatus.DRAFT.value)
+    assert rows[0]["cnpj"] == "00123456000199"
+    assert float(rows[0]["carbon_intensity"]) == pytest.approx(projects[0].carbon_intensity)
+
+
+def test_ndjson_has_one_object_per_project(service, user, projects):
+    chunks = _chunks(service, ExportFormat.NDJSON, user.id, status=ProjectStatus.COMPLETED)
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["id"] for record in records] == [p.id for p in projects[:5]]
+    assert set(records[0]) == set(EXPORT_FIELDS)
+    assert records[0]["cbios"] == projects[0].cbios
+    assert isinstance(records[0]["created_at"], str)
+
+
+def test_xlsx_is_a_complete_workbook(service, user, projects):
+    chunks = _chunks(service, ExportFormat.XLSX, user.id, biomass_type="Pinus Virgem")
+
+    workbook = load_workbook(io.BytesIO(b"".join(chunks)), read_only=True)
+    rows = list(workbook["Projetos"].iter_rows(values_only=True))
+    assert rows[0] == EXPORT_FIELDS
+    exported = [dict(zip(EXPORT_FIELDS, row)) for row in rows[1:]]
+    pinus = [p for p in projects if p.biomass_type == "Pinus Virgem"]
+    assert [row["id"] for row in exported] == [p.id for p in pinus]
+    assert exported[0]["carbon_intensity"] == pytest.approx(pinus[0].carbon_intensity)
+    workbook.close()
+
+
+def test_export_only_contains_the_users_projects(db, service, user, projects):
+    other = User(name="Outro", email="outro@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+
+    assert b"".join(_chunks(service, ExportFormat.NDJSON, other.id)) == b""
+    assert b"".join(_chunks(service, ExportFormat.CSV, other.id)).decode("utf-8").strip() == ",".join(EXPORT_FIELDS)
+
+
+@pytest.mark.parametrize("export_format, filename", [(ExportFormat.CSV, "export.csv"), (ExportFormat.XLSX, "export.xlsx")])
+def test_export_can_be_imported_back(db, service, user, projects, export_format, filename):
+    data = b"".join(_chunks(service, export_format, user.id, status=ProjectStatus.COMPLETED))
+    other = User(name="Outro", email="outro@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+
+    report = ProjectImportService(db).import_file(io.BytesIO(data), filename, other.id)
+
+    assert (report.imported, report.failed) == (5, 0)
+    imported = db.query(Project).filter(Project.user_id == other.id).order_by(Project.id).all()
+    for original, copy in zip(projects, imported):
+        assert (copy.name, copy.cnpj) == (original.name, original.cnpj)
+        assert copy.carbon_intensity == pytest.approx(original.carbon_intensity)
+        assert copy.cbios == original.cbios
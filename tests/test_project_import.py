@@ -0,0 +1,121 @@
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from app.core.config import settings
+from app.models import Project, ProjectStatus
+from app.services.calculation_service import CalculationService
+from app.services.project_import_service import ProjectImportService
+
+HEADER = ["name", "biomass_type", "state", "production_volume", "biomass_processed", "water_consumption", "cnpj"]
+
+# Linha 1 é o cabeçalho; a linha 4 fica vazia
+RECORDS = [
+    ["Planta A", "Pinus Virgem", "SP", "5", "2000000", "300", "12345678000199"],  # 2
+    ["Planta B", "Biomassa X", "SP", "5", "1000", "", ""],                       # 3: biomassa desconhecida
+    ["", "", "", "", "", "", ""],                                                # 4: vazia, ignorada
+    ["Planta C", "Eucalipto Virgem", "MG", "1.234,5", "0,5", "-3", ""],          # 5: água negativa
+    ["", "Pinus Virgem", "SP", "5", "", "", ""],                                 # 6: sem nome
+    ["Planta D", "Eucalipto Virgem", "MG", "1.234,5", "1000", "", ""],           # 7
+]
+
+
+def csv_file(records=RECORDS, delimiter=";") -> io.BytesIO:
+    lines = [delimiter.join(HEADER)] + [delimiter.join(record) for record in records]
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def xlsx_file(records=RECORDS) -> io.BytesIO:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for record in records:
+        # Como numa planilha real: números como números, células vazias como None
+        sheet.append([
+            float(value) if value.replace(".", "", 1).isdigit() else (value or None)
+            for value in record
+        ])
+    stream = io.BytesIO()
+    workbook.save(stream)
+    stream.seek(0)
+    return stream
+
+
+def _import(db, user, stream, filename, batch_size=100, on_progress=None):
+    service = ProjectImportService(db, batch_size=batch_size, on_progress=on_progress)
+    return service.import_file(stream, filename, user.id)
+
+
+def _error_rows(report):
+    return [error["row"] for error in report.errors]
+
+
+@pytest.mark.parametrize("make_file, filename", [(csv_file, "projetos.csv"), (xlsx_file, "projetos.xlsx")])
+def test_import_reports_each_bad_row_and_keeps_the_rest(db, factors, user, make_file, filename):
+    report = _import(db, user, make_file(), filename)
+
+    assert (report.total_rows, report.imported, report.failed) == (5, 2, 3)
+    assert _error_rows(report) == [3, 5, 6]
+    messages = {error["row"]: " ".join(error["errors"]) for error in report.errors}
+    assert "Biomassa X" in messages[3]
+    assert "water_consumption" in messages[5]
+    assert messages[6].startswith("name")
+
+    projects = db.query(Project).order_by(Project.id).all()
+    assert [p.name for p in projects] == ["Planta A", "Planta D"]
+    assert projects[0].cnpj == "12345678000199"
+    assert projects[1].production_volume == 1234.5  # vírgula decimal pt-BR
+
+    calc_service = CalculationService(db)
+    for project in projects:
+        assert project.status == ProjectStatus.COMPLETED
+        assert project.results_catalog_version == calc_service.catalog.version
+        assert project.carbon_intensity == pytest.approx(calc_service.calculate_project_results(project)["carbon_intensity"])
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 5, 6])
+def test_batch_boundaries_do_not_change_the_outcome(db, factors, user, batch_size):
+    progress = []
+
+    report = _import(db, user, csv_file(), "projetos.csv", batch_size, lambda r: progress.append((r.total_rows, r.imported, r.failed)))
+
+    assert (report.total_rows, report.imported, report.failed) == (5, 2, 3)
+    assert _error_rows(report) == [3, 5, 6]
+    assert db.query(Project).count() == 2
+    # Um callback por lote, com totais acumulados
+    assert len(progress) == -(-5 // batch_size)
+    assert progress[-1] == (5, 2, 3)
+    assert [total for total, _, _ in progress] == sorted(total for total, _, _ in progress)
+
+
+def test_each_batch_is_committed_on_its_own(db, session_factory, factors, user):
+    seen = []
+
+    def count_elsewhere(report):
+        with session_factory() as other:
+            seen.append(other.query(Project).count())
+
+    _import(db, user, csv_file(), "projetos.csv", batch_size=2, on_progress=count_elsewhere)
+
+    assert seen == [1, 1, 2]
+
+
+def test_error_detail_is_capped_but_counted(db, factors, user, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERRORS", 2)
+
+    report = _import(db, user, csv_file(), "projetos.csv", batch_size=2)
+
+    assert report.failed == 3
+    assert _error_rows(report) == [3, 5]
+
+
+@pytest.mark.parametrize("stream, filename", [
+    (io.BytesIO(b"nome;biomass_type\nA;Pinus Virgem\n"), "projetos.csv"),
+    (io.BytesIO(b"name,biomass_type\n"), "projetos.txt"),
+    (io.BytesIO(b"not a zip"), "projetos.xlsx"),
+])
+def test_unreadable_files_raise_value_error(db, factors, user, stream, filename):
+    with pytest.raises(ValueError):
+        _import(db, user, stream, filename)
+    assert db.query(Project).count() == 0
@@ -0,0 +1,97 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Project, ProjectStatus, User
+from app.services.project_service import ProjectService, decode_cursor, encode_cursor, split_page
+
+T0 = datetime(2026, 3, 1, 12, 0, 0, 123456)
+
+
+@pytest.fixture
+def service(db):
+    return ProjectService(db)
+
+
+def _add_projects(db, user, created_at, count: int, **values):
+    projects = [
+        Project(user_id=user.id, name=f"P{index}", current_step=0, created_at=created_at, **values)
+        for index in range(count)
+    ]
+    db.add_all(projects)
+    db.commit()
+    return projects
+
+
+def _all_pages(service, user_id: int, limit: int, **filters):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = service.list_user_projects(user_id, limit, cursor, **filters)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(T0, 42)) == (T0, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b"[1]").decode(),
+    base64.urlsafe_b64encode(b'["ontem", 1]').decode(),
+    base64.urlsafe_b64encode(b'[5, "x"]').decode(),
+    "ção",
+])
+def test_invalid_cursor_is_a_bad_request(service, user, cursor):
+    with pytest.raises(HTTPException) as error:
+        service.list_user_projects(user.id, 10, cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_are_complete_when_created_at_ties(db, service, user):
+    # Mesmo created_at: a ordem (e o cursor) desempata por id
+    tied = _add_projects(db, user, T0, 7)
+    older = _add_projects(db, user, T0 - timedelta(microseconds=1), 2)
+    newer = _add_projects(db, user, T0 + timedelta(seconds=1), 1)
+
+    pages = _all_pages(service, user.id, limit=3)
+
+    expected = [p.id for p in newer] + sorted((p.id for p in tied), reverse=True) + sorted((p.id for p in older), reverse=True)
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert [project_id for page in pages for project_id in page] == expected
+
+
+def test_last_full_page_has_no_next_cursor(db, service, user):
+    _add_projects(db, user, T0, 4)
+
+    assert [len(page) for page in _all_pages(service, user.id, limit=2)] == [2, 2]
+    rows, cursor = service.list_user_projects(user.id, 4)
+    assert len(rows) == 4 and cursor is None
+
+
+def test_split_page_cursor_points_after_the_last_row(db, service, user):
+    projects = _add_projects(db, user, T0, 3)
+    rows, _ = service.list_user_projects(user.id, 10)
+
+    page, cursor = split_page(rows, 2)
+
+    assert page == rows[:2]
+    assert decode_cursor(cursor) == (T0, rows[1].id)
+    assert {row.id for row in rows} == {p.id for p in projects}
+
+
+def test_filters_and_owner_apply_on_every_page(db, service, user):
+    other = User(name="Outro", email="outro@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+    done = _add_projects(db, user, T0, 5, status=ProjectStatus.COMPLETED)
+    _add_projects(db, user, T0, 3, status=ProjectStatus.DRAFT)
+    _add_projects(db, other, T0, 3, status=ProjectStatus.COMPLETED)
+
+    pages = _all_pages(service, user.id, limit=2, status=ProjectStatus.COMPLETED)
+
+    assert sorted(project_id for page in pages for project_id in page) == sorted(p.id for p in done)
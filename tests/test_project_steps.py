@@ -0,0 +1,198 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models import Project, ProjectStatus, User
+from app.schemas.project_steps import (
+    ProjectStep0, ProjectStep1, ProjectStep2, ProjectStep3, ProjectStep4,
+    ProjectStep5, ProjectStep6, ProjectStep7, ProjectStep8, ProjectStep9, ProjectStep10,
+    ProjectStepsBatch
+)
+from app.services.batch_calculation import RESULT_FIELDS
+from app.services.calculation_service import PHASE_COLUMNS, CalculationService
+from app.services.project_step_service import ProjectStepService
+
+STEPS = {
+    1: ProjectStep1(biomass_type="Pinus Virgem", starch_input=0.01),
+    2: ProjectStep2(),
+    3: ProjectStep3(agr_transport_distance=80, agr_transport_vehicle="Caminhão Pesado (>32t)"),
+    4: ProjectStep4(biomass_processed=2_000_000),
+    5: ProjectStep5(elec_grid=50_000),
+    6: ProjectStep6(fuel_diesel=1_000),
+    7: ProjectStep7(water_consumption=300, input_lubricant=20),
+    8: ProjectStep8(dom_mass=1_500_000, dom_distance=120),
+    9: ProjectStep9(),
+    10: ProjectStep10(production_volume=5),
+}
+
+
+@pytest.fixture
+def service(db, factors):
+    return ProjectStepService(db)
+
+
+def _draft(service, user, until: int = 10):
+    project = service.create_project_step0(ProjectStep0(name="Planta", state="SP"), user.id)
+    for number in range(1, until + 1):
+        service.step_updater(number)(project.id, user.id, STEPS[number])
+    return project
+
+
+def _completed(service, user):
+    project = _draft(service, user)
+    return service.finalize_and_calculate(project.id, user.id)
+
+
+def _expected(db, project):
+    return CalculationService(db).calculate_project_results(project)
+
+
+@pytest.fixture
+def phase_calls(service, monkeypatch):
+    """Conjuntos de fases passados a calculate_phase_results"""
+    calls = []
+    original = service.calc_service.calculate_phase_results
+
+    def spy(project, phases):
+        calls.append(set(phases))
+        return original(project, phases)
+
+    monkeypatch.setattr(service.calc_service, "calculate_phase_results", spy)
+    return calls
+
+
+def test_saving_identical_values_writes_and_recalculates_nothing(db, service, user, phase_calls):
+    project = _draft(service, user)
+    updated_at = project.updated_at
+    phase_calls.clear()
+
+    for number in (1, 3, 8):
+        service.step_updater(number)(project.id, user.id, STEPS[number])
+
+    # O UPDATE não casa nenhuma linha: updated_at (onupdate) fica igual
+    db.expire_all()
+    assert db.get(Project, project.id).updated_at == updated_at
+    assert phase_calls == []
+
+
+def test_changed_field_recalculates_only_the_phases_reading_it(db, service, user, phase_calls):
+    project = _draft(service, user)
+    before = {phase: getattr(project, phase) for phase in PHASE_COLUMNS}
+    phase_calls.clear()
+
+    project = service.update_step8(project.id, user.id, ProjectStep8(dom_mass=1_500_000, dom_distance=300))
+
+    assert phase_calls == [{"transport_emissions"}]
+    expected = _expected(db, project)
+    assert project.transport_emissions == pytest.approx(expected["transport_emissions"])
+    assert project.transport_emissions != before["transport_emissions"]
+    for phase in set(PHASE_COLUMNS) - {"transport_emissions"}:
+        assert getattr(project, phase) == before[phase]
+    assert project.carbon_intensity == pytest.approx(sum(getattr(project, p) for p in PHASE_COLUMNS))
+
+
+def test_current_step_only_advances(service, user):
+    project = _draft(service, user, until=5)
+    assert project.current_step == 5
+
+    project = service.update_step3(project.id, user.id, ProjectStep3(agr_transport_distance=10))
+    assert project.current_step == 5
+    assert project.agr_transport_distance == 10
+
+    # Sem mudança de campo, mas o step avança
+    project = service.update_step6(project.id, user.id, ProjectStep6())
+    assert project.current_step == 6
+
+
+def test_step_of_another_users_project_is_not_found(db, service, user):
+    project = _draft(service, user, until=1)
+    other = User(name="Outro", email="outro@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+
+    for step_data in (STEPS[1], ProjectStep1(biomass_type="Eucalipto Virgem")):
+        with pytest.raises(HTTPException) as error:
+            service.update_step1(project.id, other.id, step_data)
+        assert error.value.status_code == 404
+
+    db.expire_all()
+    assert service.update_step1(project.id, user.id, STEPS[1]).biomass_type == "Pinus Virgem"
+
+
+def test_production_volume_change_updates_cbios_of_completed_project(db, service, user):
+    project = _completed(service, user)
+    old_cbios = project.cbios
+
+    project = service.update_step10(project.id, user.id, ProjectStep10(production_volume=500))
+
+    assert project.status == ProjectStatus.COMPLETED
+    expected = _expected(db, project)
+    assert project.cbios != old_cbios
+    assert project.cbios == round(expected["cbios"])
+    assert project.cbios_revenue == pytest.approx(expected["cbios_revenue"])
+
+
+def test_unknown_biomass_clears_every_result_column(db, service, user):
+    project = _completed(service, user)
+    assert project.cbios is not None
+
+    project = service.update_step1(project.id, user.id, ProjectStep1(biomass_type="Desconhecida"))
+
+    assert project.status == ProjectStatus.DRAFT
+    assert project.results_catalog_version is None
+    assert {name: getattr(project, name) for name in RESULT_FIELDS} == dict.fromkeys(RESULT_FIELDS)
+
+    # O erro aparece na finalização
+    with pytest.raises(HTTPException) as error:
+        service.finalize_and_calculate(project.id, user.id)
+    assert error.value.status_code == 500
+
+
+def _batch(**extra) -> ProjectStepsBatch:
+    """Corpo de PUT /projects/{id}/steps com todos os STEPS"""
+    body = {f"step{number}": step.model_dump(exclude_unset=True) for number, step in STEPS.items()}
+    return ProjectStepsBatch.model_validate({**body, **extra})
+
+
+def test_update_steps_saves_and_calculates_in_one_call(db, service, user):
+    reference = _completed(service, user)
+    project = service.create_project_step0(ProjectStep0(name="Lote", state="SP"), user.id)
+    batch = _batch(calculate=True)
+
+    project = service.update_steps(project.id, user.id, batch.steps(), batch.calculate)
+
+    assert project.status == ProjectStatus.COMPLETED
+    assert project.current_step == 10
+    for name in RESULT_FIELDS:
+        assert getattr(project, name) == pytest.approx(getattr(reference, name)), name
+
+
+def test_update_steps_without_calculate_keeps_draft_partials(db, service, user):
+    project = service.create_project_step0(ProjectStep0(name="Lote", state="SP"), user.id)
+    batch = _batch()
+
+    project = service.update_steps(project.id, user.id, batch.steps())
+
+    assert project.status == ProjectStatus.DRAFT
+    assert project.current_step == 10
+    expected = _expected(db, project)
+    for phase in PHASE_COLUMNS:
+        assert getattr(project, phase) == pytest.approx(expected[phase])
+    assert project.cbios is None
+
+
+def test_update_steps_writes_nothing_when_calculation_fails(session_factory, service, user):
+    project = service.create_project_step0(ProjectStep0(name="Lote", state="SP"), user.id)
+    batch = ProjectStepsBatch.model_validate({
+        "step1": {"biomass_type": "Pinus Virgem"},
+        "step4": {"biomass_processed": 1000},
+        "calculate": True,
+    })
+
+    with pytest.raises(HTTPException) as error:
+        service.update_steps(project.id, user.id, batch.steps(), batch.calculate)
+    assert error.value.status_code == 400
+
+    # Sem commit: outra conexão não vê nenhum dos steps
+    with session_factory() as other:
+        saved = other.get(Project, project.id)
+        assert (saved.current_step, saved.biomass_type, saved.biomass_processed) == (0, None, None)
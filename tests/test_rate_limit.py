@@ -0,0 +1,75 @@
+import pytest
+
+from app.core.rate_limit import TokenBucketLimiter
+
+CAPACITY = 3
+PERIOD = 60.0  # 1 token a cada 20 s
+
+
+@pytest.fixture
+def limiter(clock):
+    return TokenBucketLimiter(CAPACITY, PERIOD, maxsize=2, clock=clock)
+
+
+def test_burst_up_to_capacity_then_wait_for_the_next_token(limiter, clock):
+    assert [limiter.hit("ip") for _ in range(CAPACITY)] == [None] * CAPACITY
+    assert limiter.hit("ip") == pytest.approx(20.0)
+
+    clock.advance(5)
+    assert limiter.hit("ip") == pytest.approx(15.0)
+    assert limiter.stats == {"keys": 1, "allowed": 3, "limited": 2, "evicted": 0}
+
+
+def test_tokens_refill_continuously_up_to_capacity(limiter, clock):
+    for _ in range(CAPACITY):
+        limiter.hit("ip")
+
+    clock.advance(19.9)
+    assert limiter.hit("ip") is not None
+    clock.advance(0.1)
+    assert limiter.hit("ip") is None
+
+    # Parado por muito tempo: volta só até a capacidade
+    clock.advance(10 * PERIOD)
+    assert [limiter.hit("ip") for _ in range(CAPACITY + 1)][-1] == pytest.approx(20.0)
+
+
+def test_refused_hits_do_not_take_tokens(limiter, clock):
+    for _ in range(CAPACITY + 5):
+        limiter.hit("ip")
+
+    clock.advance(20)
+    assert limiter.hit("ip") is None
+
+
+def test_keys_have_their_own_buckets(limiter):
+    for _ in range(CAPACITY):
+        limiter.hit("a")
+
+    assert limiter.hit("a") is not None
+    assert limiter.hit("b") is None
+
+
+def test_least_recently_used_bucket_is_evicted_and_comes_back_full(limiter):
+    for _ in range(CAPACITY):
+        limiter.hit("a")
+    limiter.hit("b")
+    limiter.hit("a")  # "a" volta a ser o mais recente
+    limiter.hit("c")  # excede maxsize=2: sai "b"
+
+    assert limiter.stats["keys"] == 2 and limiter.stats["evicted"] == 1
+    assert limiter.hit("a") is not None  # "a" continua vazio
+    limiter.hit("b")  # "b" volta cheio e tira "c"
+    assert [limiter.hit("b") for _ in range(CAPACITY - 1)] == [None] * (CAPACITY - 1)
+    assert limiter.stats["evicted"] == 2
+
+
+def test_reset_refills_one_key_or_all(limiter):
+    for key in ("a", "b"):
+        for _ in range(CAPACITY):
+            limiter.hit(key)
+
+    limiter.reset("a")
+    assert (limiter.hit("a"), limiter.hit("b") is not None) == (None, True)
+    limiter.reset()
+    assert limiter.stats["keys"] == 0
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Project, ProjectStatus
+from app.schemas.project import ProjectCreate
+from app.services.project_service import ProjectService
+from app.services.recalculation_service import RecalculationService
+
+
+@pytest.fixture
+def projects(db, factors, user):
+    """5 projetos calculados e 1 COMPLETED com biomassa que saiu do catálogo"""
+    created = ProjectService(db).create_projects([
+        ProjectCreate(name=f"Planta {index}", biomass_type="Pinus Virgem", state="SP",
+                      production_volume=5, biomass_processed=1_000_000 * (index + 1))
+        for index in range(5)
+    ], user.id)
+    orphan = Project(user_id=user.id, name="Órfão", biomass_type="Desconhecida",
+                     status=ProjectStatus.COMPLETED, current_step=10, production_volume=5)
+    db.add(orphan)
+    db.commit()
+    return created + [orphan]
+
+
+def _service(session_factory, **kwargs):
+    return RecalculationService(session_factory=session_factory, chunk_size=2, workers=0, checkpoint_path="", **kwargs)
+
+
+def test_counts_updated_and_failed_projects(session_factory, projects):
+    progress = _service(session_factory).run(resume=False)
+
+    assert progress.finished
+    assert (progress.total, progress.processed) == (6, 6)
+    assert (progress.updated, progress.skipped, progress.failed) == (5, 0, 1)
+
+
+def test_projects_edited_during_the_run_are_skipped(db, session_factory, projects, monkeypatch):
+    service = _service(session_factory)
+    edited = projects[0]
+    write_chunk = service._write_chunk
+
+    def edit_then_write(db_, progress, ids, *args):
+        # Um usuário salva o projeto entre a leitura e a escrita do lote
+        if edited.id in ids:
+            with session_factory() as other:
+                saved = other.get(Project, edited.id)
+                saved.carbon_intensity, saved.updated_at = 123.0, datetime.utcnow() + timedelta(seconds=1)
+                other.commit()
+        write_chunk(db_, progress, ids, *args)
+
+    monkeypatch.setattr(service, "_write_chunk", edit_then_write)
+    progress = service.run(resume=False)
+
+    assert (progress.processed, progress.updated, progress.skipped, progress.failed) == (6, 4, 1, 1)
+    assert progress.to_dict()["skipped"] == 1
+    db.expire_all()
+    assert db.get(Project, edited.id).carbon_intensity == 123.0  # a edição do usuário fica